@@ -1,8 +1,13 @@
 # app/api/deps.py
 
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator, Sequence
+
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
+from app.db import session as db_session
+from app.db.replica import replica_router
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -10,3 +15,40 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if db_session.AsyncSessionLocal is None:
+        raise RuntimeError("ASYNC_DB가 꺼져 있습니다. (.env 에 ASYNC_DB=true)")
+    async with db_session.AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """조회 전용 엔드포인트: replica 가 충분히 최신이면 replica, 아니면 primary 세션"""
+    db = db_session.ReadSessionLocal() if replica_router.use_replica() else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    if db_session.AsyncSessionLocal is None:
+        raise RuntimeError("ASYNC_DB가 꺼져 있습니다. (.env 에 ASYNC_DB=true)")
+    factory = db_session.AsyncReadSessionLocal if await replica_router.use_replica_async() \
+        else db_session.AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
+def set_page_headers(response: Response, rows: Sequence[Any], limit: int) -> None:
+    """keyset 목록(id 내림차순)의 다음 페이지 커서를 응답 헤더로.
+
+    - X-Next-Before-Id : 더 오래된 페이지 (페이지가 꽉 찼을 때만)
+    - X-Next-After-Id  : 이 페이지 이후 새로 생긴 행 (polling 용)
+    """
+    if rows:
+        response.headers["X-Next-After-Id"] = str(rows[0].id)
+        if len(rows) >= limit:
+            response.headers["X-Next-Before-Id"] = str(rows[-1].id)
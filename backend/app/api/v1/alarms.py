@@ -1,37 +1,69 @@
 # app/api/v1/alarms.py
 
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_read_db, get_read_db, set_page_headers
 from app.schemas.quality import AlarmOut
-from app.services import quality_service
+from app.services import quality_service, quality_service_async
+from app.services.export_service import EXPORT_FORMATS, iter_export
 
 router = APIRouter(prefix="/alarms", tags=["alarms"])
 
 
 @router.get("/recent", response_model=List[AlarmOut])
 def get_recent_alarms(
+    response: Response,
     sku: Optional[str] = None,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
 ):
     """
     최근 알람 리스트 조회.
 
     - sku 가 주어지면 해당 SKU 알람만
     - 안 주면 전체 알람 중 최근 limit 개
+    - since / until 로 기간 지정 (since <= created_at < until, 아카이브된 구간 포함)
+    - before_id / after_id keyset 페이지 (다음 커서는 X-Next-Before-Id / X-Next-After-Id 헤더)
     """
-    rows = quality_service.list_alarms(db, sku=sku, limit=limit)
+    rows = quality_service.list_alarms(
+        db, sku=sku, limit=limit, since=since, until=until, before_id=before_id, after_id=after_id
+    )
+    set_page_headers(response, rows, limit)
     return rows
 
 
+@router.get("/export")
+def export_alarms(
+    sku: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    """
+    알람 스트리밍 export (id 오름차순, 아카이브 구간 포함)
+    """
+    return StreamingResponse(
+        iter_export("alarms", format, sku=sku, since=since, until=until, after_id=after_id),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="alarms.{format}"'},
+    )
+
+
 @router.get("/{alarm_id}", response_model=AlarmOut)
 def get_alarm_detail(
     alarm_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     알람 단건 상세 조회 (/alarms/{alarm_id})
@@ -40,3 +72,40 @@ def get_alarm_detail(
     if not alarm:
         raise HTTPException(status_code=404, detail="Alarm not found")
     return alarm
+
+
+# ===== async 버전 (ASYNC_DB=true 일 때 main.py 가 router 대신 등록) =====
+
+async_router = APIRouter(prefix="/alarms", tags=["alarms"])
+
+
+@async_router.get("/recent", response_model=List[AlarmOut])
+async def get_recent_alarms_async(
+    response: Response,
+    sku: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    rows = await quality_service_async.list_alarms(
+        db, sku=sku, limit=limit, since=since, until=until, before_id=before_id, after_id=after_id
+    )
+    set_page_headers(response, rows, limit)
+    return rows
+
+
+async_router.add_api_route("/export", export_alarms, methods=["GET"])
+
+
+@async_router.get("/{alarm_id}", response_model=AlarmOut)
+async def get_alarm_detail_async(
+    alarm_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    alarm = await quality_service_async.get_alarm_by_id(db, alarm_id=alarm_id)
+    if not alarm:
+        raise HTTPException(status_code=404, detail="Alarm not found")
+    return alarm
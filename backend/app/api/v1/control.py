@@ -3,20 +3,28 @@
 from __future__ import annotations
 
 import time
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_db
+from app.db.write_queue import write_queue
 from app.mqtt.client import mqtt_client
 from app.schemas.cycle import CycleCreate
 from app.services import cycles_service, recipes_service
-from app.ml.lstm_a import compute_next_valve_time
+from app.services import control_service_async, cycles_service_async, recipes_service_async
+from app.ml.lstm_a import compute_next_valve_time, get_lstm_a_model
+from app.services.r2r import compute_next_valve_time as r2r_compute_next_valve_time
 from app.ws.bus import ws_bus
 from app.services import line_state_service
+from app.services.valve_guard import valve_guard
 from sqlalchemy import select, desc
 from app.db.models.cycle import Cycle
+from app.db.models.recipe import Recipe
+from app.db import sku_latest
 
 router = APIRouter(prefix="/control", tags=["control"])
 
@@ -34,7 +42,9 @@ current_sku_state = CurrentSku(sku_id=None)
 def current_sku(db: Session = Depends(get_db)):
     sku = line_state_service.get_current_sku(db, line_id="line1")
 
-    # (보험) line_state가 비어있으면 최근 cycle sku로 fallback
+    # (보험) line_state가 비어있으면 최근 cycle sku로 fallback (sku_latest → cycles)
+    if not sku:
+        sku = db.execute(sku_latest.latest_sku_stmt("line1")).scalar_one_or_none()
     if not sku:
         sku = db.execute(
             select(Cycle.sku).order_by(desc(Cycle.id)).limit(1)
@@ -43,6 +53,65 @@ def current_sku(db: Session = Depends(get_db)):
     return {"sku_id": sku}
 
 
+@router.get("/valve_guard")
+def valve_guard_stats():
+    """can_in 밸브 계산 deadline fallback 횟수/사유 조회."""
+    return valve_guard.stats()
+
+
+@router.get("/model_cache")
+def model_cache_stats():
+    """LSTM-A SKU별 모델 캐시 상태(hit/miss/eviction/pin)."""
+    return get_lstm_a_model().registry.stats()
+
+
+@router.get("/inference_stats")
+def inference_stats():
+    """LSTM-A micro-batch 스케줄러 통계(배치 크기, 큐 대기 시간, 만료 건수)."""
+    batcher = get_lstm_a_model().batcher
+    return batcher.stats() if batcher is not None else {"enabled": False}
+
+
+@router.post("/models/{sku}/reload")
+def reload_model(sku: str, version: Optional[int] = None):
+    """models/ 의 최신(또는 지정 version) LSTM-A 번들로 재시작 없이 교체."""
+    try:
+        entry = get_lstm_a_model().reload(sku, version=version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"sku": sku, "version": entry.version, "window_size": entry.window_size}
+
+
+@router.get("/online_tuning")
+def online_tuning_status():
+    """LSTM-A 온라인 fine-tune 실행/교체 이력."""
+    from app.ml.online_tuner import online_tuner
+
+    return online_tuner.status()
+
+
+@router.get("/db_writer")
+def db_writer_status():
+    """단일 writer 큐(SQLite ingest 직렬화) 상태 + line_state 기록/흡수 횟수."""
+    return {**write_queue.status(), "line_state": line_state_service.status()}
+
+
+@router.get("/replica")
+def replica_status():
+    """조회 엔드포인트 replica 라우팅 상태 (지연, 최신 여부, replica/primary 조회 횟수)."""
+    from app.db.replica import replica_router
+
+    return replica_router.status()
+
+
+@router.get("/retention")
+def retention_status():
+    """보존 정책 / 마지막 아카이브 실행 결과 / 테이블별 아카이브 크기."""
+    from app.services.retention_service import retention
+
+    return retention.status()
+
+
 @router.post("/current_sku", response_model=CurrentSku)
 def set_current_sku(req: CurrentSku):
     current_sku_state.sku_id = req.sku_id
@@ -79,9 +148,10 @@ def request_fill(req: FillRequest, db: Session = Depends(get_db)):
     # LSTM-A(+R2R)로 밸브 시간 계산
     valve_ms = float(compute_next_valve_time(db, sku_id=req.sku_id, target_amount=target_amount))
 
-    # DB에 cycle 생성(충전 전 상태)
-    cycles_service.create_cycle(
+    # DB에 cycle 생성(충전 전 상태, SQLite 면 단일 writer 큐 경유)
+    write_queue.write(
         db,
+        cycles_service.create_cycle,
         CycleCreate(
             seq=last_seq,
             sku=req.sku_id,
@@ -94,36 +164,129 @@ def request_fill(req: FillRequest, db: Session = Depends(get_db)):
         ),
     )
 
-    # UNO로 fill 명령(MQTT)
-    payload = {
-        "sku": req.sku_id,
-        "seq": last_seq,
-        "target_ml": target_amount,
-        "valve_ms": valve_ms,
-        "mode": req.mode,
-    }
-    mqtt_client.publish_fill_command(payload)
+    return _dispatch_fill(req, last_seq, target_amount, valve_ms)
 
-    # Option C: 관리자 WS로도 기록(요청 이벤트)
-    ws_bus.emit({
-        "type": "fill_requested",
-        "ts": int(time.time()),
-        "data": {
-            "sku_id": req.sku_id,
-            "seq": last_seq,
+
+def _dispatch_fill(req: FillRequest, seq: int, target_amount: float, valve_ms: float) -> FillResponse:
+    return _dispatch_fill_batch([(req, seq, target_amount, valve_ms)])[0]
+
+
+def _dispatch_fill_batch(plan: List[Tuple[FillRequest, int, float, float]]) -> List[FillResponse]:
+    # UNO로 fill 명령(MQTT) — 한 번에 연속 publish
+    payloads = [
+        {
+            "sku": req.sku_id,
+            "seq": seq,
             "target_ml": target_amount,
             "valve_ms": valve_ms,
             "mode": req.mode,
-        },
-    })
+        }
+        for req, seq, target_amount, valve_ms in plan
+    ]
+    mqtt_client.publish_fill_commands(payloads)
 
-    return FillResponse(
-        sku_id=req.sku_id,
-        cycle_no=last_seq,
-        target_amount=target_amount,
-        predicted_next_amount=target_amount,  # (데모) 목표량 기반
-        valve_ms=valve_ms,
-    )
+    # Option C: 관리자 WS로도 기록(요청 이벤트)
+    ts = int(time.time())
+    for p in payloads:
+        ws_bus.emit({
+            "type": "fill_requested",
+            "ts": ts,
+            "data": {
+                "sku_id": p["sku"],
+                "seq": p["seq"],
+                "target_ml": p["target_ml"],
+                "valve_ms": p["valve_ms"],
+                "mode": p["mode"],
+            },
+        })
+
+    return [
+        FillResponse(
+            sku_id=req.sku_id,
+            cycle_no=seq,
+            target_amount=target_amount,
+            predicted_next_amount=target_amount,  # (데모) 목표량 기반
+            valve_ms=valve_ms,
+        )
+        for req, seq, target_amount, valve_ms in plan
+    ]
+
+
+# ===== 다중 캔 일괄 충전 요청 =====
+
+def _plan_fill_batch(
+    reqs: List[FillRequest],
+    recipes: Dict[str, Recipe],
+    last_seqs: Dict[str, int],
+    recent_by_sku: Dict[str, List[Cycle]],
+) -> List[Tuple[FillRequest, int, float, float]]:
+    """SKU별로 seq를 연속 할당하고 밸브 시간은 SKU당 1회 계산해 브로드캐스트.
+
+    같은 배치 안의 캔들은 아직 fill_result가 없으므로 R2R 입력(최근 cycle)이 동일하다.
+    """
+    # SKU당 (target_amount, valve_ms) 1회 계산
+    settings_by_sku: Dict[str, Tuple[float, float]] = {}
+    for sku in dict.fromkeys(r.sku_id for r in reqs):
+        recipe = recipes[sku]
+        target_amount = float(recipe.target_amount)
+        settings_by_sku[sku] = (target_amount, float(r2r_compute_next_valve_time(
+            recipe=recipe,
+            recent_cycles=recent_by_sku.get(sku, []),
+            predicted_next_amount=target_amount,
+        )))
+
+    # 요청 순서 그대로, seq 는 SKU별 마지막 seq 다음부터 연속
+    next_seq = dict(last_seqs)
+    plan: List[Tuple[FillRequest, int, float, float]] = []
+    for r in reqs:
+        seq = next_seq.get(r.sku_id, 0) + 1
+        next_seq[r.sku_id] = seq
+        target_amount, valve_ms = settings_by_sku[r.sku_id]
+        plan.append((r, seq, target_amount, valve_ms))
+    return plan
+
+
+def _cycles_from_plan(plan: List[Tuple[FillRequest, int, float, float]]) -> List[CycleCreate]:
+    return [
+        CycleCreate(
+            seq=seq,
+            sku=req.sku_id,
+            target_ml=target_amount,
+            valve_ms=valve_ms,
+            actual_ml=None,
+            error=None,
+            next_valve_ms=None,
+            spc_state=None,
+        )
+        for req, seq, target_amount, valve_ms in plan
+    ]
+
+
+def _missing_recipes(reqs: List[FillRequest], recipes: Dict[str, Recipe]) -> List[str]:
+    return sorted({r.sku_id for r in reqs} - set(recipes))
+
+
+@router.post("/fill/batch", response_model=List[FillResponse])
+def request_fill_batch(reqs: List[FillRequest], db: Session = Depends(get_db)):
+    if not reqs:
+        return []
+
+    skus = sorted({r.sku_id for r in reqs})
+    recipes = recipes_service.get_recipes_by_sku_ids(db, skus)
+    missing = _missing_recipes(reqs, recipes)
+    if missing:
+        raise HTTPException(404, f"Recipe not found: {', '.join(missing)}")
+
+    last_seqs = cycles_service.get_last_seqs_for_skus(db, skus)
+    recent_by_sku = {
+        sku: cycles_service.get_recent_cycles_for_sku(db, sku=sku, limit=50)
+        for sku in skus
+    }
+
+    plan = _plan_fill_batch(reqs, recipes, last_seqs, recent_by_sku)
+    write_queue.write(db, cycles_service.bulk_create_cycles, _cycles_from_plan(plan))
+
+    return _dispatch_fill_batch(plan)
 
 
 # ===== 보정 버튼(end-to-end) =====
@@ -156,3 +319,82 @@ def apply_correction(req: CorrectionRequest):
     })
 
     return CorrectionResponse(sku_id=req.sku_id)
+
+
+# ===== async 버전 (ASYNC_DB=true 일 때 main.py 가 router 대신 등록) =====
+
+async_router = APIRouter(prefix="/control", tags=["control"])
+
+
+@async_router.get("/current_sku")
+async def current_sku_async(db: AsyncSession = Depends(get_async_db)):
+    sku = await control_service_async.get_current_sku(db, line_id="line1")
+    return {"sku_id": sku}
+
+
+@async_router.post("/fill", response_model=FillResponse)
+async def request_fill_async(req: FillRequest, db: AsyncSession = Depends(get_async_db)):
+    recipe = await recipes_service_async.get_recipe_by_sku_id(db, req.sku_id)
+    if not recipe:
+        raise HTTPException(404, "Recipe not found")
+
+    target_amount = float(recipe.target_amount)
+    last_seq = await cycles_service_async.get_last_seq_for_sku(db, req.sku_id) + 1
+    valve_ms = await control_service_async.compute_next_valve_time(db, recipe, target_amount)
+
+    data = CycleCreate(
+        seq=last_seq,
+        sku=req.sku_id,
+        target_ml=target_amount,
+        valve_ms=valve_ms,
+        actual_ml=None,
+        error=None,
+        next_valve_ms=None,
+        spc_state=None,
+    )
+    if write_queue.enabled:
+        # aiosqlite 연결도 SQLite writer 는 하나 → MQTT ingest 와 같은 큐로
+        await write_queue.run_with_session_async(cycles_service.create_cycle, data)
+    else:
+        await cycles_service_async.create_cycle(db, data)
+
+    return _dispatch_fill(req, last_seq, target_amount, valve_ms)
+
+
+@async_router.post("/fill/batch", response_model=List[FillResponse])
+async def request_fill_batch_async(reqs: List[FillRequest], db: AsyncSession = Depends(get_async_db)):
+    if not reqs:
+        return []
+
+    skus = sorted({r.sku_id for r in reqs})
+    recipes = await recipes_service_async.get_recipes_by_sku_ids(db, skus)
+    missing = _missing_recipes(reqs, recipes)
+    if missing:
+        raise HTTPException(404, f"Recipe not found: {', '.join(missing)}")
+
+    last_seqs = await cycles_service_async.get_last_seqs_for_skus(db, skus)
+    recent_by_sku = {
+        sku: await cycles_service_async.get_recent_cycles_for_sku(db, sku=sku, limit=50)
+        for sku in skus
+    }
+
+    plan = _plan_fill_batch(reqs, recipes, last_seqs, recent_by_sku)
+    if write_queue.enabled:
+        await write_queue.run_with_session_async(cycles_service.bulk_create_cycles, _cycles_from_plan(plan))
+    else:
+        await cycles_service_async.bulk_create_cycles(db, _cycles_from_plan(plan))
+
+    return _dispatch_fill_batch(plan)
+
+
+# DB를 쓰지 않는 엔드포인트는 그대로 공유
+async_router.add_api_route("/valve_guard", valve_guard_stats, methods=["GET"])
+async_router.add_api_route("/model_cache", model_cache_stats, methods=["GET"])
+async_router.add_api_route("/inference_stats", inference_stats, methods=["GET"])
+async_router.add_api_route("/models/{sku}/reload", reload_model, methods=["POST"])
+async_router.add_api_route("/online_tuning", online_tuning_status, methods=["GET"])
+async_router.add_api_route("/retention", retention_status, methods=["GET"])
+async_router.add_api_route("/db_writer", db_writer_status, methods=["GET"])
+async_router.add_api_route("/replica", replica_status, methods=["GET"])
+async_router.add_api_route("/current_sku", set_current_sku, methods=["POST"], response_model=CurrentSku)
+async_router.add_api_route("/apply_correction", apply_correction, methods=["POST"], response_model=CorrectionResponse)
@@ -1,13 +1,17 @@
 # app/api/v1/cycles.py
 
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_async_read_db, get_db, get_read_db, set_page_headers
 from app.schemas.cycle import CycleCreate, CycleOut
-from app.services import cycles_service
+from app.services import cycles_service, cycles_service_async
+from app.services.export_service import EXPORT_FORMATS, iter_export
 
 router = APIRouter(prefix="/cycles", tags=["cycles"])
 
@@ -22,19 +26,95 @@ def create_cycle_endpoint(
 
 @router.get("/", response_model=List[CycleOut])
 def list_cycles_endpoint(
+    response: Response,
     sku: Optional[str] = None,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
 ):
-    return cycles_service.list_cycles(db, sku=sku, limit=limit)
+    # id 내림차순 keyset 페이지 (다음 커서는 X-Next-Before-Id / X-Next-After-Id 헤더)
+    # since <= created_at < until (보존 기간이 지나 아카이브된 구간도 조회됨)
+    rows = cycles_service.list_cycles(
+        db, sku=sku, limit=limit, since=since, until=until, before_id=before_id, after_id=after_id
+    )
+    set_page_headers(response, rows, limit)
+    return rows
+
+
+@router.get("/export")
+def export_cycles_endpoint(
+    sku: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    """
+    cycles 스트리밍 export (id 오름차순, 아카이브 구간 포함).
+    server-side cursor 로 chunk 씩 읽어 보내므로 행 수와 관계없이 메모리 사용이 일정하다.
+    """
+    return StreamingResponse(
+        iter_export("cycles", format, sku=sku, since=since, until=until, after_id=after_id),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="cycles.{format}"'},
+    )
 
 
 @router.get("/{cycle_id}", response_model=CycleOut)
 def get_cycle_endpoint(
     cycle_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     cycle = cycles_service.get_cycle_by_id(db, cycle_id)
     if not cycle:
         raise HTTPException(status_code=404, detail="Cycle not found")
-    return cycle
\ No newline at end of file
+    return cycle
+
+
+# ===== async 버전 (ASYNC_DB=true 일 때 main.py 가 router 대신 등록) =====
+
+async_router = APIRouter(prefix="/cycles", tags=["cycles"])
+
+
+@async_router.post("/", response_model=CycleOut)
+async def create_cycle_endpoint_async(
+    data: CycleCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await cycles_service_async.create_cycle(db, data)
+
+
+@async_router.get("/", response_model=List[CycleOut])
+async def list_cycles_endpoint_async(
+    response: Response,
+    sku: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    rows = await cycles_service_async.list_cycles(
+        db, sku=sku, limit=limit, since=since, until=until, before_id=before_id, after_id=after_id
+    )
+    set_page_headers(response, rows, limit)
+    return rows
+
+
+# export 는 요청 세션을 쓰지 않고 자체 connection 으로 스트리밍 (동기 generator 는 threadpool 에서 돈다)
+async_router.add_api_route("/export", export_cycles_endpoint, methods=["GET"])
+
+
+@async_router.get("/{cycle_id}", response_model=CycleOut)
+async def get_cycle_endpoint_async(
+    cycle_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    cycle = await cycles_service_async.get_cycle_by_id(db, cycle_id)
+    if not cycle:
+        raise HTTPException(status_code=404, detail="Cycle not found")
+    return cycle
@@ -1,13 +1,17 @@
 # app/api/v1/quality.py
 
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.schemas.quality import SpcCurrentState, SpcStateOut
-from app.services import quality_service
+from app.api.deps import get_async_read_db, get_read_db
+from app.schemas.quality import QualityTrendOut, SpcCurrentState, SpcStateOut
+from app.services import quality_service, quality_service_async, quality_trend_service
+
+TrendBucket = Literal["minute", "hour", "day", "week", "month"]
 
 router = APIRouter(prefix="/quality", tags=["quality"])
 
@@ -15,7 +19,7 @@ router = APIRouter(prefix="/quality", tags=["quality"])
 @router.get("/spc_state", response_model=SpcCurrentState)
 def get_spc_state(
     sku: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     특정 SKU의 현재 SPC/CUSUM 상태 조회(읽기 전용).
@@ -31,10 +35,86 @@ def get_spc_state(
 def get_spc_states(
     sku: str,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
 ):
     """
     특정 SKU의 SPC 상태 히스토리 조회 (/quality/spc_states).
+    since / until 로 기간 지정 가능 (아카이브된 구간 포함).
     """
-    rows = quality_service.list_spc_states(db, sku=sku, limit=limit)
+    rows = quality_service.list_spc_states(db, sku=sku, limit=limit, since=since, until=until)
     return rows
+
+
+@router.get("/trend", response_model=QualityTrendOut)
+def get_quality_trend(
+    sku: str,
+    since: Optional[datetime] = Query(None, alias="from"),
+    until: Optional[datetime] = Query(None, alias="to"),
+    bucket: TrendBucket = "hour",
+    db: Session = Depends(get_read_db),
+):
+    """
+    SKU 품질 추이를 bucket 단위로 서버에서 집계 (/quality/trend?sku=&from=&to=&bucket=).
+
+    - bucket 별 cycle 수, error 평균/표준편차, actual_ml 최소/최대, 레벨별 알람 수
+    - from <= created_at < to (UTC), to 생략 시 현재, from 생략 시 bucket 에 맞는 기본 구간
+    - 같은 조회는 TREND_CACHE_TTL_S 동안 캐시된 결과를 반환
+    """
+    try:
+        return quality_trend_service.get_trend(db, sku=sku, since=since, until=until, bucket=bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/predicted_drift")
+def get_predicted_drift():
+    """
+    LSTM-B 예측 SPC 최근 실행 결과 (SKU별 다음 k 개 error 예측, PREDICTED_DRIFT 여부).
+    """
+    from app.services.predictive_spc_service import predictive_spc
+
+    return predictive_spc.status()
+
+
+# ===== async 버전 (ASYNC_DB=true 일 때 main.py 가 router 대신 등록) =====
+
+async_router = APIRouter(prefix="/quality", tags=["quality"])
+
+
+@async_router.get("/spc_state", response_model=SpcCurrentState)
+async def get_spc_state_async(
+    sku: str,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    info = await quality_service_async.read_current_spc_state(db, sku=sku)
+    return SpcCurrentState(**info)
+
+
+@async_router.get("/spc_states", response_model=List[SpcStateOut])
+async def get_spc_states_async(
+    sku: str,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await quality_service_async.list_spc_states(db, sku=sku, limit=limit, since=since, until=until)
+
+
+@async_router.get("/trend", response_model=QualityTrendOut)
+async def get_quality_trend_async(
+    sku: str,
+    since: Optional[datetime] = Query(None, alias="from"),
+    until: Optional[datetime] = Query(None, alias="to"),
+    bucket: TrendBucket = "hour",
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    try:
+        return await quality_trend_service.get_trend_async(db, sku=sku, since=since, until=until, bucket=bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async_router.add_api_route("/predicted_drift", get_predicted_drift, methods=["GET"])
@@ -3,11 +3,12 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_async_read_db, get_db, get_read_db
 from app.schemas.recipe import RecipeCreate, RecipeOut, RecipeUpdate
-from app.services import recipes_service
+from app.services import recipes_service, recipes_service_async
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
@@ -22,7 +23,7 @@ def create_recipe_endpoint(
 
 @router.get("/", response_model=List[RecipeOut])
 def list_recipes_endpoint(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return recipes_service.list_recipes(db)
 
@@ -30,7 +31,7 @@ def list_recipes_endpoint(
 @router.get("/{recipe_id}", response_model=RecipeOut)
 def get_recipe_endpoint(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     recipe = recipes_service.get_recipe_by_id(db, recipe_id)
     if not recipe:
@@ -59,4 +60,58 @@ def delete_recipe_endpoint(
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     recipes_service.delete_recipe(db, recipe)
-    return
\ No newline at end of file
+    return
+
+# ===== async 버전 (ASYNC_DB=true 일 때 main.py 가 router 대신 등록) =====
+
+async_router = APIRouter(prefix="/recipes", tags=["recipes"])
+
+
+@async_router.post("/", response_model=RecipeOut, status_code=status.HTTP_201_CREATED)
+async def create_recipe_endpoint_async(
+    data: RecipeCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await recipes_service_async.create_recipe(db, data)
+
+
+@async_router.get("/", response_model=List[RecipeOut])
+async def list_recipes_endpoint_async(
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await recipes_service_async.list_recipes(db)
+
+
+@async_router.get("/{recipe_id}", response_model=RecipeOut)
+async def get_recipe_endpoint_async(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    recipe = await recipes_service_async.get_recipe_by_id(db, recipe_id)
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return recipe
+
+
+@async_router.patch("/{recipe_id}", response_model=RecipeOut)
+async def update_recipe_endpoint_async(
+    recipe_id: int,
+    data: RecipeUpdate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    recipe = await recipes_service_async.get_recipe_by_id(db, recipe_id)
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return await recipes_service_async.update_recipe(db, recipe, data)
+
+
+@async_router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_recipe_endpoint_async(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_db),
+):
+    recipe = await recipes_service_async.get_recipe_by_id(db, recipe_id)
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    await recipes_service_async.delete_recipe(db, recipe)
+    return
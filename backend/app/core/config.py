@@ -17,12 +17,98 @@ class Settings(BaseSettings):
     # 반드시 .env 또는 환경변수에 있어야 하는 값
     DATABASE_URL: str
 
+    # 읽기 전용 replica (cycles / quality / alarms / recipe 조회 엔드포인트용, 비우면 primary 만 사용).
+    # replica 지연이 REPLICA_MAX_LAG_S 를 넘거나 접속이 안 되면 그 동안은 primary 로 읽는다 (지연 확인은 REPLICA_CHECK_S 주기)
+    DATABASE_REPLICA_URL: str = ""
+    REPLICA_MAX_LAG_S: float = 5.0
+    REPLICA_CHECK_S: float = 2.0
+
+    # true 면 REST 엔드포인트가 async 엔진(asyncpg / aiosqlite)을 사용
+    ASYNC_DB: bool = False
+
+    # SQLite(LOCAL tier) 연결 pragma: journal_mode / synchronous ("" 이면 SQLite 기본값 유지),
+    # page cache(KiB), mmap(MiB), 쓰기 잠금 대기(ms)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_KB: int = 16384
+    SQLITE_MMAP_MB: int = 64
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # ingest 쓰기(MQTT 이벤트, /control/fill)를 단일 writer 스레드로 직렬화: auto(SQLite 일 때만) | on | off
+    DB_WRITE_QUEUE: str = "auto"
+    DB_WRITE_QUEUE_MAX: int = 10_000
+    # line_state: 같은 SKU 반복 기록은 메모리에서 흡수, 이 주기(초)마다 한 번만 DB 에 다시 기록 (0 이면 매번 기록)
+    LINE_STATE_FLUSH_S: float = 30.0
+    # /quality/trend: 같은 조회 결과 캐시 유지(초, 0=캐시 안 함) / 최대 캐시 항목 수 / 한 요청의 최대 bucket 수
+    TREND_CACHE_TTL_S: float = 10.0
+    TREND_CACHE_MAX: int = 256
+    TREND_MAX_BUCKETS: int = 5000
+
     BACKEND_CORS_ORIGINS: str = ""
 
     MQTT_BROKER_HOST: str = "localhost"
     MQTT_BROKER_PORT: int = 1883
     MQTT_CLIENT_ID: str = "smartcan-backend"
 
+    # can_in → fill 명령 경로의 밸브 계산 deadline(ms). 초과 시 last-known-good fallback
+    VALVE_DEADLINE_MS: float = 200.0
+    VALVE_GUARD_WORKERS: int = 2
+
+    # true 면 테이블 생성/모델 로드/warmup 을 백그라운드에서 수행 (/ready 로 완료 확인)
+    FAST_START: bool = False
+
+    # 서빙 추론 백엔드: "torch" | "numpy" (numpy 는 export_numpy 로 만든 .npz 사용, torch import 안 함)
+    ML_BACKEND: str = "torch"
+
+    # torch 백엔드 서빙 최적화: "float"(eager fp32) | "int8"(LSTM/Linear dynamic int8 양자화) | "script"(TorchScript freeze)
+    # 정확도/지연 비교는 python -m app.ml.quantize lstm_a --sku ... 리포트 참고
+    ML_TORCH_MODE: str = "float"
+    # int8 양자화 엔진 (빈 값이면 torch 기본값, ARM 엣지 박스는 "qnnpack")
+    ML_QUANT_ENGINE: str = ""
+
+    # LSTM-A SKU별 모델 캐시 메모리 상한(MB)
+    LSTM_A_CACHE_MB: float = 64.0
+
+    # LSTM-A micro-batch: 요청 수집 window(ms, 0이면 비활성) / 요청별 deadline(ms)
+    LSTM_A_BATCH_WINDOW_MS: float = 2.0
+    LSTM_A_BATCH_DEADLINE_MS: float = 50.0
+
+    # models/ 의 새 번들 버전 확인 주기(초, 0이면 watcher 비활성 — POST /control/models/{sku}/reload 로 수동 교체)
+    MODEL_WATCH_INTERVAL_S: float = 0.0
+
+    # LSTM-A 온라인 fine-tune: 주기(초, 0이면 비활성) / 최소 신규 cycle 수 / 1회 학습 시간 상한(초)
+    # / 교체에 필요한 accept 구간 손실의 최소 상대 개선 (0.02 = 2%)
+    # 학습은 별도 프로세스(nice, torch 스레드 수 제한)에서만 수행
+    ONLINE_TUNE_INTERVAL_S: float = 0.0
+    ONLINE_TUNE_MIN_NEW_CYCLES: int = 50
+    ONLINE_TUNE_MAX_SECONDS: float = 30.0
+    ONLINE_TUNE_MIN_IMPROVEMENT: float = 0.02
+    ONLINE_TUNE_THREADS: int = 1
+    ONLINE_TUNE_NICE: int = 10
+
+    # 학습용 feature store (cycles append-only 컬럼 스냅샷) 경로 / 학습 시 DB 대신 사용 여부
+    # fill_result 대기 중인 cycle 은 GRACE_S 동안 sync watermark 를 멈춰 기다림
+    FEATURE_STORE_DIR: str = "feature_store"
+    FEATURE_STORE_GRACE_S: float = 600.0
+    TRAIN_FROM_FEATURE_STORE: bool = True
+
+    # cycles 월 파티션(PostgreSQL, python -m app.db.migrate_cycles partition) 을 기동 시 몇 개월 앞까지 만들어 둘지 (0이면 안 함)
+    CYCLES_PARTITION_MONTHS_AHEAD: int = 3
+
+    # 보존 기간(일, 0이면 영구 보관)이 지난 행을 ARCHIVE_DIR 압축 파일로 옮김 (python -m app.services.retention_service run)
+    # RETENTION_INTERVAL_S 주기(0이면 비활성)로 BATCH_SIZE 행씩 짧은 트랜잭션으로 삭제, 배치 사이 PAUSE_S 휴식
+    RETENTION_CYCLES_DAYS: int = 0
+    RETENTION_SPC_STATES_DAYS: int = 0
+    RETENTION_ALARMS_DAYS: int = 0
+    RETENTION_INTERVAL_S: float = 0.0
+    RETENTION_BATCH_SIZE: int = 10_000
+    RETENTION_PAUSE_S: float = 0.05
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_FORMAT: str = "auto"  # auto | parquet (pyarrow 필요) | npz
+
+    # LSTM-B 예측 SPC: 활성 SKU 다음 k 개 error 예측 주기(초, 0이면 비활성) / 예측 step 수
+    PREDICTIVE_SPC_INTERVAL_S: float = 0.0
+    PREDICTIVE_SPC_HORIZON: int = 5
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,41 @@
+# app/core/fileio.py
+"""
+파일 기반 저장소(feature store, archive) 공통: JSON manifest 원자적 쓰기 / 읽기, 프로세스 간 파일 락.
+표준 라이브러리만 사용 (REST 앱 import 경로에서 ML 스택을 끌어오지 않게).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def write_json(path: Path, data: dict) -> None:
+    """tmp 에 쓰고 os.replace → 읽는 쪽은 항상 완전한 파일만 본다"""
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_json(path: Path, default: dict) -> dict:
+    if not path.exists():
+        return dict(default)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@contextmanager
+def exclusive(path: Path):
+    """동시 실행 방지용 파일 락 (fcntl 없는 환경에서는 락 없이 진행)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,442 @@
+"""
+app/db/archive.py
+
+보존 기간이 지난 cycles / spc_states / alarms 행의 압축 아카이브 (retention_service 가 옮겨 담는다).
+
+디렉터리 구조:
+
+    archive/
+      cycles/
+        manifest.json                          # {"rows": N, "files": [{path, rows, first_id, last_id, min_ts, max_ts, skus}]}
+        2025-01/part-000000000001-000000010000.parquet   (pyarrow 없으면 .npz)
+      spc_states/ ...
+      alarms/ ...
+
+- 파일 하나 = DB 에서 지운 배치 하나 (id 오름차순). 한 번 쓴 파일은 바뀌지 않는다.
+- ARCHIVE_FORMAT: parquet(zstd, pyarrow 필요) | npz(np.savez_compressed 컬럼 배열 + null 마스크) | auto
+- manifest 에 파일별 id/created_at 범위와 SKU 목록을 적어 두어 조회 시 파일을 열기 전에 거른다.
+- 목록/단건 조회 서비스는 DB 결과가 모자랄 때만 merge_with_archive / get_archived 로 아카이브를 본다.
+- export 는 iter_rows 로 파일 하나씩 id 순서대로 흘려보낸다.
+- numpy / pandas(pyarrow) 는 아카이브 파일을 실제로 읽고 쓸 때만 import
+  (REST 서비스가 이 모듈을 import 해도 ML 스택이 올라오지 않게)
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.db.models.cycle import Cycle
+from app.db.models.quality import Alarm, SpcState
+
+if TYPE_CHECKING:
+    import numpy as np
+from app.core.fileio import exclusive, read_json, write_json
+
+ARCHIVE_MODELS = {"cycles": Cycle, "spc_states": SpcState, "alarms": Alarm}
+ARCHIVE_FORMATS = ("auto", "parquet", "npz")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _column_kinds(table: str) -> Dict[str, str]:
+    """컬럼 이름 → int / float / str / datetime"""
+    kinds = {}
+    for col in ARCHIVE_MODELS[table].__table__.columns:
+        t = col.type.python_type
+        kinds[col.name] = "datetime" if t is datetime else t.__name__
+    return kinds
+
+
+def to_ns(value: Optional[datetime]) -> Optional[int]:
+    """datetime → UTC epoch ns (SQLite 가 돌려주는 naive 값은 UTC 로 본다)"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _from_ns(ns: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(ns) // 1000)
+
+
+def resolve_format(fmt: Optional[str] = None) -> str:
+    fmt = fmt or settings.ARCHIVE_FORMAT
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"unknown ARCHIVE_FORMAT: {fmt!r} (expected one of {ARCHIVE_FORMATS})")
+    if fmt != "auto":
+        return fmt
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "npz"
+    return "parquet"
+
+
+# ---------------------------------------------------
+# 파일 인코딩 (행 dict 목록 ↔ 컬럼 배열 + null 마스크)
+# ---------------------------------------------------
+
+def _encode(rows: Sequence[Mapping[str, Any]], kinds: Dict[str, str]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    import numpy as np
+
+    cols, nulls = {}, {}
+    for name, kind in kinds.items():
+        values = [r[name] for r in rows]
+        isnull = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+        if kind == "datetime":
+            arr = np.array([to_ns(v) or 0 for v in values], dtype=np.int64)
+        elif kind == "int":
+            arr = np.array([0 if v is None else v for v in values], dtype=np.int64)
+        elif kind == "float":
+            arr = np.array(values, dtype=np.float64)  # None → NaN
+        else:
+            arr = np.array(["" if v is None else v for v in values], dtype=str)
+        cols[name] = arr
+        if isnull.any():
+            nulls[name] = isnull
+    return cols, nulls
+
+
+def _write_file(path: Path, fmt: str, cols: Dict[str, np.ndarray], nulls: Dict[str, np.ndarray],
+                kinds: Dict[str, str]) -> None:
+    import numpy as np
+
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        import pandas as pd
+
+        frame = {}
+        for name, arr in cols.items():
+            s = pd.Series(pd.to_datetime(arr, utc=True) if kinds[name] == "datetime" else arr)
+            if kinds[name] == "int":
+                s = s.astype("Int64")
+            if name in nulls:
+                s = s.mask(nulls[name])
+            frame[name] = s
+        pd.DataFrame(frame).to_parquet(tmp, compression="zstd", index=False)
+    else:
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **cols, **{f"{k}__null": v for k, v in nulls.items()})
+    os.replace(tmp, path)
+
+
+@lru_cache(maxsize=16)
+def _load_file(path: str, table: str) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """아카이브 파일 → (컬럼 배열, null 마스크). 파일은 불변이라 경로 기준으로 캐시"""
+    import numpy as np
+
+    kinds = _column_kinds(table)
+    cols, nulls = {}, {}
+    if path.endswith(".parquet"):
+        import pandas as pd
+
+        df = pd.read_parquet(path)
+        for name, kind in kinds.items():
+            s = df[name]
+            isnull = s.isna().to_numpy()
+            if kind == "datetime":
+                cols[name] = pd.to_datetime(s, utc=True).dt.as_unit("ns").astype("int64").to_numpy()
+            elif kind == "int":
+                cols[name] = s.fillna(0).astype(np.int64).to_numpy()
+            elif kind == "float":
+                cols[name] = s.astype(np.float64).to_numpy()
+            else:
+                cols[name] = s.fillna("").astype(str).to_numpy()
+            if isnull.any():
+                nulls[name] = isnull
+    else:
+        with np.load(path, allow_pickle=False) as z:
+            for name in kinds:
+                cols[name] = z[name]
+                if f"{name}__null" in z.files:
+                    nulls[name] = z[f"{name}__null"]
+    return cols, nulls
+
+
+def _row(cols: Dict[str, np.ndarray], nulls: Dict[str, np.ndarray], kinds: Dict[str, str], i: int) -> Dict[str, Any]:
+    out = {}
+    for name, kind in kinds.items():
+        if name in nulls and nulls[name][i]:
+            out[name] = None
+        elif kind == "datetime":
+            out[name] = _from_ns(cols[name][i])
+        elif kind == "int":
+            out[name] = int(cols[name][i])
+        elif kind == "float":
+            out[name] = float(cols[name][i])
+        else:
+            out[name] = str(cols[name][i])
+    return out
+
+
+# ---------------------------------------------------
+# 아카이브 저장소
+# ---------------------------------------------------
+
+class ArchiveStore:
+    def __init__(self, root: Optional[Path] = None, fmt: Optional[str] = None) -> None:
+        self.root = Path(root or settings.ARCHIVE_DIR)
+        self.fmt = fmt
+        self._manifests: Dict[str, Tuple[int, dict]] = {}
+
+    def _table_dir(self, table: str) -> Path:
+        if table not in ARCHIVE_MODELS:
+            raise ValueError(f"unknown archive table: {table!r}")
+        return self.root / table
+
+    def manifest(self, table: str) -> dict:
+        """manifest.json (mtime 이 같으면 캐시 재사용)"""
+        path = self._table_dir(table) / "manifest.json"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {"rows": 0, "files": []}
+        cached = self._manifests.get(table)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, read_json(path, {"rows": 0, "files": []}))
+            self._manifests[table] = cached
+        return cached[1]
+
+    def has_rows(self, table: str) -> bool:
+        return bool(self.manifest(table)["files"])
+
+    def max_id(self, table: str) -> int:
+        return max((f["last_id"] for f in self.manifest(table)["files"]), default=0)
+
+    # ========== 쓰기 ==========
+
+    def write_batch(self, table: str, rows: Sequence[Mapping[str, Any]]) -> Optional[dict]:
+        """id 오름차순 행 배치를 파일 하나로 저장하고 manifest 에 추가. 반환: manifest 항목"""
+        if not rows:
+            return None
+        kinds = _column_kinds(table)
+        cols, nulls = _encode(rows, kinds)
+        fmt = resolve_format(self.fmt)
+
+        first_id, last_id = int(cols["id"][0]), int(cols["id"][-1])
+        month = _from_ns(int(cols["created_at"].min())).strftime("%Y-%m")
+        rel = f"{month}/part-{first_id:012d}-{last_id:012d}.{fmt}"
+
+        d = self._table_dir(table)
+        (d / month).mkdir(parents=True, exist_ok=True)
+        with exclusive(d / ".lock"):
+            _write_file(d / rel, fmt, cols, nulls, kinds)
+
+            entry = {
+                "path": rel,
+                "rows": len(rows),
+                "first_id": first_id,
+                "last_id": last_id,
+                "min_ts": int(cols["created_at"].min()),
+                "max_ts": int(cols["created_at"].max()),
+                "skus": sorted(set(cols["sku"].tolist())),
+            }
+            manifest = read_json(d / "manifest.json", {"rows": 0, "files": []})
+            # 삭제 전에 중단돼 같은 배치를 다시 쓴 경우 항목 교체
+            manifest["files"] = [f for f in manifest["files"] if f["path"] != rel] + [entry]
+            manifest["rows"] = sum(f["rows"] for f in manifest["files"])
+            write_json(d / "manifest.json", manifest)
+        return entry
+
+    # ========== 읽기 ==========
+
+    def _files(self, table: str, sku: Optional[str], lo: Optional[int], hi: Optional[int],
+               before_id: Optional[int], after_id: Optional[int]) -> List[dict]:
+        """manifest 범위만으로 조건에 걸릴 수 있는 파일만 (first_id 오름차순)"""
+        files = [
+            f for f in self.manifest(table)["files"]
+            if (sku is None or sku in f["skus"])
+            and (lo is None or f["max_ts"] >= lo)
+            and (hi is None or f["min_ts"] < hi)
+            and (before_id is None or f["first_id"] < before_id)
+            and (after_id is None or f["last_id"] > after_id)
+        ]
+        return sorted(files, key=lambda f: f["first_id"])
+
+    @staticmethod
+    def _mask(cols: Dict[str, np.ndarray], sku: Optional[str], lo: Optional[int], hi: Optional[int],
+              before_id: Optional[int], after_id: Optional[int]) -> np.ndarray:
+        import numpy as np
+
+        ts, ids = cols["created_at"], cols["id"]
+        mask = np.ones(len(ids), dtype=bool)
+        if sku is not None:
+            mask &= cols["sku"] == sku
+        if lo is not None:
+            mask &= ts >= lo
+        if hi is not None:
+            mask &= ts < hi
+        if before_id is not None:
+            mask &= ids < before_id
+        if after_id is not None:
+            mask &= ids > after_id
+        return mask
+
+    def query(self, table: str, sku: Optional[str] = None, since: Optional[datetime] = None,
+              until: Optional[datetime] = None, limit: int = 50, before_id: Optional[int] = None,
+              after_id: Optional[int] = None, oldest_first: bool = False) -> List[Dict[str, Any]]:
+        """조건(since <= created_at < until, after_id < id < before_id)에 맞는 아카이브 행을
+        id 내림차순(oldest_first 면 오름차순)으로 최대 limit 개"""
+        import numpy as np
+
+        lo, hi = to_ns(since), to_ns(until)
+        files = self._files(table, sku, lo, hi, before_id, after_id)
+        if not oldest_first:
+            files.reverse()
+
+        kinds = _column_kinds(table)
+        hits: List[Tuple[int, dict, dict, int]] = []
+        for f in files:
+            # 이미 limit 개를 모았고 이 파일 id 가 전부 그 바깥이면 중단
+            if len(hits) >= limit and (f["first_id"] > hits[-1][0] if oldest_first else f["last_id"] < hits[-1][0]):
+                break
+            cols, nulls = _load_file(str(self._table_dir(table) / f["path"]), table)
+            idx = np.nonzero(self._mask(cols, sku, lo, hi, before_id, after_id))[0]
+            order = np.argsort(cols["id"][idx], kind="stable")
+            idx = idx[(order if oldest_first else order[::-1])[:limit]]
+            hits.extend((int(cols["id"][i]), cols, nulls, int(i)) for i in idx)
+            hits.sort(key=lambda h: h[0], reverse=not oldest_first)
+            del hits[limit:]
+
+        return [_row(cols, nulls, kinds, i) for _, cols, nulls, i in hits]
+
+    def overlaps(self, table: str, sku: Optional[str] = None, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None, before_id: Optional[int] = None,
+                 after_id: Optional[int] = None) -> bool:
+        """manifest 만 보고 조건에 걸릴 수 있는 아카이브 파일이 있는지"""
+        return bool(self._files(table, sku, to_ns(since), to_ns(until), before_id, after_id))
+
+    def iter_rows(self, table: str, sku: Optional[str] = None, since: Optional[datetime] = None,
+                  until: Optional[datetime] = None, after_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """조건에 맞는 아카이브 행을 id 오름차순으로.
+
+        id 범위가 겹치는 파일끼리만 함께 올리고(보통 파일 하나) 나머지는 파일 단위로 흘려보낸다.
+        """
+        lo, hi = to_ns(since), to_ns(until)
+        kinds = _column_kinds(table)
+
+        def emit(group: List[dict]) -> Iterator[Dict[str, Any]]:
+            import numpy as np
+
+            parts = []
+            for f in group:
+                cols, nulls = _load_file(str(self._table_dir(table) / f["path"]), table)
+                idx = np.nonzero(self._mask(cols, sku, lo, hi, None, after_id))[0]
+                parts.extend((int(cols["id"][i]), cols, nulls, int(i)) for i in idx)
+            parts.sort(key=lambda p: p[0])
+            for _, cols, nulls, i in parts:
+                yield _row(cols, nulls, kinds, i)
+
+        group: List[dict] = []
+        group_last = -1
+        for f in self._files(table, sku, lo, hi, None, after_id):
+            if group and f["first_id"] > group_last:
+                yield from emit(group)
+                group = []
+            group.append(f)
+            group_last = max(group_last, f["last_id"])
+        if group:
+            yield from emit(group)
+
+    def get(self, table: str, row_id: int) -> Optional[Dict[str, Any]]:
+        import numpy as np
+
+        for f in self.manifest(table)["files"]:
+            if f["first_id"] <= row_id <= f["last_id"]:
+                cols, nulls = _load_file(str(self._table_dir(table) / f["path"]), table)
+                hit = np.nonzero(cols["id"] == row_id)[0]
+                if len(hit):
+                    return _row(cols, nulls, _column_kinds(table), int(hit[0]))
+        return None
+
+    def stats(self) -> Dict[str, dict]:
+        out = {}
+        for table in ARCHIVE_MODELS:
+            files = self.manifest(table)["files"]
+            size = 0
+            for f in files:
+                p = self._table_dir(table) / f["path"]
+                size += p.stat().st_size if p.exists() else 0
+            out[table] = {
+                "rows": sum(f["rows"] for f in files),
+                "files": len(files),
+                "bytes": size,
+                "first_ts": _from_ns(min(f["min_ts"] for f in files)).isoformat() if files else None,
+                "last_ts": _from_ns(max(f["max_ts"] for f in files)).isoformat() if files else None,
+            }
+        return out
+
+
+archive_store = ArchiveStore()
+
+
+# ---------------------------------------------------
+# 조회 서비스용 (DB 결과 + 아카이브)
+# ---------------------------------------------------
+
+def _archive_window(live: List[Any], limit: int, before_id: Optional[int],
+                    after_id: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+    """아카이브에서 이 페이지에 끼어들 수 있는 id 범위 (after_id, before_id)
+
+    live 가 꽉 찼으면 live 의 경계 id 바깥 행은 다음 페이지 몫이다.
+    """
+    if len(live) >= limit:
+        if after_id is not None:
+            edge = live[0].id  # after_id 페이지의 가장 큰 id
+            before_id = edge if before_id is None else min(before_id, edge)
+        else:
+            edge = live[-1].id  # 내림차순 페이지의 가장 작은 id
+            after_id = edge if after_id is None else max(after_id, edge)
+    return after_id, before_id
+
+
+def needs_archive(table: str, live: List[Any], sku: Optional[str] = None,
+                  since: Optional[datetime] = None, until: Optional[datetime] = None,
+                  limit: int = 50, before_id: Optional[int] = None, after_id: Optional[int] = None) -> bool:
+    """manifest 만 보고 이 페이지에 아카이브 행이 섞일 수 있는지 (async 서비스의 to_thread 여부 판단용)"""
+    if not archive_store.has_rows(table):
+        return False
+    lo_id, hi_id = _archive_window(live, limit, before_id, after_id)
+    return archive_store.overlaps(table, sku=sku, since=since, until=until, before_id=hi_id, after_id=lo_id)
+
+
+def merge_with_archive(table: str, live: List[Any], sku: Optional[str] = None,
+                       since: Optional[datetime] = None, until: Optional[datetime] = None,
+                       limit: int = 50, before_id: Optional[int] = None,
+                       after_id: Optional[int] = None) -> List[Any]:
+    """DB 결과(live, id 내림차순 한 페이지)에 아카이브 행을 ORM 객체(세션 밖)로 만들어 합친다.
+
+    - 기본 / before_id : before_id 아래에서 가장 큰 id limit 개
+    - after_id         : after_id 바로 위에서 가장 작은 id limit 개 (결과는 내림차순)
+    manifest 의 id/시간 범위로 끼어들 파일이 없으면 파일을 열지 않는다.
+    """
+    if not needs_archive(table, live, sku, since, until, limit, before_id, after_id):
+        return live
+
+    lo_id, hi_id = _archive_window(live, limit, before_id, after_id)
+    model = ARCHIVE_MODELS[table]
+    seen = {r.id for r in live}
+    rows = archive_store.query(table, sku=sku, since=since, until=until, limit=limit,
+                               before_id=hi_id, after_id=lo_id, oldest_first=after_id is not None)
+    archived = [model(**r) for r in rows if r["id"] not in seen]
+    if not archived:
+        return live
+
+    merged = sorted(live + archived, key=lambda r: r.id)
+    # after_id 면 after_id 에 가까운(오래된) 쪽 limit 개, 아니면 최신 쪽 limit 개
+    page = merged[:limit] if after_id is not None else merged[-limit:]
+    return page[::-1]
+
+
+def get_archived(table: str, row_id: int) -> Optional[Any]:
+    """DB 에 없는 id 를 아카이브에서 찾아 ORM 객체(세션 밖)로"""
+    if not archive_store.has_rows(table):
+        return None
+    row = archive_store.get(table, row_id)
+    return ARCHIVE_MODELS[table](**row) if row is not None else None
@@ -0,0 +1,203 @@
+"""
+app/db/migrate_cycles.py
+
+cycles 테이블 인덱스/파티션 관리 (alembic 없이 create_all 로 만든 기존 DB 용).
+
+- indexes           : 모델에 선언된 복합/partial 인덱스를 기존 DB 에 생성 (cycles, alarms)
+                      이름은 같고 컬럼이 모델과 다른 인덱스는 다시 생성
+                      (--drop-redundant 면 다른 인덱스로 대체된 ix_cycles_sku / ix_cycles_seq /
+                      ix_cycles_sku_created_at_quality 제거)
+- partition         : (PostgreSQL) cycles 를 created_at 월 단위 RANGE 파티션 테이블로 변환
+                      PK 는 (id, created_at) 로 바뀌지만 id 는 기존 sequence 를 그대로 써서 유일하다.
+- ensure-partitions : (PostgreSQL) 이번 달 ~ N개월 뒤 파티션을 미리 생성 (파티션 테이블이 아니면 no-op)
+                      앱 기동 시 CYCLES_PARTITION_MONTHS_AHEAD 로도 실행된다.
+
+보존 기간이 지나 비워진 월 파티션은 retention_service 가 drop_cycle_partitions_before 로 정리한다.
+
+사용법 (backend 폴더에서):
+
+    $ python -m app.db.migrate_cycles indexes --drop-redundant
+    $ python -m app.db.migrate_cycles partition --months-ahead 3
+    $ python -m app.db.migrate_cycles ensure-partitions
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from datetime import date
+from typing import List
+
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from app.core.config import settings
+from app.db.models.cycle import Cycle
+from app.db.models.quality import Alarm
+from app.db.session import engine as default_engine
+
+REDUNDANT_INDEXES = ("ix_cycles_sku", "ix_cycles_seq", "ix_cycles_sku_created_at_quality")
+
+
+def _cycle_indexes() -> List[Index]:
+    return sorted(Cycle.__table__.indexes, key=lambda i: i.name)
+
+
+def create_cycle_indexes(engine: Engine, drop_redundant: bool = False) -> List[str]:
+    """모델의 cycles (+ alarms 기간 집계용) 인덱스 중 없거나 컬럼이 다른 것만 생성. 반환: 생성한 인덱스 이름"""
+    created = []
+    with engine.begin() as conn:
+        existing = {ix["name"]: ix["column_names"]
+                    for t in ("cycles", "alarms") for ix in inspect(conn).get_indexes(t)}
+        for ix in _cycle_indexes() + sorted(Alarm.__table__.indexes, key=lambda i: i.name):
+            if ix.name in existing:
+                if existing[ix.name] == [c.name for c in ix.columns]:
+                    continue
+                print(f"[MIGRATE] rebuild index {ix.name} (columns changed)")
+                ix.drop(conn)
+            else:
+                print(f"[MIGRATE] create index {ix.name}")
+            ix.create(conn)
+            created.append(ix.name)
+
+        if drop_redundant:
+            for name in REDUNDANT_INDEXES:
+                if name in existing:
+                    print(f"[MIGRATE] drop index {name}")
+                    conn.execute(text(f"DROP INDEX {name}"))
+
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE cycles"))
+    return created
+
+
+# ---------------------------------------------------
+# PostgreSQL 월 단위 파티션
+# ---------------------------------------------------
+
+def _month_start(d: date, add: int = 0) -> date:
+    m = d.year * 12 + (d.month - 1) + add
+    return date(m // 12, m % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"cycles_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('cycles')"
+    )).first())
+
+
+def _create_month_partitions(conn: Connection, first: date, last: date) -> List[str]:
+    created = []
+    month = _month_start(first)
+    while month <= last:
+        name = _partition_name(month)
+        exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists is None:
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF cycles "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month_start(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        month = _month_start(month, 1)
+    return created
+
+
+def ensure_cycle_partitions(engine: Engine, months_ahead: int = 3) -> List[str]:
+    """이번 달부터 months_ahead 개월 뒤까지 파티션 생성 (파티션 테이블이 아니면 아무것도 안 함)"""
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return []
+        today = date.today()
+        created = _create_month_partitions(conn, today, _month_start(today, months_ahead))
+    if created:
+        print(f"[MIGRATE] created partitions: {created}")
+    return created
+
+
+def drop_cycle_partitions_before(engine: Engine, cutoff: date) -> List[str]:
+    """범위 끝이 cutoff 이전이고 비어 있는 월 파티션 삭제 (파티션 테이블이 아니면 아무것도 안 함)"""
+    dropped = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return []
+        names = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass('cycles')"
+        )).scalars().all()
+        for name in sorted(names):
+            m = re.fullmatch(r"cycles_y(\d{4})m(\d{2})", name)
+            if not m or _month_start(date(int(m[1]), int(m[2]), 1), 1) > cutoff:
+                continue
+            if conn.execute(text(f"SELECT 1 FROM {name} LIMIT 1")).first() is None:
+                conn.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+    if dropped:
+        print(f"[MIGRATE] dropped empty partitions: {dropped}")
+    return dropped
+
+
+def partition_cycles_by_month(engine: Engine, months_ahead: int = 3) -> None:
+    """기존 cycles → created_at 월 RANGE 파티션 테이블 (한 트랜잭션, 실패 시 전체 롤백)
+
+    1) 기존 테이블을 cycles_unpartitioned 로 rename
+    2) 같은 컬럼/기본값(id sequence 포함)으로 파티션 부모 생성, PK (id, created_at)
+    3) 데이터가 있는 달 ~ months_ahead 개월 뒤 월 파티션 + DEFAULT 파티션
+    4) 데이터 복사 → sequence 소유권 이전 → 기존 테이블 삭제
+    5) 모델 인덱스를 부모에 생성 (모든 파티션에 전파)
+    """
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError("cycles 파티셔닝은 PostgreSQL 에서만 지원합니다.")
+
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            print("[MIGRATE] cycles is already partitioned")
+            return
+
+        conn.execute(text("ALTER TABLE cycles RENAME TO cycles_unpartitioned"))
+        conn.execute(text("ALTER TABLE cycles_unpartitioned RENAME CONSTRAINT cycles_pkey TO cycles_unpartitioned_pkey"))
+        conn.execute(text(
+            "CREATE TABLE cycles (LIKE cycles_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (created_at)"
+        ))
+        conn.execute(text("ALTER TABLE cycles ADD PRIMARY KEY (id, created_at)"))
+
+        first = conn.execute(text("SELECT min(created_at) FROM cycles_unpartitioned")).scalar()
+        today = date.today()
+        created = _create_month_partitions(conn, (first.date() if first else today), _month_start(today, months_ahead))
+        conn.execute(text("CREATE TABLE cycles_default PARTITION OF cycles DEFAULT"))
+
+        n = conn.execute(text("INSERT INTO cycles SELECT * FROM cycles_unpartitioned")).rowcount
+        conn.execute(text("ALTER SEQUENCE cycles_id_seq OWNED BY cycles.id"))
+        conn.execute(text("DROP TABLE cycles_unpartitioned"))
+
+        for ix in _cycle_indexes():
+            conn.execute(CreateIndex(ix))
+        conn.execute(text("ANALYZE cycles"))
+
+    print(f"[MIGRATE] cycles partitioned by month: {len(created)} partitions, {n} rows copied")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cmd", choices=["indexes", "partition", "ensure-partitions"])
+    parser.add_argument("--drop-redundant", action="store_true", help="복합 인덱스로 대체된 단일 인덱스 제거")
+    parser.add_argument("--months-ahead", type=int, default=settings.CYCLES_PARTITION_MONTHS_AHEAD)
+    args = parser.parse_args()
+
+    if args.cmd == "indexes":
+        create_cycle_indexes(default_engine, drop_redundant=args.drop_redundant)
+    elif args.cmd == "partition":
+        partition_cycles_by_month(default_engine, months_ahead=args.months_ahead)
+    else:
+        ensure_cycle_partitions(default_engine, months_ahead=args.months_ahead)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,3 +6,8 @@ from app.db.models.recipe import Recipe  # noqa: F401
 from app.db.models.cycle import Cycle  # noqa: F401
 from app.db.models.r2r_state import R2RState  # noqa: F401
 from app.db.models.quality import SpcState, Alarm  # noqa: F401
+from app.db.models.line_state import LineState  # noqa: F401
+from app.db.models.sku_latest import SkuLatest  # noqa: F401
+
+# sku_latest 갱신 훅(Session after_flush) 등록
+import app.db.sku_latest  # noqa: E402,F401
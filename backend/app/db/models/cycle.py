@@ -1,6 +1,6 @@
 # app/db/models/cycle.py
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, func
 from app.db.session import Base
 
 
@@ -9,12 +9,15 @@ class Cycle(Base):
     한 번의 충전 사이클 로그.
     - seq: 라인 내에서의 캔 시퀀스 번호
     - sku: Recipe.sku_id (음료 SKU)
+
+    인덱스는 hot query 접근 경로(sku 필터 + id/seq/created_at 정렬)에 맞춘 복합 인덱스.
+    sku / seq 단일 인덱스는 복합 인덱스 prefix 로 대체 (기존 DB 는 python -m app.db.migrate_cycles indexes).
     """
     __tablename__ = "cycles"
 
     id = Column(Integer, primary_key=True, index=True)
-    seq = Column(Integer, index=True, nullable=False)
-    sku = Column(String(32), index=True, nullable=False)
+    seq = Column(Integer, nullable=False)
+    sku = Column(String(32), nullable=False)
 
     target_ml = Column(Float, nullable=False)
     actual_ml = Column(Float, nullable=True)
@@ -29,4 +32,23 @@ class Cycle(Base):
         DateTime(timezone=True),
         server_default=func.now(),
         nullable=False,
+    )
+
+    __table_args__ = (
+        # 마지막 cycle / SKU별 max(id) / _fallback_target_ml (target_ml 포함 → index-only)
+        Index("ix_cycles_sku_id", "sku", "id", "target_ml"),
+        # get_last_seq_for_sku / get_last_seqs_for_skus / (seq, sku) 조회 → index-only
+        Index("ix_cycles_sku_seq", "sku", "seq"),
+        # get_recent_cycles_for_sku / 목록 API (created_at, id 정렬)
+        # + /quality/trend 기간 bucket 집계 (error / actual_ml 포함 → index-only)
+        #   id 가 유일하므로 뒤의 error / actual_ml 은 정렬에 영향 없이 값만 싣는다 (PG INCLUDE 와 같은 효과, SQLite 공통)
+        Index("ix_cycles_sku_created_at", "sku", "created_at", "id", "error", "actual_ml"),
+        # 기간 조회 (LSTM-B 학습 데이터 since/until, 전체 목록 created_at 정렬)
+        Index("ix_cycles_created_at", "created_at", "id"),
+        # get_recent_errors_for_sku → error 있는 행만 담은 partial covering 인덱스 (index-only)
+        Index(
+            "ix_cycles_sku_id_error", "sku", "id", "error",
+            postgresql_where=error.is_not(None),
+            sqlite_where=error.is_not(None),
+        ),
     )
\ No newline at end of file
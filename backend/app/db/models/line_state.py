@@ -0,0 +1,20 @@
+# app/db/models/line_state.py
+
+from sqlalchemy import Column, String, DateTime, func
+from app.db.session import Base
+
+
+class LineState(Base):
+    """
+    라인별 현재 SKU (can_in / fill_result 에서 갱신, /control/current_sku 조회).
+    """
+    __tablename__ = "line_state"
+
+    line_id = Column(String(32), primary_key=True)
+    current_sku = Column(String(32), nullable=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -1,6 +1,6 @@
 # app/db/models/quality.py
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, func
 from app.db.session import Base
 
 
@@ -53,3 +53,8 @@ class Alarm(Base):
         server_default=func.now(),
         nullable=False,
     )
+
+    __table_args__ = (
+        # /quality/trend 기간 bucket 별 레벨 건수 (index-only)
+        Index("ix_alarms_sku_created_at", "sku", "created_at", "level"),
+    )
@@ -0,0 +1,48 @@
+# app/db/models/sku_latest.py
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, func
+from app.db.session import Base
+
+
+class SkuLatest(Base):
+    """
+    (라인, SKU) 별 최신 상태 read model.
+
+    cycles / spc_states / alarms 를 쓰는 같은 트랜잭션에서 app.db.sku_latest 가 갱신하고,
+    "SKU 의 마지막 행" 조회(마지막 cycle, 현재 SPC 상태, fallback target 등)는 PK 1건 조회로 끝낸다.
+    각 묶음(cycle / SPC / 알람)은 id 가 더 큰 행으로만 덮어쓴다 (늦게 도착한 이벤트로 되돌아가지 않게).
+    """
+    __tablename__ = "sku_latest"
+
+    line_id = Column(String(32), primary_key=True)
+    sku = Column(String(32), primary_key=True)
+
+    # 마지막 cycle
+    last_cycle_id = Column(Integer, nullable=True)
+    last_seq = Column(Integer, nullable=True)
+    target_ml = Column(Float, nullable=True)
+    valve_ms = Column(Float, nullable=True)
+    actual_ml = Column(Float, nullable=True)
+    error = Column(Float, nullable=True)
+
+    # 마지막 SPC 평가 (spc_states)
+    spc_state_id = Column(Integer, nullable=True)
+    spc_state = Column(String(32), nullable=True)
+    spc_alarm_type = Column(String(32), nullable=True)
+    spc_mean = Column(Float, nullable=True)
+    spc_std = Column(Float, nullable=True)
+    cusum_pos = Column(Float, nullable=True)
+    cusum_neg = Column(Float, nullable=True)
+    n_samples = Column(Integer, nullable=True)
+
+    # 마지막 알람 (alarms)
+    last_alarm_id = Column(Integer, nullable=True)
+    alarm_level = Column(String(16), nullable=True)
+    alarm_type = Column(String(32), nullable=True)
+    alarm_at = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
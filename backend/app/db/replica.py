@@ -0,0 +1,140 @@
+# app/db/replica.py
+"""
+읽기 전용 엔드포인트의 replica 라우팅 (freshness bound).
+
+대시보드 조회(Android 앱, 각종 패널의 API polling)가 ingest 가 쓰는 primary 에 부하를 주지 않도록
+cycles / quality / alarms / recipe 조회는 DATABASE_REPLICA_URL 로 보낸다.
+쓰기와 control 경로(/control/*, POST/PATCH/DELETE)는 계속 primary.
+
+- replica 지연(lag)을 REPLICA_CHECK_S 주기로 확인해 캐시, REPLICA_MAX_LAG_S 이하일 때만 replica 사용
+- PostgreSQL hot standby:
+    * WAL receiver 가 streaming 이 아니면(primary 와 끊김) 지연을 알 수 없음 → fresh 아님
+      (받은 것은 다 재생했으니 LSN 비교만으로는 지연 0 으로 보이지만 실제로는 계속 낡아 간다)
+    * 받은 WAL 을 다 재생했으면 now() - primary 에서 마지막으로 메시지(WAL/keepalive)를 받은 시각
+      (primary 가 한동안 쓰기가 없을 때 재생 시각 기준으로 지연이 커 보이는 오탐을 막기 위해)
+    * 아니면 now() - 마지막 재생 트랜잭션 시각
+  pg_stat_wal_receiver 는 replica 접속 계정에 pg_read_all_stats 권한이 있어야 보인다 (없으면 항상 primary).
+  쓰기가 없을 때 primary keepalive 주기(wal_sender_timeout / 2)가 REPLICA_MAX_LAG_S 보다 길면 그 사이엔 primary 로 읽는다.
+- 그 외 dialect(예: SQLite 파일 복제본)는 지연을 알 수 없어 0 으로 본다
+- 확인 실패(접속 불가 등)면 다음 확인 때까지 primary
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import session as db_session
+
+# NULL = 지연을 알 수 없음 (receiver 끊김 / 아직 재생한 트랜잭션 없음)
+_PG_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            THEN EXTRACT(EPOCH FROM now() - (SELECT max(last_msg_receipt_time) FROM pg_stat_wal_receiver))
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+_UNKNOWN_LAG = "replica lag unknown (WAL receiver not streaming)"
+
+
+class ReplicaRouter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.lag_s: Optional[float] = None
+        self.error: Optional[str] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    @property
+    def configured(self) -> bool:
+        return db_session.REPLICA_DATABASE_URL is not None
+
+    def _claim_check(self) -> bool:
+        # 주기가 됐으면 이 요청 하나만 확인 (동시 요청이 한꺼번에 확인 쿼리를 보내지 않게)
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < settings.REPLICA_CHECK_S:
+                return False
+            self._checked_at = now
+            return True
+
+    def _record(self, lag_s: Optional[float], error: Optional[str]) -> None:
+        if lag_s is None and error is None:
+            error = _UNKNOWN_LAG
+        with self._lock:
+            self.lag_s = lag_s
+            self.error = error
+            self._checked_at = time.monotonic()
+
+    def _fresh(self) -> bool:
+        return self.error is None and self.lag_s is not None and self.lag_s <= settings.REPLICA_MAX_LAG_S
+
+    def _count(self, use_replica: bool) -> bool:
+        with self._lock:
+            if use_replica:
+                self.replica_reads += 1
+            else:
+                self.primary_reads += 1
+        return use_replica
+
+    # ========== 지연 확인 ==========
+
+    def check(self) -> None:
+        try:
+            with db_session.read_engine.connect() as conn:
+                lag = conn.execute(_PG_LAG_SQL).scalar() if conn.dialect.name == "postgresql" else 0.0
+            self._record(None if lag is None else float(lag), None)
+        except Exception as e:
+            self._record(None, repr(e))
+
+    async def check_async(self) -> None:
+        try:
+            async with db_session.async_read_engine.connect() as conn:
+                lag = (await conn.execute(_PG_LAG_SQL)).scalar() if conn.dialect.name == "postgresql" else 0.0
+            self._record(None if lag is None else float(lag), None)
+        except Exception as e:
+            self._record(None, repr(e))
+
+    # ========== 라우팅 ==========
+
+    def use_replica(self) -> bool:
+        if not self.configured:
+            return self._count(False)
+        if self._claim_check():
+            self.check()
+        return self._count(self._fresh())
+
+    async def use_replica_async(self) -> bool:
+        if not self.configured:
+            return self._count(False)
+        if self._claim_check():
+            await self.check_async()
+        return self._count(self._fresh())
+
+    def read_engine(self):
+        """조회용 sync 엔진 (export 스트리밍 등 세션 없이 connection 을 직접 여는 곳)"""
+        return db_session.read_engine if self.use_replica() else db_session.engine
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "configured": self.configured,
+                "fresh": self.configured and self._fresh(),
+                "lag_s": None if self.lag_s is None else round(self.lag_s, 3),
+                "max_lag_s": settings.REPLICA_MAX_LAG_S,
+                "error": self.error,
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+            }
+
+
+replica_router = ReplicaRouter()
@@ -1,18 +1,67 @@
 # app/db/session.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# PostgreSQL용 엔진
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    future=True,
-)
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def sqlite_pragmas() -> list:
+    """LOCAL tier(SQLite) 연결마다 적용할 PRAGMA.
+
+    - WAL: 읽기(대시보드)가 쓰기(ingest)를 막지 않고, commit 이 WAL 파일 append 로 끝난다
+    - synchronous=NORMAL: WAL 에서는 checkpoint 때만 fsync (전원 차단 시 마지막 commit 몇 개만 유실, DB 손상 없음)
+    - cache_size / mmap_size: 최근 cycles 인덱스 페이지를 메모리에 유지
+    - busy_timeout: 다른 writer 가 잠금 중이면 즉시 'database is locked' 대신 대기
+    """
+    pragmas = []
+    if settings.SQLITE_JOURNAL_MODE:
+        pragmas.append(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    if settings.SQLITE_SYNCHRONOUS:
+        pragmas.append(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    if settings.SQLITE_CACHE_KB > 0:
+        pragmas.append(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_KB}")
+    if settings.SQLITE_MMAP_MB > 0:
+        pragmas.append(f"PRAGMA mmap_size={settings.SQLITE_MMAP_MB * 1024 * 1024}")
+    pragmas.append("PRAGMA temp_store=MEMORY")
+    pragmas.append(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    return pragmas
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _create_sync_engine(url: str):
+    if is_sqlite(url):
+        # SQLite(LOCAL tier): 파일 DB 라 pre-ping 불필요, 잠금 대기는 busy_timeout 으로
+        eng = create_engine(
+            url,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000.0},
+            future=True,
+        )
+        event.listen(eng, "connect", _apply_sqlite_pragmas)
+        return eng
+    # PostgreSQL용 엔진
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        future=True,
+    )
+
+
+engine = _create_sync_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -20,4 +69,68 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
-Base = declarative_base()
\ No newline at end of file
+# 읽기 전용 replica (대시보드 조회 엔드포인트용, app.db.replica 가 지연 확인 후 라우팅).
+# DATABASE_REPLICA_URL 이 없으면 primary 를 그대로 가리킨다.
+REPLICA_DATABASE_URL = settings.DATABASE_REPLICA_URL or None
+
+if REPLICA_DATABASE_URL:
+    read_engine = _create_sync_engine(REPLICA_DATABASE_URL)
+    ReadSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine,
+    )
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+Base = declarative_base()
+
+
+def to_async_url(url: str) -> str:
+    """동기 DB URL → async 드라이버 URL (postgres: asyncpg, sqlite: aiosqlite)"""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://") and not url.startswith("sqlite+aiosqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+# ASYNC_DB=true 일 때만 async 엔진 생성 (asyncpg/aiosqlite 미설치 환경 보호)
+async_engine = None
+AsyncSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+
+if settings.ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    def _create_async_engine(url: str):
+        if is_sqlite(url):
+            eng = create_async_engine(to_async_url(url))
+            event.listen(eng.sync_engine, "connect", _apply_sqlite_pragmas)
+            return eng
+        return create_async_engine(
+            to_async_url(url),
+            pool_pre_ping=True,
+        )
+
+    async_engine = _create_async_engine(SQLALCHEMY_DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    if REPLICA_DATABASE_URL:
+        async_read_engine = _create_async_engine(REPLICA_DATABASE_URL)
+        AsyncReadSessionLocal = async_sessionmaker(
+            bind=async_read_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    else:
+        async_read_engine = async_engine
+        AsyncReadSessionLocal = AsyncSessionLocal
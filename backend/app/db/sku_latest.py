@@ -0,0 +1,174 @@
+# app/db/sku_latest.py
+"""
+sku_latest read model 유지 / 조회.
+
+- ORM 으로 Cycle / SpcState / Alarm 을 넣거나 고치면 같은 flush(=같은 트랜잭션)에서 upsert
+  (Session after_flush 훅: MQTT can_in / fill_result, valve_ms 갱신, compute_spc_for_sku, 예측 알람 등 전부)
+- Core executemany(bulk_create_cycles)처럼 ORM 을 거치지 않는 쓰기는 record_* 를 직접 호출
+- 묶음별(cycle / SPC / 알람) id 가 더 큰 행으로만 덮어씀
+- cycles 에는 라인 컬럼이 없어 line_id 는 ingest 와 같은 "line1" (line_state 와 같은 기준)
+- 조회는 get_latest(PK 1건), 행이 없으면 호출 쪽이 기존 ORDER BY id DESC LIMIT 1 로 fallback
+- 기존 DB 는 rebuild 로 한 번 채움 (warmup 이 sku_latest 가 비어 있으면 자동 실행)
+
+    $ python -m app.db.sku_latest rebuild
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import desc, event, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.models.cycle import Cycle
+from app.db.models.quality import Alarm, SpcState
+from app.db.models.sku_latest import SkuLatest
+from app.db.upsert import upsert
+
+LINE_ID = "line1"
+KEY = ["line_id", "sku"]
+
+
+def _latest_by_sku(rows: Iterable[Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for r in rows:
+        cur = out.get(r.sku)
+        if cur is None or r.id > cur.id:
+            out[r.sku] = r
+    return out
+
+
+def _upsert(db: Session, values: Dict[str, Any], id_col) -> None:
+    upsert(
+        db, SkuLatest.__table__, values, key=KEY,
+        extra_set={"updated_at": func.now()},
+        where=or_(id_col.is_(None), id_col <= values[id_col.key]),
+    )
+
+
+def record_cycles(db: Session, rows: Iterable[Any], line_id: str = LINE_ID) -> None:
+    """rows: id / seq / sku / target_ml / valve_ms / actual_ml / error 속성을 가진 행 (Cycle 또는 RETURNING 결과)"""
+    for sku, c in _latest_by_sku(rows).items():
+        _upsert(db, {
+            "line_id": line_id, "sku": sku, "last_cycle_id": c.id, "last_seq": c.seq,
+            "target_ml": c.target_ml, "valve_ms": c.valve_ms, "actual_ml": c.actual_ml, "error": c.error,
+        }, SkuLatest.last_cycle_id)
+
+
+def record_spc_states(db: Session, rows: Iterable[SpcState], line_id: str = LINE_ID) -> None:
+    for sku, s in _latest_by_sku(rows).items():
+        _upsert(db, {
+            "line_id": line_id, "sku": sku, "spc_state_id": s.id, "spc_state": s.spc_state,
+            "spc_alarm_type": s.alarm_type, "spc_mean": s.mean, "spc_std": s.std,
+            "cusum_pos": s.cusum_pos, "cusum_neg": s.cusum_neg, "n_samples": s.n_samples,
+        }, SkuLatest.spc_state_id)
+
+
+def record_alarms(db: Session, rows: Iterable[Alarm], line_id: str = LINE_ID) -> None:
+    for sku, a in _latest_by_sku(rows).items():
+        _upsert(db, {
+            "line_id": line_id, "sku": sku, "last_alarm_id": a.id, "alarm_level": a.level,
+            "alarm_type": a.alarm_type,
+            # created_at 은 server_default 라 flush 직후엔 만료 상태 → 다시 읽지 않고 now()
+            "alarm_at": a.__dict__.get("created_at") or func.now(),
+        }, SkuLatest.last_alarm_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    # after_flush 시점: id 는 채워졌고 session.new / dirty 는 아직 flush 전 목록
+    touched = [o for o in session.new] + [o for o in session.dirty if session.is_modified(o)]
+    if not touched:
+        return
+    cycles = [o for o in touched if isinstance(o, Cycle)]
+    spc = [o for o in touched if isinstance(o, SpcState)]
+    alarms = [o for o in touched if isinstance(o, Alarm)]
+    if cycles:
+        record_cycles(session, cycles)
+    if spc:
+        record_spc_states(session, spc)
+    if alarms:
+        record_alarms(session, alarms)
+
+
+# ========== 조회 ==========
+
+def get_latest(db: Session, sku: str, line_id: str = LINE_ID) -> Optional[SkuLatest]:
+    # upsert 는 Core 문장이라 identity map 의 객체를 고치지 않음 → 항상 다시 읽음 (PK 1건)
+    return db.get(SkuLatest, (line_id, sku), populate_existing=True)
+
+
+async def get_latest_async(db: AsyncSession, sku: str, line_id: str = LINE_ID) -> Optional[SkuLatest]:
+    return await db.get(SkuLatest, (line_id, sku), populate_existing=True)
+
+
+def latest_sku_stmt(line_id: str = LINE_ID):
+    """라인에서 가장 최근 cycle 의 SKU (SKU 수만큼의 작은 테이블)"""
+    return (
+        select(SkuLatest.sku)
+        .where(SkuLatest.line_id == line_id, SkuLatest.last_cycle_id.is_not(None))
+        .order_by(desc(SkuLatest.last_cycle_id))
+        .limit(1)
+    )
+
+
+# ========== 재구성 ==========
+
+def refresh_cycles(db: Session, skus: Iterable[str], line_id: str = LINE_ID) -> None:
+    """Core executemany 로 넣은 cycle 반영: SKU마다 (sku, id) 인덱스 끝 1건을 읽어 upsert (commit 은 호출자)"""
+    for sku in set(skus):
+        c = db.execute(
+            select(Cycle.id, Cycle.seq, Cycle.sku, Cycle.target_ml, Cycle.valve_ms, Cycle.actual_ml, Cycle.error)
+            .where(Cycle.sku == sku).order_by(desc(Cycle.id)).limit(1)
+        ).first()
+        if c is not None:
+            record_cycles(db, [c], line_id)
+
+
+def rebuild(db: Session, skus: Optional[List[str]] = None, line_id: str = LINE_ID) -> int:
+    """cycles / spc_states / alarms 에서 SKU별 마지막 행을 다시 읽어 채움 (commit 은 호출자)"""
+    if skus is None:
+        skus = sorted(set(db.scalars(select(Cycle.sku).distinct())) | set(db.scalars(select(SpcState.sku).distinct())))
+    refresh_cycles(db, skus, line_id)
+    for sku in skus:
+        s = db.scalars(select(SpcState).where(SpcState.sku == sku).order_by(desc(SpcState.id)).limit(1)).first()
+        a = db.scalars(select(Alarm).where(Alarm.sku == sku).order_by(desc(Alarm.id)).limit(1)).first()
+        if s is not None:
+            record_spc_states(db, [s], line_id)
+        if a is not None:
+            record_alarms(db, [a], line_id)
+    return len(skus)
+
+
+def rebuild_if_empty(db: Session) -> int:
+    if db.execute(select(SkuLatest.sku).limit(1)).first() is not None:
+        return 0
+    n = rebuild(db)
+    db.commit()
+    if n:
+        print(f"[SKU_LATEST] rebuilt {n} SKUs")
+    return n
+
+
+def main() -> None:
+    import argparse
+
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cmd", choices=["rebuild"])
+    parser.add_argument("--sku", action="append", help="특정 SKU 만 (여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        n = rebuild(db, skus=args.sku)
+        db.commit()
+        print(f"[SKU_LATEST] rebuilt {n} SKUs")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
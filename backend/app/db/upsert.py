@@ -0,0 +1,55 @@
+# app/db/upsert.py
+"""
+dialect 공통 upsert (INSERT ... ON CONFLICT (key) DO UPDATE).
+
+PostgreSQL / SQLite(3.24+) 는 각 dialect 의 insert().on_conflict_do_update 로 한 문장,
+그 외 dialect 는 UPDATE 후 없으면 INSERT 로 처리한다.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from sqlalchemy import Table, and_, exists, insert, select, update
+from sqlalchemy.orm import Session
+
+
+def upsert(
+    db: Session,
+    table: Table,
+    values: Mapping[str, Any],
+    key: Sequence[str],
+    update_cols: Optional[Sequence[str]] = None,
+    extra_set: Optional[Mapping[str, Any]] = None,
+    where: Any = None,
+) -> None:
+    """key 컬럼이 같은 행이 있으면 갱신, 없으면 values 로 삽입 (commit 은 호출자)
+
+    update_cols: 새 값(values)으로 덮어쓸 컬럼 (기본: key 를 뺀 values 전체)
+    extra_set  : 갱신 시 추가로 넣을 컬럼 → SQL 식 (예: {"updated_at": func.now()})
+    where      : 기존 행 조건 (거짓이면 갱신하지 않음, 예: table.c.version <= 새 version)
+    """
+    if update_cols is None:
+        update_cols = [k for k in values if k not in key]
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        stmt = dialect_insert(table).values(**values)
+        set_: Dict[str, Any] = {c: stmt.excluded[c] for c in update_cols}
+        set_.update(extra_set or {})
+        db.execute(stmt.on_conflict_do_update(index_elements=list(key), set_=set_, where=where))
+        return
+
+    set_ = {c: values[c] for c in update_cols}
+    set_.update(extra_set or {})
+    match = and_(*(table.c[k] == values[k] for k in key))
+    cond = match if where is None else and_(match, where)
+    if db.execute(update(table).where(cond).values(**set_)).rowcount == 0:
+        # 조건(where) 때문에 갱신 안 된 것과 행이 없는 것을 구분
+        if not db.execute(select(exists().where(match))).scalar():
+            db.execute(insert(table).values(**values))
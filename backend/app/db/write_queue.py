@@ -0,0 +1,139 @@
+# app/db/write_queue.py
+"""
+ingest 쓰기 단일 writer 큐 (SQLite LOCAL tier 용).
+
+SQLite 는 writer 가 하나뿐이라 MQTT 스레드 / API threadpool / async 엔진이 동시에 쓰면
+잠금 대기(busy_timeout)나 읽기→쓰기 승격 실패('database is locked')가 생긴다.
+ingest 경로(MQTT can_in / fill_result 처리, /control/fill 의 cycle 삽입)를 전용 스레드 하나에서
+도착 순서대로 실행해 쓰기 경합을 없앤다.
+
+- DB_WRITE_QUEUE=auto 면 DATABASE_URL 이 SQLite 일 때만 켜진다 (PostgreSQL 은 기존대로 바로 실행).
+- submit / submit_with_session 은 Future 를 돌려주고(기다리지 않음), run / run_async 는 결과를 기다린다.
+  MQTT 핸들러는 밸브 계산 / publish 를 자기 스레드에서 하고 DB 쓰기만 submit_with_session 으로 넘긴다.
+- writer 스레드 안에서 다시 run 을 부르면 큐를 거치지 않고 바로 실행 (재진입 교착 방지).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.db.session import SQLALCHEMY_DATABASE_URL, SessionLocal, is_sqlite
+
+
+def _enabled_by_settings() -> bool:
+    mode = settings.DB_WRITE_QUEUE.lower()
+    if mode == "auto":
+        return is_sqlite(SQLALCHEMY_DATABASE_URL)
+    return mode in ("on", "true", "1")
+
+
+class WriteQueue:
+    def __init__(self, enabled: Optional[bool] = None, maxsize: Optional[int] = None) -> None:
+        self.enabled = _enabled_by_settings() if enabled is None else enabled
+        self._q: "queue.Queue" = queue.Queue(maxsize=maxsize or settings.DB_WRITE_QUEUE_MAX)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.done = 0
+        self.failed = 0
+        self.busy_s = 0.0
+        self.max_wait_ms = 0.0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            fut, fn, args, kwargs, t_enq = self._q.get()
+            if not fut.set_running_or_notify_cancel():
+                continue
+            t0 = time.perf_counter()
+            try:
+                fut.set_result(fn(*args, **kwargs))
+                ok = True
+            except BaseException as e:
+                fut.set_exception(e)
+                ok = False
+            t1 = time.perf_counter()
+            with self._lock:
+                self.done += 1
+                self.failed += 0 if ok else 1
+                self.busy_s += t1 - t0
+                self.max_wait_ms = max(self.max_wait_ms, (t0 - t_enq) * 1000.0)
+
+    def in_writer(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    # ========== 제출 ==========
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """writer 스레드에서 fn(*args) 실행 (비활성이거나 writer 스레드 안이면 바로 실행)"""
+        if not self.enabled or self.in_writer():
+            fut: Future = Future()
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+            return fut
+
+        self._ensure_thread()
+        fut = Future()
+        # 큐가 가득 차면 호출자가 기다린다 (ingest backpressure)
+        self._q.put((fut, fn, args, kwargs, time.perf_counter()))
+        return fut
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def submit_with_session(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """writer 스레드에서 새 세션으로 fn(db, *args) 실행 (기다리지 않음)"""
+        return self.submit(_with_session, fn, *args, **kwargs)
+
+    def run_with_session(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """writer 스레드에서 새 세션으로 fn(db, *args) 실행 후 결과 반환"""
+        return self.run(_with_session, fn, *args, **kwargs)
+
+    def write(self, db: Any, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """활성이면 writer 스레드(새 세션)에서, 아니면 호출자 세션 db 로 fn(db, *args) 실행"""
+        if not self.enabled:
+            return fn(db, *args, **kwargs)
+        return self.run_with_session(fn, *args, **kwargs)
+
+    async def run_with_session_async(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await self.run_async(_with_session, fn, *args, **kwargs)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "pending": self._q.qsize(),
+                "done": self.done,
+                "failed": self.failed,
+                "busy_ms": round(self.busy_s * 1000.0, 1),
+                "max_wait_ms": round(self.max_wait_ms, 1),
+            }
+
+
+def _with_session(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+write_queue = WriteQueue()
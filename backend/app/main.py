@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import asyncio
-from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.services.warmup_service import warmup_state  # 가장 먼저: 기동 시간 측정 기준점
+
 from app.core.config import settings
 from app.db.session import Base, engine
 from app.db import models  # noqa: F401
@@ -22,16 +24,15 @@ from app.api import ws as ws_router
 from app.api import admin_page as admin_page_router
 
 from app.mqtt.client import mqtt_client
-from app.ml.lstm_a import get_lstm_a_model
-from app.ml.lstm_b import load_lstm_b_model
 from app.ws.bus import ws_bus
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title=settings.APP_NAME)
 
-    # SQLite/PG 등 DB 테이블 생성
-    Base.metadata.create_all(bind=engine)
+    # SQLite/PG 등 DB 테이블 생성 (FAST_START 면 백그라운드 warmup 에서)
+    if not settings.FAST_START:
+        Base.metadata.create_all(bind=engine)
 
     origins = [
         origin.strip()
@@ -45,14 +46,15 @@ def create_app() -> FastAPI:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            # 브라우저 클라이언트가 keyset 페이지 커서를 읽을 수 있게 (app/api/deps.py)
+            expose_headers=["X-Next-Before-Id", "X-Next-After-Id"],
         )
 
-    # REST API
-    app.include_router(recipes_router.router, prefix="/api/v1")
-    app.include_router(cycles_router.router, prefix="/api/v1")
-    app.include_router(control_router.router, prefix="/api/v1")
-    app.include_router(quality_router.router, prefix="/api/v1")
-    app.include_router(alarms_router.router, prefix="/api/v1")
+    # REST API (ASYNC_DB=true 면 async 세션 버전 라우터 사용)
+    rest_routers = [recipes_router, cycles_router, control_router, quality_router, alarms_router]
+    for module in rest_routers:
+        router = module.async_router if settings.ASYNC_DB else module.router
+        app.include_router(router, prefix="/api/v1")
 
     # Option C: WebSocket + 관리자 최소 페이지
     app.include_router(ws_router.router)
@@ -60,21 +62,29 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     def health():
+        warmup_state.mark_health()
         return {"status": "ok"}
 
+    @app.get("/ready")
+    def ready():
+        """warmup(테이블/모델 로드 + 더미 forward) 완료 여부. 미완료면 503."""
+        status = warmup_state.status()
+        return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
     @app.on_event("startup")
     async def on_startup():
         # WS EventBus는 FastAPI 이벤트 루프에 묶어둠
         ws_bus.set_loop(asyncio.get_running_loop())
         asyncio.create_task(ws_bus.run())
 
-        # MQTT 클라이언트 시작 (별도 스레드)
-        mqtt_client.start()
-
-        # ML 모델/컨트롤러 초기화
-        get_lstm_a_model()
-        model_path = Path(__file__).resolve().parent / "ml" / "lstm_b.pt"
-        load_lstm_b_model(str(model_path))
+        # ML 모델 로드/warmup (+ FAST_START 면 MQTT 접속/테이블 생성까지)
+        # FAST_START=true 면 백그라운드로 돌리고 /health 는 바로 응답 (/ready 로 완료 확인)
+        if settings.FAST_START:
+            asyncio.create_task(asyncio.to_thread(warmup_state.run, True, mqtt_client.start))
+        else:
+            # MQTT 클라이언트 시작 (별도 스레드)
+            mqtt_client.start()
+            warmup_state.run()
 
     return app
 
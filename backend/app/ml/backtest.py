@@ -0,0 +1,577 @@
+"""
+app/ml/backtest.py
+
+과거 cycles 를 SKU별로 재생(replay)해 밸브 제어기와 SPC 검출기를 오프라인으로 비교하는 백테스트.
+
+- 제어기(controller): 매 cycle 다음 valve_ms 를 정하는 함수 (historical / r2r / lstm_a)
+  제어기가 바꾼 valve_ms 에 대한 실제 충전량은 SKU별 선형 충전 모델
+  (actual ≈ gain * valve_ms + offset)에 과거 잔차를 더해 만든다. gain 은 레시피(target_amount / base_valve_ms)로
+  고정하고 offset 만 과거 데이터로 맞춘다 (폐루프 데이터는 valve 가 오차를 따라 움직여 OLS 기울기가 크게 치우침,
+  OLS 기울기는 참고용으로 리포트에 남기고 레시피 gain 과 크게 다르면 표시).
+  → historical 제어기는 기록된 actual_ml 을 그대로 재현하고, 실제 외란/드리프트는 잔차로 보존된다.
+- 검출기(detector): 오차 시계열로 WARN/ALARM 을 내는 함수 (cusum / lstm_b)
+  정답 라벨이 없으므로 기록된 오차에 알려진 위치의 step drift 구간을 주입하고
+  precision / recall / 검출 지연을 그 구간 기준으로 잰다 (같은 구간이 제어기 잔차에도 더해짐).
+  사실상 항상 알람인 검출기는 precision / recall 대신 degenerate 로 표시한다.
+- SKU 단위로 process pool 에서 병렬 실행 (train_pipeline.run_all 과 같은 spawn + 스레드 제한)
+
+새 제어기/검출기는 register_controller / register_detector 로 등록한다.
+
+사용법 (backend 폴더에서):
+
+    $ python -m app.ml.backtest --all
+    $ python -m app.ml.backtest --sku CIDER_500 --controllers historical,r2r,lstm_a --detectors cusum
+    $ python -m app.ml.backtest --all --limit 500000 --stride 5 --workers 4
+
+리포트는 models/backtest_report_<ts>.json 으로 저장된다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.core.config import settings
+
+REPORT_DIR = Path("models")
+
+HISTORY = 50            # 제어기에 넘기는 최근 cycle 수 (control 경로의 recent cycles limit 과 동일)
+DETECT_WINDOW = 100     # 검출기 입력 오차 수 (get_recent_errors_for_sku limit 과 동일)
+DETECT_CHUNK = 20_000   # 검출기 배치 평가 단위 (윈도우 수)
+PLANT_GAIN_BAND = (0.5, 2.0)    # OLS 기울기 / 레시피 gain 이 이 범위 밖이면 ols_suspect
+DEGENERATE_ALARM_RATE = 0.99    # 평가 시점 중 이 비율 이상이 알람이면 degenerate (onset 기반 지표가 무의미)
+
+
+@dataclass
+class ReplayContext:
+    """한 SKU 재생에 필요한 데이터 (제어기/검출기 factory 에 전달)"""
+    sku: str
+    recipe: Any
+    target: np.ndarray          # (N,) target_ml
+    valve: np.ndarray           # (N,) 기록된 valve_ms
+    residual: np.ndarray        # (N,) actual - (gain * valve + offset) + 주입 drift
+    errors: np.ndarray          # (N,) 기록된 오차 + 주입 drift (검출기 입력)
+    gain: float
+    offset: float
+    episodes: List[Tuple[int, int]] = field(default_factory=list)
+
+
+# (recent_cycles, t) → valve_ms
+Controller = Callable[[List[Any], int], float]
+# (errors, eval_idx) → 평가 시점별 alarm 여부 (bool 배열)
+Detector = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+CONTROLLERS: Dict[str, Callable[[ReplayContext], Controller]] = {}
+DETECTORS: Dict[str, Callable[[ReplayContext], Detector]] = {}
+
+
+def register_controller(name: str):
+    def deco(factory):
+        CONTROLLERS[name] = factory
+        return factory
+    return deco
+
+
+def register_detector(name: str):
+    def deco(factory):
+        DETECTORS[name] = factory
+        return factory
+    return deco
+
+
+# ---------------------------------------------------
+# 제어기
+# ---------------------------------------------------
+
+@register_controller("historical")
+def _historical(ctx: ReplayContext) -> Controller:
+    """기록된 valve_ms 그대로 (비교 기준선)"""
+    valve = ctx.valve
+    return lambda recent, t: float(valve[t])
+
+
+@register_controller("r2r")
+def _r2r(ctx: ReplayContext) -> Controller:
+    from app.services.r2r import compute_next_valve_time
+
+    recipe = ctx.recipe
+    return lambda recent, t: compute_next_valve_time(recipe, recent)
+
+
+@register_controller("lstm_a")
+def _lstm_a(ctx: ReplayContext) -> Controller:
+    """SKU 의 최신 LSTM-A 모델 (predict_next 의 SKU 제한 없이, batcher 미경유)"""
+    from app.ml.lstm_a import get_lstm_a_model, load_lstm_a_entry
+
+    controller = get_lstm_a_model()
+    entry = load_lstm_a_entry(ctx.sku)  # 모델 없으면 FileNotFoundError → unavailable
+    recipe = ctx.recipe
+    return lambda recent, t: controller.predict_with_entry(entry, recipe, recent, use_batcher=False, verbose=False)
+
+
+# ---------------------------------------------------
+# 검출기
+# ---------------------------------------------------
+
+def _detect_windows(errors: np.ndarray, eval_idx: np.ndarray, width: int) -> np.ndarray:
+    """eval 시점 t 에서 끝나는(포함) 길이 width 의 오차 윈도우 (stride view)"""
+    return sliding_window_view(errors, width)[eval_idx - width + 1]
+
+
+@register_detector("cusum")
+def _cusum(ctx: ReplayContext) -> Detector:
+    """서비스와 같은 CUSUM (최근 DETECT_WINDOW 개 오차, WARN/ALARM 이면 알람)"""
+    from app.ml.ml_b_spc import compute_spc_cusum_batch
+
+    def detect(errors, eval_idx):
+        out = np.empty(len(eval_idx), dtype=bool)
+        for s in range(0, len(eval_idx), DETECT_CHUNK):
+            idx = eval_idx[s:s + DETECT_CHUNK]
+            state, _, _, _ = compute_spc_cusum_batch(_detect_windows(errors, idx, DETECT_WINDOW))
+            out[s:s + len(idx)] = state > 0
+        return out
+
+    return detect
+
+
+@register_detector("lstm_b")
+def _lstm_b(ctx: ReplayContext) -> Detector:
+    """CUSUM + LSTM-B 예측 조기경보 (predictive_spc_service 와 같은 판정)"""
+    from app.ml import lstm_b
+    from app.ml.ml_b_spc import compute_spc_cusum_batch
+
+    if lstm_b.LSTM_B_MODEL is None:
+        from app.ml.train_lstm_b import MODEL_PATH
+
+        lstm_b.load_lstm_b_model(str(MODEL_PATH))
+    if lstm_b.LSTM_B_MODEL is None:
+        raise FileNotFoundError("LSTM-B model not found")
+
+    recipe_index = lstm_b.LSTM_B_META.get("recipe_index") or {}
+    recipe_idx = float(recipe_index.get(str(ctx.recipe.id), 0))
+    seq_len = int(lstm_b.LSTM_B_META.get("seq_len", 20))
+    horizon = settings.PREDICTIVE_SPC_HORIZON
+
+    def detect(errors, eval_idx):
+        out = np.empty(len(eval_idx), dtype=bool)
+        for s in range(0, len(eval_idx), DETECT_CHUNK):
+            idx = eval_idx[s:s + DETECT_CHUNK]
+            hist = _detect_windows(errors, idx, DETECT_WINDOW)
+            state, _, mean, std = compute_spc_cusum_batch(hist)
+            alarm = state > 0
+
+            ok = np.flatnonzero(~alarm)
+            if len(ok):
+                w = np.zeros((len(ok), seq_len, 3), dtype=np.float32)
+                w[:, :, 0] = hist[ok, -seq_len:]
+                w[:, :, 1] = recipe_idx
+                forecast = lstm_b.forecast_errors_batch(w, horizon=horizon)
+                ahead, _, _, _ = compute_spc_cusum_batch(
+                    np.concatenate([hist[ok], forecast], axis=1), mean=mean[ok], std=std[ok],
+                )
+                alarm[ok] = ahead > 0
+            out[s:s + len(idx)] = alarm
+        return out
+
+    return detect
+
+
+# ---------------------------------------------------
+# 재생 / 평가
+# ---------------------------------------------------
+
+def _fit_plant(valve: np.ndarray, actual: np.ndarray, recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """actual ≈ gain * valve + offset
+
+    gain 은 레시피 target_amount / base_valve_ms (없으면 mean(actual) / mean(valve)), offset = 평균 잔차.
+    OLS 기울기(ols_gain)는 폐루프 데이터라 참고용 — gain 대비 PLANT_GAIN_BAND 밖이면 ols_suspect.
+    """
+    target = float(recipe.get("target_amount") or 0.0)
+    base_valve = float(recipe.get("base_valve_ms") or 0.0)
+    if target > 0.0 and base_valve > 0.0:
+        gain, source = target / base_valve, "recipe"
+    else:
+        gain, source = float(np.mean(actual) / max(np.mean(valve), 1e-6)), "ratio"
+
+    ols_gain = None
+    if np.std(valve) > 1e-6:
+        ols_gain = float(np.polyfit(valve, actual, 1)[0])
+    lo, hi = PLANT_GAIN_BAND
+    return {
+        "gain": gain,
+        "offset": float(np.mean(actual - gain * valve)),
+        "source": source,
+        "ols_gain": ols_gain,
+        "ols_suspect": ols_gain is not None and not (lo * gain <= ols_gain <= hi * gain),
+    }
+
+
+def _inject_drift(n: int, scale: float, n_episodes: int, length: int, shift_sigma: float,
+                  rng: np.random.Generator) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """서로 겹치지 않는 step drift 구간 (부호 랜덤) 을 주입할 오프셋 배열"""
+    inj = np.zeros(n)
+    episodes: List[Tuple[int, int]] = []
+    if n_episodes <= 0 or n < 2 * DETECT_WINDOW + length:
+        return inj, episodes
+
+    # 구간 사이 최소 간격 DETECT_WINDOW (앞 구간의 영향이 윈도우에서 빠지도록)
+    slot = (n - DETECT_WINDOW) // n_episodes
+    if slot < length + DETECT_WINDOW:
+        n_episodes = max(1, (n - DETECT_WINDOW) // (length + DETECT_WINDOW))
+        slot = (n - DETECT_WINDOW) // n_episodes
+    for i in range(n_episodes):
+        lo = DETECT_WINDOW + i * slot
+        start = int(rng.integers(lo, lo + slot - length - DETECT_WINDOW + 1))
+        end = start + length
+        inj[start:end] = rng.choice([-1.0, 1.0]) * shift_sigma * scale
+        episodes.append((start, end))
+    return inj, episodes
+
+
+def replay_controller(fn: Controller, ctx: ReplayContext) -> Tuple[np.ndarray, np.ndarray]:
+    """폐루프 재생 → (시뮬레이션 오차 (N,), 호출별 지연 초 (N,))"""
+    n = len(ctx.target)
+    errors = np.empty(n)
+    latency = np.empty(n)
+    recent: deque = deque(maxlen=HISTORY)
+    clock = time.perf_counter
+
+    for t in range(n):
+        window = list(recent)
+        t0 = clock()
+        valve = float(fn(window, t))
+        latency[t] = clock() - t0
+
+        actual = ctx.gain * valve + ctx.offset + ctx.residual[t]
+        error = actual - ctx.target[t]
+        recent.append(SimpleNamespace(actual_ml=actual, valve_ms=valve, target_ml=ctx.target[t], error=error))
+        errors[t] = error
+    return errors, latency
+
+
+def _latency_stats(seconds: np.ndarray) -> Dict[str, float]:
+    us = seconds * 1e6
+    return {
+        "mean_us": float(us.mean()),
+        "p50_us": float(np.percentile(us, 50)),
+        "p95_us": float(np.percentile(us, 95)),
+    }
+
+
+def controller_metrics(errors: np.ndarray, latency: np.ndarray, tolerance: float) -> Dict[str, Any]:
+    return {
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "bias": float(np.mean(errors)),
+        "out_of_spec_rate": float(np.mean(np.abs(errors) > tolerance)),
+        "latency": _latency_stats(latency),
+    }
+
+
+def detector_metrics(alarm: np.ndarray, eval_idx: np.ndarray, episodes: List[Tuple[int, int]],
+                     elapsed_s: float) -> Dict[str, Any]:
+    """알람 onset(비알람 → 알람 전환) 단위 precision, 구간 단위 recall / 검출 지연(cycles)
+
+    구간 [start, end + DETECT_WINDOW) 안의 onset 을 정탐으로 본다 (drift 가 윈도우에 남아 있는 동안).
+    구간 전부터 계속 알람 중인 검출기는 새 onset 이 없으므로 그 구간을 놓친 것으로 센다.
+    alarm_rate 가 DEGENERATE_ALARM_RATE 이상이면 degenerate=True, precision / recall / 지연은 None.
+    """
+    alarm_rate = float(alarm.mean()) if len(alarm) else 0.0
+    degenerate = alarm_rate >= DEGENERATE_ALARM_RATE
+    onset = alarm & ~np.concatenate([[False], alarm[:-1]])
+    onset_t = eval_idx[onset]
+
+    in_episode = np.zeros(len(onset_t), dtype=bool)
+    delays = []
+    for start, end in episodes:
+        hit = (onset_t >= start) & (onset_t < end + DETECT_WINDOW)
+        in_episode |= hit
+        if hit.any():
+            delays.append(int(onset_t[hit][0] - start))
+
+    n_onsets = len(onset_t)
+    scored = not degenerate
+    return {
+        "alarms": int(n_onsets),
+        "alarm_rate": alarm_rate,
+        "degenerate": degenerate,
+        "false_alarms_per_1k": float((~in_episode).sum() * 1000.0 / max(len(eval_idx), 1)),
+        "precision": float(in_episode.mean()) if scored and n_onsets else None,
+        "recall": float(len(delays) / len(episodes)) if scored and episodes else None,
+        "detection_delay_mean": float(np.mean(delays)) if scored and delays else None,
+        "detection_delay_p50": float(np.median(delays)) if scored and delays else None,
+        "latency": {"per_eval_us": elapsed_s * 1e6 / max(len(eval_idx), 1), "total_s": elapsed_s},
+    }
+
+
+def _load_columns(sku: str, limit: Optional[int], use_store: bool) -> Dict[str, np.ndarray]:
+    if use_store:
+        from app.ml.feature_store import FeatureStore
+
+        return FeatureStore().lstm_a_columns(sku, limit=limit)
+
+    from app.db.session import SessionLocal
+    from app.ml.ml_a_dataset import load_cycle_columns
+
+    db = SessionLocal()
+    try:
+        return load_cycle_columns(db, sku, limit=limit)
+    finally:
+        db.close()
+
+
+def backtest_sku(sku: str, recipe: Dict[str, Any], controllers: List[str], detectors: List[str],
+                 opts: Dict[str, Any]) -> Dict[str, Any]:
+    """한 SKU 의 과거 cycles 로 제어기/검출기 전부 재생 (워커 프로세스에서 실행)"""
+    t_start = time.monotonic()
+    cols = _load_columns(sku, opts.get("limit"), opts.get("use_store", True))
+
+    done = ~np.isnan(cols["actual_ml"])  # fill_result 없는 cycle 은 결과가 없으므로 제외
+    actual = cols["actual_ml"][done].astype(np.float64)
+    valve = cols["valve_ms"][done].astype(np.float64)
+    target = cols["target_ml"][done].astype(np.float64)
+    n = len(actual)
+    if n <= DETECT_WINDOW:
+        return {"sku": sku, "status": "skipped", "n_cycles": n, "reason": "not enough cycles"}
+
+    plant = _fit_plant(valve, actual, recipe)
+    gain, offset = plant["gain"], plant["offset"]
+    residual = actual - (gain * valve + offset)
+
+    rng = np.random.default_rng(opts.get("seed", 0))
+    n_episodes = opts["episodes"] if opts.get("episodes") is not None else max(1, n // 2000)
+    inj, episodes = _inject_drift(n, float(np.std(residual)), n_episodes, opts.get("episode_len", 50),
+                                  opts.get("shift_sigma", 2.0), rng)
+
+    ctx = ReplayContext(
+        sku=sku, recipe=SimpleNamespace(**recipe), target=target, valve=valve,
+        residual=residual + inj, errors=actual - target + inj,
+        gain=gain, offset=offset, episodes=episodes,
+    )
+
+    report: Dict[str, Any] = {
+        "sku": sku,
+        "status": "ok",
+        "n_cycles": n,
+        "plant": {**plant, "residual_std": float(np.std(residual))},
+        "episodes": len(episodes),
+        "controllers": {},
+        "detectors": {},
+    }
+
+    for name in controllers:
+        try:
+            fn = CONTROLLERS[name](ctx)
+        except FileNotFoundError as e:
+            report["controllers"][name] = {"status": "unavailable", "error": str(e)}
+            continue
+        t0 = time.monotonic()
+        errors, latency = replay_controller(fn, ctx)
+        report["controllers"][name] = {
+            **controller_metrics(errors, latency, opts.get("tolerance", 5.0)),
+            "plant_gain": gain,
+            "wall_s": time.monotonic() - t0,
+        }
+
+    eval_idx = np.arange(DETECT_WINDOW - 1, n, max(1, opts.get("stride", 1)))
+    for name in detectors:
+        try:
+            detect = DETECTORS[name](ctx)
+        except FileNotFoundError as e:
+            report["detectors"][name] = {"status": "unavailable", "error": str(e)}
+            continue
+        t0 = time.perf_counter()
+        alarm = detect(ctx.errors, eval_idx)
+        report["detectors"][name] = detector_metrics(alarm, eval_idx, episodes, time.perf_counter() - t0)
+
+    report["wall_s"] = time.monotonic() - t_start
+    return report
+
+
+# ---------------------------------------------------
+# SKU 병렬 실행
+# ---------------------------------------------------
+
+def _init_worker(threads: int) -> None:
+    """워커별 torch intra-op 스레드 제한 (torch 백엔드일 때만)"""
+    if settings.ML_BACKEND == "numpy":
+        return
+    import torch
+
+    torch.set_num_threads(max(1, threads))
+
+
+def _run_one(sku, recipe, controllers, detectors, opts):
+    try:
+        return backtest_sku(sku, recipe, controllers, detectors, opts)
+    except Exception as e:
+        return {"sku": sku, "status": "error", "error": repr(e)}
+
+
+def _recipes(skus: Optional[List[str]]) -> Dict[str, Dict[str, Any]]:
+    from sqlalchemy import select
+
+    from app.db.models.recipe import Recipe
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stmt = select(Recipe)
+        stmt = stmt.where(Recipe.sku_id.in_(skus)) if skus else stmt.where(Recipe.is_active.is_(True))
+        return {
+            r.sku_id: {"id": r.id, "sku_id": r.sku_id, "target_amount": r.target_amount,
+                       "base_valve_ms": r.base_valve_ms}
+            for r in db.scalars(stmt)
+        }
+    finally:
+        db.close()
+
+
+def run_backtest(skus=None, controllers=("historical", "r2r", "lstm_a"), detectors=("cusum", "lstm_b"),
+                 workers=None, threads_per_worker=1, **opts) -> Dict[str, Any]:
+    """SKU별 백테스트를 process pool 에서 병렬 실행하고 리포트를 저장"""
+    unknown = [c for c in controllers if c not in CONTROLLERS] + [d for d in detectors if d not in DETECTORS]
+    if unknown:
+        raise ValueError(f"unknown controller/detector: {unknown}")
+
+    recipes = _recipes(list(skus) if skus else None)
+    if not recipes:
+        print("[BACKTEST] 대상 레시피가 없습니다.")
+        return {"skus": [], "results": []}
+
+    # feature store 는 여기서 한 번만 sync, 워커는 읽기만
+    opts.setdefault("use_store", settings.TRAIN_FROM_FEATURE_STORE)
+    if opts["use_store"]:
+        from app.db.session import SessionLocal
+        from app.ml.feature_store import FeatureStore
+
+        db = SessionLocal()
+        try:
+            FeatureStore().sync(db)
+        finally:
+            db.close()
+
+    cpu = os.cpu_count() or 1
+    workers = workers or max(1, min(len(recipes), cpu // max(1, threads_per_worker)))
+    print(f"[BACKTEST] {len(recipes)} SKUs, controllers={list(controllers)}, detectors={list(detectors)}, "
+          f"{workers} workers")
+
+    started_at = datetime.now()
+    t0 = time.monotonic()
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads_per_worker,),
+    ) as pool:
+        futures = [
+            pool.submit(_run_one, sku, recipe, list(controllers), list(detectors), opts)
+            for sku, recipe in recipes.items()
+        ]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            _print_result(r)
+
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "wall_s": time.monotonic() - t0,
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "options": opts,
+        "results": sorted(results, key=lambda r: r["sku"]),
+    }
+
+    REPORT_DIR.mkdir(exist_ok=True)
+    path = REPORT_DIR / f"backtest_report_{started_at:%Y%m%d_%H%M%S}.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[BACKTEST] {len(results)} SKUs in {report['wall_s']:.1f}s, report: {path}")
+    return report
+
+
+def _print_result(r: Dict[str, Any]) -> None:
+    if r["status"] != "ok":
+        print(f"[BACKTEST] {r['sku']}: {r['status']} {r.get('error') or r.get('reason', '')}")
+        return
+
+    plant = r["plant"]
+    ols = "-" if plant["ols_gain"] is None else f"{plant['ols_gain']:.4f}"
+    print(f"[BACKTEST] {r['sku']}: {r['n_cycles']} cycles, {r['episodes']} drift episodes, {r['wall_s']:.1f}s")
+    print(f"    plant        gain={plant['gain']:.4f} ({plant['source']}) offset={plant['offset']:+.3f} "
+          f"ols_gain={ols}{' SUSPECT' if plant['ols_suspect'] else ''}")
+    for name, m in r["controllers"].items():
+        if "rmse" not in m:
+            print(f"    {name:<12} {m['status']}")
+            continue
+        print(f"    {name:<12} rmse={m['rmse']:.3f} bias={m['bias']:+.3f} "
+              f"out_of_spec={m['out_of_spec_rate']:.2%} p50={m['latency']['p50_us']:.0f}us")
+    for name, m in r["detectors"].items():
+        if "alarms" not in m:
+            print(f"    {name:<12} {m['status']}")
+            continue
+
+        def fmt(v, spec):
+            return "-" if v is None else format(v, spec)
+
+        if m["degenerate"]:
+            print(f"    {name:<12} DEGENERATE alarm_rate={m['alarm_rate']:.2%} (항상 알람, precision/recall 없음) "
+                  f"{m['latency']['per_eval_us']:.1f}us/eval")
+            continue
+        print(f"    {name:<12} precision={fmt(m['precision'], '.2f')} recall={fmt(m['recall'], '.2f')} "
+              f"delay={fmt(m['detection_delay_p50'], '.0f')} false/1k={m['false_alarms_per_1k']:.1f} "
+              f"alarm_rate={m['alarm_rate']:.2%} {m['latency']['per_eval_us']:.1f}us/eval")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true", help="활성 레시피 SKU 전부")
+    parser.add_argument("--sku", action="append", help="대상 SKU (여러 번 지정 가능)")
+    parser.add_argument("--controllers", default="historical,r2r,lstm_a")
+    parser.add_argument("--detectors", default="cusum,lstm_b")
+    parser.add_argument("--limit", type=int, default=None, help="SKU별 최근 cycle 수 (기본: 전체)")
+    parser.add_argument("--stride", type=int, default=1, help="검출기 평가 간격(cycles)")
+    parser.add_argument("--tolerance", type=float, default=5.0, help="out-of-spec 기준 |error| (ml)")
+    parser.add_argument("--episodes", type=int, default=None, help="SKU별 주입 drift 구간 수 (기본: 2000 cycle 당 1)")
+    parser.add_argument("--episode-len", type=int, default=50)
+    parser.add_argument("--shift-sigma", type=float, default=2.0, help="주입 drift 크기 (잔차 표준편차 배수)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=1, help="워커당 torch 스레드 수")
+    parser.add_argument("--from-db", action="store_true", help="feature store 대신 DB 직접 조회")
+    args = parser.parse_args()
+
+    if not args.all and not args.sku:
+        parser.error("--all 또는 --sku 를 지정하세요")
+
+    run_backtest(
+        skus=None if args.all else args.sku,
+        controllers=[c for c in args.controllers.split(",") if c],
+        detectors=[d for d in args.detectors.split(",") if d],
+        workers=args.workers,
+        threads_per_worker=args.threads,
+        limit=args.limit,
+        stride=args.stride,
+        tolerance=args.tolerance,
+        episodes=args.episodes,
+        episode_len=args.episode_len,
+        shift_sigma=args.shift_sigma,
+        seed=args.seed,
+        use_store=False if args.from_db else settings.TRAIN_FROM_FEATURE_STORE,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+app/ml/export_numpy.py
+
+학습된 LSTM-A / LSTM-B state_dict(.pt)를 torch 없이 서빙할 수 있는
+NumPy weight 번들(.npz)로 변환하고, torch 결과와 parity 를 확인한다.
+
+사용법 (backend 폴더에서):
+
+    $ python -m app.ml.export_numpy models/lstm_a_CIDER_500.pt
+    $ python -m app.ml.export_numpy app/ml/lstm_b.pt --kind lstm_b
+
+변환된 번들은 ML_BACKEND=numpy 일 때 lstm_a / lstm_b 가 로드한다.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from app.ml.ml_a_model import LSTMA
+from app.ml.ml_b_model import LSTMB
+from app.ml.numpy_lstm import NumpyLSTM
+
+
+def load_state_dict(pt_path: Path) -> dict:
+    state = torch.load(pt_path, map_location="cpu")
+    # state_dict 만 저장된 경우와, {'state_dict': ...} 형태 둘 다 대응
+    if isinstance(state, dict) and "state_dict" in state:
+        state = state["state_dict"]
+    return state
+
+
+def export_state_dict(pt_path: Path, npz_path: Path | None = None) -> Path:
+    pt_path = Path(pt_path)
+    npz_path = Path(npz_path) if npz_path else pt_path.with_suffix(".npz")
+
+    state = load_state_dict(pt_path)
+    arrays = {k: v.detach().cpu().numpy().astype(np.float32) for k, v in state.items()}
+    np.savez(npz_path, **arrays)
+
+    print(f"[EXPORT] {pt_path} -> {npz_path} ({len(arrays)} tensors)")
+    return npz_path
+
+
+def check_parity(model: torch.nn.Module, kernel: NumpyLSTM, seq_len: int, batch: int = 64,
+                 atol: float = 1e-5, seed: int = 0) -> float:
+    """같은 랜덤 입력에 대해 torch / NumPy 출력 최대 절대오차를 반환 (atol 초과 시 예외)."""
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((batch, seq_len, kernel.input_dim)).astype(np.float32)
+
+    model.eval()
+    with torch.no_grad():
+        ref = model(torch.from_numpy(x)).numpy()
+    out = kernel(x)
+
+    err = float(np.max(np.abs(ref - out)))
+    if err > atol:
+        raise AssertionError(f"NumPy kernel parity failed: max|err|={err:.3e} > {atol:.0e}")
+    return err
+
+
+def _build_model(kind: str, state: dict) -> torch.nn.Module:
+    input_dim = state["lstm.weight_ih_l0"].shape[1]
+    hidden_dim = state["lstm.weight_hh_l0"].shape[1]
+    num_layers = sum(1 for k in state if k.startswith("lstm.weight_ih_l"))
+    cls = LSTMA if kind == "lstm_a" else LSTMB
+    model = cls(input_dim=input_dim, hidden_dim=hidden_dim, num_layers=num_layers)
+    model.load_state_dict(state)
+    return model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pt_path", type=Path)
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--kind", choices=["lstm_a", "lstm_b"], default=None)
+    parser.add_argument("--seq-len", type=int, default=None)
+    args = parser.parse_args()
+
+    kind = args.kind or ("lstm_b" if args.pt_path.name.startswith("lstm_b") else "lstm_a")
+    seq_len = args.seq_len or (20 if kind == "lstm_b" else 5)
+
+    npz_path = export_state_dict(args.pt_path, args.out)
+
+    model = _build_model(kind, load_state_dict(args.pt_path))
+    err = check_parity(model, NumpyLSTM.load(npz_path), seq_len=seq_len)
+    print(f"[EXPORT] parity OK ({kind}, seq_len={seq_len}): max|err|={err:.3e}")
+
+
+if __name__ == "__main__":
+    main()
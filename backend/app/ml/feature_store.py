@@ -0,0 +1,375 @@
+"""
+app/ml/feature_store.py
+
+cycles 테이블의 append-only 컬럼 스냅샷 (SKU별 memory-map 컬럼 파일 + manifest).
+학습(LSTM-A / LSTM-B)과 오프라인 분석은 OLTP DB 대신 여기서 읽는다.
+
+디렉터리 구조:
+
+    feature_store/
+      manifest.json              # {"last_id": 전체 sync watermark}
+      CIDER_500/
+        manifest.json            # {"rows": N, "last_id": ..., "archived_id": ..., "columns": {...}}
+        id.bin seq.bin ts.bin target_ml.bin actual_ml.bin valve_ms.bin
+        error.bin roll_mean.bin roll_std.bin
+
+- 컬럼 파일은 raw little-endian 배열(append 만), 유효 행 수는 manifest 의 rows 가 기준
+  → 쓰는 도중에 읽어도 manifest 에 반영된 행까지만 보인다 (manifest 는 tmp + os.replace)
+- sync 는 id > last_id 인 행만 가져온다. 아직 fill_result 가 안 온 cycle(actual_ml NULL)은
+  FEATURE_STORE_GRACE_S 동안 watermark 를 그 앞에서 멈춰 기다린다.
+- retention 이 DB 에서 아카이브로 옮긴 cycle 은 store 에 그대로 남긴다 (학습용 과거 이력).
+  retention 은 SKU별로 옮긴 max id 를 archived_id 로 기록(mark_archived)하고, 그 이하는 DB 와 비교하지 않는다.
+- append 만으로는 DB 쪽 삭제 / id 재사용 / 늦은 fill_result 를 못 보므로 sync 마다 SKU별로 확인해
+  어긋난 SKU 는 archived_id 이후 구간을 지우고 다시 export 한다:
+    * archived_id 초과 ~ watermark 이하 (행 수, max id) 가 DB 와 다름 (삭제, 재생성)
+    * 그 구간에서 store 에 NaN 인 actual_ml 이 DB 에서는 채워짐 (grace 이후 도착한 fill_result)
+    * DB max id 가 watermark 보다 작음 (테이블 재생성 등) → 전체 재구성
+  같은 id 로 다시 채워 넣는 경우(SQLite id 재사용)는 행 수/max id 가 같아 보일 수 있으므로
+  SKU 데이터를 지우고 다시 만드는 쪽(generate_initial_cycles)은 invalidate 를 부른다.
+
+사용법 (backend 폴더에서):
+
+    $ python -m app.ml.feature_store sync
+    $ python -m app.ml.feature_store stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.fileio import exclusive, read_json, write_json
+from app.db.models.cycle import Cycle
+from app.db.models.recipe import Recipe
+
+# 컬럼 이름 → dtype
+COLUMNS: Dict[str, str] = {
+    "id": "<i8",
+    "seq": "<i8",
+    "ts": "<i8",            # UTC epoch ns
+    "target_ml": "<f4",
+    "actual_ml": "<f4",     # fill_result 없이 grace 가 지난 cycle 은 NaN
+    "valve_ms": "<f4",
+    "error": "<f4",         # actual - target
+    "roll_mean": "<f4",     # error rolling mean (ROLL_WINDOW, SKU 단위)
+    "roll_std": "<f4",      # error rolling std
+}
+ROLL_WINDOW = 20
+CHUNK_SIZE = 50_000
+
+
+class FeatureStore:
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = Path(root or settings.FEATURE_STORE_DIR)
+
+    # ========== 메타 ==========
+
+    def _sku_dir(self, sku: str) -> Path:
+        return self.root / sku
+
+    def _sku_manifest(self, sku: str) -> dict:
+        return read_json(self._sku_dir(sku) / "manifest.json", {"rows": 0, "last_id": 0, "archived_id": 0})
+
+    def _rows_upto(self, sku: str, row_id: int) -> int:
+        """store 에서 id <= row_id 인 행 수 (id 오름차순 append 라 이분 탐색)"""
+        if row_id <= 0:
+            return 0
+        return int(np.searchsorted(self.read(sku, ["id"])["id"], row_id, side="right"))
+
+    def last_id(self) -> int:
+        return int(read_json(self.root / "manifest.json", {"last_id": 0})["last_id"])
+
+    def skus(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "manifest.json").exists())
+
+    # ========== 읽기 ==========
+
+    def read(self, sku: str, columns: Optional[Iterable[str]] = None, tail: Optional[int] = None
+             ) -> Dict[str, np.ndarray]:
+        """SKU 컬럼들을 read-only memmap 으로 (tail 이면 마지막 tail 행만)"""
+        rows = int(self._sku_manifest(sku)["rows"])
+        start = max(0, rows - tail) if tail else 0
+        out = {}
+        for name in columns or COLUMNS:
+            dtype = np.dtype(COLUMNS[name])
+            path = self._sku_dir(sku) / f"{name}.bin"
+            if rows == 0 or not path.exists():
+                out[name] = np.empty(0, dtype=dtype)
+                continue
+            out[name] = np.memmap(path, dtype=dtype, mode="r", shape=(rows,))[start:]
+        return out
+
+    def lstm_a_columns(self, sku: str, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """ml_a_dataset.load_cycle_columns 와 같은 형태 (id, actual_ml, valve_ms, target_ml)"""
+        cols = self.read(sku, ["id", "seq", "actual_ml", "valve_ms", "target_ml"], tail=limit)
+        order = np.argsort(cols.pop("seq"), kind="stable")
+        return {k: np.asarray(v)[order] for k, v in cols.items()}
+
+    def fills_frame(self, recipe_ids: Dict[str, int]) -> pd.DataFrame:
+        """ml_b_dataset.load_fills_frame 과 같은 컬럼 DataFrame (actual_ml 있는 행만, ts 순)"""
+        from app.ml.ml_b_dataset import DEFAULT_LINE_ID
+
+        parts = []
+        for sku in self.skus():
+            if sku not in recipe_ids:
+                continue
+            c = self.read(sku, ["id", "ts", "target_ml", "actual_ml"])
+            done = ~np.isnan(c["actual_ml"])
+            parts.append(pd.DataFrame({
+                "id": c["id"][done],
+                "ts": c["ts"][done].astype("datetime64[ns]"),
+                "recipe_id": np.full(int(done.sum()), recipe_ids[sku], dtype=np.int32),
+                "target_ml": c["target_ml"][done],
+                "actual_ml": c["actual_ml"][done],
+            }))
+        if not parts:
+            return pd.DataFrame(columns=["id", "ts", "recipe_id", "target_ml", "actual_ml", "line_id"])
+
+        df = pd.concat(parts, ignore_index=True).sort_values(["ts", "id"], kind="stable", ignore_index=True)
+        df["line_id"] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), [DEFAULT_LINE_ID])
+        return df
+
+    # ========== 무효화 ==========
+
+    def _drop(self, skus: Optional[Iterable[str]]) -> None:
+        if skus is None:
+            for sku in self.skus():
+                shutil.rmtree(self._sku_dir(sku), ignore_errors=True)
+            (self.root / "manifest.json").unlink(missing_ok=True)
+            return
+        for sku in skus:
+            shutil.rmtree(self._sku_dir(sku), ignore_errors=True)
+
+    def _truncate(self, sku: str, archived_id: int) -> None:
+        """archived_id 이하(아카이브된 이력)만 남기고 그 뒤를 버림 → 다음 export 가 이어 붙인다"""
+        if not archived_id:
+            self._drop([sku])
+            return
+        m = self._sku_manifest(sku)
+        rows = self._rows_upto(sku, archived_id)
+        write_json(self._sku_dir(sku) / "manifest.json", {**m, "rows": rows, "last_id": int(archived_id)})
+
+    def invalidate(self, skus: Optional[Iterable[str]] = None) -> None:
+        """SKU(None 이면 전체) 스냅샷 삭제 → 다음 sync 때 DB 에서 다시 export"""
+        if not self.root.exists():
+            return
+        with exclusive(self.root / ".lock"):
+            self._drop(skus)
+
+    def mark_archived(self, upto: Dict[str, int]) -> None:
+        """retention 이 SKU별로 id <= upto[sku] 인 cycle 을 DB 에서 아카이브로 옮겼음을 기록.
+
+        store 행은 그대로 두고, 이후 sync 는 archived_id 이하 구간을 DB 와 비교하지 않는다.
+        """
+        if not self.root.exists():
+            return
+        with exclusive(self.root / ".lock"):
+            for sku, row_id in upto.items():
+                path = self._sku_dir(sku) / "manifest.json"
+                m = self._sku_manifest(sku)
+                if path.exists() and int(row_id) > int(m.get("archived_id", 0)):
+                    write_json(path, {**m, "archived_id": int(row_id)})
+
+    def _filled_later(self, db, sku: str, archived_id: int) -> bool:
+        """archived_id 이후 store 에 NaN 으로 들어간 actual_ml 중 DB 에서 채워진 행이 있는지"""
+        c = self.read(sku, ["id", "actual_ml"])
+        ids = np.asarray(c["id"])
+        nan_ids = ids[np.isnan(c["actual_ml"]) & (ids > archived_id)]
+        for i in range(0, len(nan_ids), 500):
+            part = [int(v) for v in nan_ids[i:i + 500]]
+            if db.execute(
+                select(Cycle.id).where(Cycle.id.in_(part), Cycle.actual_ml.is_not(None)).limit(1)
+            ).first() is not None:
+                return True
+        return False
+
+    def _stale_skus(self, db, last_id: int) -> List[str]:
+        """archived_id 초과 ~ watermark 이하 구간이 DB 와 어긋난 SKU (ix_cycles_sku_id 인덱스만으로 집계)"""
+        in_db = {
+            sku: (int(n), int(mx))
+            for sku, n, mx in db.execute(
+                select(Cycle.sku, func.count(Cycle.id), func.max(Cycle.id))
+                .where(Cycle.id <= last_id)
+                .group_by(Cycle.sku)
+            ).all()
+        }
+        stale = []
+        for sku in sorted(set(self.skus()) | set(in_db)):
+            m = self._sku_manifest(sku)
+            floor = int(m.get("archived_id", 0))
+            n_db, max_db = in_db.get(sku, (0, 0))
+            if floor and n_db:
+                # 아카이브 후에도 DB 에 남은 floor 이하 행(보통 0)은 비교에서 뺀다
+                n_db -= int(db.execute(
+                    select(func.count(Cycle.id)).where(Cycle.sku == sku, Cycle.id <= floor)
+                ).scalar_one())
+            n_store = int(m["rows"]) - self._rows_upto(sku, floor)
+            in_store = (n_store, int(m["last_id"]) if n_store else 0)
+            if in_store != (n_db, max_db if n_db else 0) or self._filled_later(db, sku, floor):
+                stale.append(sku)
+        return stale
+
+    # ========== 쓰기 (incremental sync) ==========
+
+    def _upper_bound(self, db, last_id: int) -> Optional[int]:
+        """fill_result 대기 중인(grace 이내) 첫 cycle 바로 앞까지만 export"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.FEATURE_STORE_GRACE_S)
+        pending = db.execute(
+            select(func.min(Cycle.id)).where(
+                Cycle.id > last_id,
+                Cycle.actual_ml.is_(None),
+                Cycle.created_at >= cutoff,
+            )
+        ).scalar_one_or_none()
+        return None if pending is None else int(pending) - 1
+
+    def _append(self, sku: str, chunk: Dict[str, np.ndarray]) -> int:
+        d = self._sku_dir(sku)
+        d.mkdir(parents=True, exist_ok=True)
+        manifest = self._sku_manifest(sku)
+
+        # 중단 후 재실행 등으로 이미 들어간 행은 건너뜀
+        keep = chunk["id"] > int(manifest["last_id"])
+        if not keep.any():
+            return 0
+        chunk = {k: v[keep] for k, v in chunk.items()}
+
+        # rolling 통계는 기존 마지막 (ROLL_WINDOW-1) 개 error 를 이어서 계산
+        prev = np.asarray(self.read(sku, ["error"], tail=ROLL_WINDOW - 1)["error"])
+        error = (chunk["actual_ml"] - chunk["target_ml"]).astype(np.float32)
+        roll = pd.Series(np.concatenate([prev, error])).rolling(ROLL_WINDOW, min_periods=1)
+        chunk["error"] = error
+        chunk["roll_mean"] = roll.mean().to_numpy(dtype=np.float32)[len(prev):]
+        chunk["roll_std"] = roll.std(ddof=0).to_numpy(dtype=np.float32)[len(prev):]
+
+        rows = int(manifest["rows"])
+        for name, dtype in COLUMNS.items():
+            with open(d / f"{name}.bin", "r+b" if (d / f"{name}.bin").exists() else "wb") as f:
+                # manifest 에 없는 꼬리(이전 중단분)는 덮어쓴다
+                f.seek(rows * np.dtype(dtype).itemsize)
+                f.write(np.ascontiguousarray(chunk[name], dtype=dtype).tobytes())
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+        n = len(chunk["id"])
+        write_json(d / "manifest.json", {
+            "rows": rows + n,
+            "last_id": int(chunk["id"][-1]),
+            "archived_id": int(manifest.get("archived_id", 0)),
+            "roll_window": ROLL_WINDOW,
+            "columns": COLUMNS,
+        })
+        return n
+
+    def _export(self, db, stmt, chunk_size: int, added: Dict[str, int], advance: bool) -> None:
+        """id 순 stmt 결과를 SKU별로 append (advance 면 전체 watermark 도 전진)"""
+        result = db.connection().execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+        for rows in result.partitions(chunk_size):
+            ids, seqs, skus, ts, target, actual, valve = zip(*rows)
+            n = len(rows)
+            chunk = {
+                "id": np.fromiter(ids, dtype=np.int64, count=n),
+                "seq": np.fromiter(seqs, dtype=np.int64, count=n),
+                "ts": pd.to_datetime(list(ts), utc=True).as_unit("ns").asi8,
+                "target_ml": np.fromiter(target, dtype=np.float32, count=n),
+                "actual_ml": np.array(actual, dtype=np.float64).astype(np.float32),  # None → NaN
+                "valve_ms": np.fromiter(valve, dtype=np.float32, count=n),
+            }
+            sku_arr = np.asarray(skus, dtype=object)
+            for sku in pd.unique(sku_arr):
+                mask = sku_arr == sku
+                added[sku] = added.get(sku, 0) + self._append(sku, {k: v[mask] for k, v in chunk.items()})
+
+            if advance:
+                write_json(self.root / "manifest.json", {"last_id": int(chunk["id"][-1])})
+
+    def sync(self, db, chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+        """DB 와 어긋난 SKU 는 다시 export, 나머지는 last_id 이후 행만 append. 반환: SKU별 추가 행 수"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        added: Dict[str, int] = {}
+        columns = (Cycle.id, Cycle.seq, Cycle.sku, Cycle.created_at,
+                   Cycle.target_ml, Cycle.actual_ml, Cycle.valve_ms)
+
+        with exclusive(self.root / ".lock"):
+            last_id = self.last_id()
+            if last_id and int(db.execute(select(func.max(Cycle.id))).scalar() or 0) < last_id:
+                # id 가 watermark 아래로 되돌아감 → watermark 자체를 믿을 수 없음
+                print("[FEATURES] cycles max id below watermark, rebuilding all SKUs")
+                self._drop(None)
+                last_id = 0
+
+            stale = self._stale_skus(db, last_id) if last_id else []
+            if stale:
+                print(f"[FEATURES] rebuilding stale SKUs: {stale}")
+                for sku in stale:
+                    # 아카이브된 이력(archived_id 이하)은 DB 에 없으므로 남기고 그 뒤만 다시 export
+                    floor = int(self._sku_manifest(sku).get("archived_id", 0))
+                    self._truncate(sku, floor)
+                    stmt = (select(*columns)
+                            .where(Cycle.sku == sku, Cycle.id > floor, Cycle.id <= last_id)
+                            .order_by(Cycle.id.asc()))
+                    self._export(db, stmt, chunk_size, added, advance=False)
+
+            upper = self._upper_bound(db, last_id)
+            stmt = select(*columns).where(Cycle.id > last_id).order_by(Cycle.id.asc())
+            if upper is not None:
+                stmt = stmt.where(Cycle.id <= upper)
+            self._export(db, stmt, chunk_size, added, advance=True)
+
+        if added:
+            print(f"[FEATURES] synced {sum(added.values())} rows: {added}")
+        return added
+
+    # ========== 오프라인 분석용 요약 ==========
+
+    def stats(self) -> Dict[str, dict]:
+        out = {}
+        for sku in self.skus():
+            c = self.read(sku, ["ts", "error"])
+            err = c["error"][~np.isnan(c["error"])]
+            out[sku] = {
+                "rows": int(len(c["ts"])),
+                "first_ts": str(np.datetime64(int(c["ts"][0]), "ns")) if len(c["ts"]) else None,
+                "last_ts": str(np.datetime64(int(c["ts"][-1]), "ns")) if len(c["ts"]) else None,
+                "error_mean": float(err.mean()) if len(err) else None,
+                "error_std": float(err.std()) if len(err) else None,
+            }
+        return out
+
+
+def recipe_id_map(db) -> Dict[str, int]:
+    return {sku: int(rid) for sku, rid in db.execute(select(Recipe.sku_id, Recipe.id)).all()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cmd", choices=["sync", "stats"])
+    args = parser.parse_args()
+
+    store = FeatureStore()
+    if args.cmd == "sync":
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            store.sync(db)
+        finally:
+            db.close()
+    print(json.dumps(store.stats(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
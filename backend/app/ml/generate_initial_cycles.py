@@ -28,6 +28,11 @@ def generate_initial_cycles(
     db.query(Cycle).filter(Cycle.sku == sku).delete()
     db.commit()
 
+    # 지운 id 가 재사용될 수 있어 feature store 의 이 SKU 스냅샷도 버림 (다음 sync 때 다시 export)
+    from app.ml.feature_store import FeatureStore
+
+    FeatureStore().invalidate([sku])
+
     seq = 1
     valve_ms = base_ms  # 첫 cycle은 1000ms (과충전 상태)
 
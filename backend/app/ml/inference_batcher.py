@@ -0,0 +1,142 @@
+# app/ml/inference_batcher.py
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.ml.numpy_lstm import forward_batch
+
+
+@dataclass
+class _Request:
+    key: str
+    model: Any
+    x: np.ndarray            # (T, F) 스케일 변환된 입력 윈도우
+    deadline: float          # time.monotonic() 기준 만료 시각
+    enqueued: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    """여러 라인/스레드의 batch-size-1 예측 요청을 짧은 window 동안 모아
+    모델별로 한 번의 forward 로 처리하는 스케줄러.
+
+    - 요청은 (모델 객체, 시퀀스 길이) 로 묶는다. LSTM-A 윈도우 길이는 고정이라
+      패딩 없이 그대로 stack 된다. 길이가 다르면 별도 배치로 분리된다.
+    - key 가 아니라 모델 객체 기준: 같은 key 라도 재학습 reload 전후 요청이 한 window 에
+      섞이면 각자 넣은 모델로 계산된다 (요청이 모델을 참조하고 있어 id 는 배치 동안 유일).
+    - forward 전에 deadline 이 지난 요청은 TimeoutError 로 즉시 실패시킨다
+      (호출 측은 기본 밸브값 등으로 fallback).
+    """
+
+    def __init__(self, window_ms: float = 2.0, max_batch: int = 64) -> None:
+        self.window_s = float(window_ms) / 1000.0
+        self.max_batch = int(max_batch)
+
+        self._cond = threading.Condition()
+        self._pending: List[_Request] = []
+        self._thread: threading.Thread | None = None
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._expired = 0
+        self._max_batch_seen = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+
+    # ========== 진입점 ==========
+
+    def predict(self, key: str, model: Any, x: np.ndarray, deadline_ms: float) -> float:
+        """x(T, F) 하나를 배치 큐에 넣고 결과를 기다린다. deadline 초과 시 TimeoutError."""
+        self._ensure_thread()
+
+        now = time.monotonic()
+        req = _Request(key=key, model=model, x=np.asarray(x, dtype=np.float32),
+                       deadline=now + deadline_ms / 1000.0)
+        with self._cond:
+            self._pending.append(req)
+            self._cond.notify()
+
+        # deadline 이 지나면 future 가 TimeoutError 로 끝나거나, 여기서 대기 시간 초과
+        return req.future.result(timeout=max(deadline_ms / 1000.0, 0.0) + self.window_s)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="lstm-batcher", daemon=True)
+                self._thread.start()
+
+    # ========== 워커 ==========
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # 첫 요청 도착 후 window 동안 더 모은다 (max_batch 차면 즉시)
+                first = self._pending[0].enqueued
+                while len(self._pending) < self.max_batch:
+                    remaining = first + self.window_s - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+
+            try:
+                self._run(batch)
+            except Exception as e:
+                for r in batch:
+                    if not r.future.done():
+                        r.future.set_exception(e)
+
+    def _run(self, batch: List[_Request]) -> None:
+        now = time.monotonic()
+        groups: Dict[Tuple[int, int], List[_Request]] = defaultdict(list)
+
+        for r in batch:
+            if now > r.deadline:
+                r.future.set_exception(TimeoutError(f"inference deadline exceeded ({r.key})"))
+                with self._stats_lock:
+                    self._expired += 1
+                continue
+            groups[(id(r.model), r.x.shape[0])].append(r)
+
+        for reqs in groups.values():
+            model = reqs[0].model
+            preds = forward_batch(model, np.stack([r.x for r in reqs])).tolist()
+
+            waits = [now - r.enqueued for r in reqs]
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(reqs)
+                self._max_batch_seen = max(self._max_batch_seen, len(reqs))
+                self._wait_total_s += sum(waits)
+                self._wait_max_s = max(self._wait_max_s, max(waits))
+
+            for r, p in zip(reqs, preds):
+                r.future.set_result(float(p))
+
+    # ========== 통계 ==========
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window_s * 1000.0,
+                "batches": self._batches,
+                "requests": self._requests,
+                "expired": self._expired,
+                "mean_batch_size": (self._requests / self._batches) if self._batches else 0.0,
+                "max_batch_size": self._max_batch_seen,
+                "mean_queue_wait_ms": (self._wait_total_s / self._requests * 1000.0) if self._requests else 0.0,
+                "max_queue_wait_ms": self._wait_max_s * 1000.0,
+            }
@@ -1,41 +1,178 @@
 # app/ml/lstm_a.py
 
-import joblib
-import torch
-import numpy as np
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
 from pathlib import Path
-from app.ml.ml_a_model import LSTMA
+from app.core.config import settings
+from app.ml.model_registry import ModelEntry, ModelRegistry, estimate_nbytes
+
+# numpy / joblib(sklearn) / torch 는 첫 사용 시점에 지연 import (앱 기동 속도)
 
 MODEL_DIR = Path("models")
 MODEL_DIR.mkdir(exist_ok=True)
 
 
+def _backend_label():
+    return "numpy" if settings.ML_BACKEND == "numpy" else f"torch/{settings.ML_TORCH_MODE}"
+
+
+def load_lstm_a_entry(sku, bundle_path=None) -> ModelEntry:
+    """디스크에서 sku별 LSTM-A 모델과 스케일러 로드
+
+    - 버전 번들(lstm_a_{sku}.v{N}.bundle)이 있으면 최신(또는 지정) 버전을 memory-map 으로 로드
+    - 없으면 기존 .pt(.npz) + 스케일러 .pkl 로드
+    """
+    from app.ml.model_bundle import latest_bundle_path, load_bundle
+
+    bundle_path = bundle_path or latest_bundle_path(MODEL_DIR, "lstm_a", sku)
+    if bundle_path is not None:
+        return _entry_from_bundle(sku, load_bundle(bundle_path))
+    return _load_legacy_entry(sku)
+
+
+def _entry_from_bundle(sku, bundle) -> ModelEntry:
+    from app.ml.model_bundle import build_serving_model
+
+    model = build_serving_model(bundle.weights(), "lstm_a")
+    if settings.ML_BACKEND != "numpy":
+        from app.ml.quantize import optimize_model
+
+        model = optimize_model(model)
+    scaler = bundle.scaler("x_scaler")
+    y_scaler = bundle.scaler("y_scaler")
+
+    print(f"[LSTM-A] loaded model for {sku} v{bundle.version} ({_backend_label()})")
+    return ModelEntry(
+        sku=sku, model=model, scaler=scaler, y_scaler=y_scaler,
+        version=bundle.version, window_size=bundle.window_size,
+        feature_order=bundle.feature_order,
+        nbytes=estimate_nbytes(model, scaler),
+        extra={"path": str(bundle.path), "metadata": bundle.metadata},
+    )
+
+
+def _load_legacy_entry(sku) -> ModelEntry:
+    """ML_BACKEND=numpy 면 export_numpy 로 만든 .npz 를 NumPy 커널로 로드(torch 미사용)."""
+    import joblib
+    from app.ml.numpy_lstm import NumpyLSTM
+
+    if settings.ML_BACKEND == "numpy":
+        model = NumpyLSTM.load(MODEL_DIR / f"lstm_a_{sku}.npz")
+    else:
+        import torch
+        from app.ml.ml_a_model import LSTMA
+
+        model = LSTMA()
+        from app.ml.quantize import optimize_model
+
+        model.load_state_dict(torch.load(MODEL_DIR / f"lstm_a_{sku}.pt", map_location="cpu"))
+        model = optimize_model(model)
+
+    # train_lstm_a 는 _x_scaler / _y_scaler 로 저장 (예전 _scaler.pkl 도 허용)
+    x_scaler_path = MODEL_DIR / f"lstm_a_{sku}_x_scaler.pkl"
+    if not x_scaler_path.exists():
+        x_scaler_path = MODEL_DIR / f"lstm_a_{sku}_scaler.pkl"
+    scaler = joblib.load(x_scaler_path)
+
+    y_scaler_path = MODEL_DIR / f"lstm_a_{sku}_y_scaler.pkl"
+    y_scaler = joblib.load(y_scaler_path) if y_scaler_path.exists() else None
+
+    print(f"[LSTM-A] loaded model for {sku} ({_backend_label()})")
+    return ModelEntry(sku=sku, model=model, scaler=scaler, y_scaler=y_scaler,
+                      nbytes=estimate_nbytes(model, scaler))
+
+
 class LstmAController:
     def __init__(self):
-        self.device = torch.device("cpu")
-        self.model = None
-        self.scaler = None
-        self.loaded_sku = None     # 어떤 SKU 모델이 로드되었는지 기억
+        # SKU별 모델 LRU 캐시 (SKU 전환 시 디스크 재로드 없음)
+        self.registry = ModelRegistry(
+            loader=load_lstm_a_entry,
+            max_bytes=int(settings.LSTM_A_CACHE_MB * 1024 * 1024),
+        )
+        self._batcher = None
+
+    @property
+    def batcher(self):
+        """여러 라인의 동시 예측을 모아서 한 번에 forward (window 0이면 None, 첫 사용 시 생성)"""
+        if self._batcher is None and settings.LSTM_A_BATCH_WINDOW_MS > 0:
+            from app.ml.inference_batcher import MicroBatcher
+
+            self._batcher = MicroBatcher(window_ms=settings.LSTM_A_BATCH_WINDOW_MS)
+        return self._batcher
 
     # ---------------------------------------------------
     # 모델 자동 로드
     # ---------------------------------------------------
-    def ensure_loaded(self, sku):
-        """sku별 LSTM-A 모델과 스케일러 자동 로드"""
-        if self.loaded_sku == sku and self.model is not None:
-            return  # 이미 로드됨
+    def ensure_loaded(self, sku) -> ModelEntry:
+        """sku별 LSTM-A 모델과 스케일러 (캐시에 없을 때만 로드)"""
+        return self.registry.get(sku)
 
-        model_path = MODEL_DIR / f"lstm_a_{sku}.pt"
-        scaler_path = MODEL_DIR / f"lstm_a_{sku}_scaler.pkl"
+    def preload_active(self, skus, pin=True):
+        """활성 레시피 SKU 모델을 미리 올리고 pin (모델 파일 없는 SKU는 건너뜀)"""
+        failed = self.registry.preload(skus, pin=pin)
+        for sku, reason in failed.items():
+            print(f"[LSTM-A] preload skipped {sku}: {reason}")
+        return failed
 
-        self.model = LSTMA()
-        self.model.load_state_dict(torch.load(model_path, map_location="cpu"))
-        self.model.eval()
-
-        self.scaler = joblib.load(scaler_path)
-
-        self.loaded_sku = sku
-        print(f"[LSTM-A] loaded model for {sku}")
+    # ---------------------------------------------------
+    # 번들 hot reload (재시작 없이 새 버전으로 교체)
+    # ---------------------------------------------------
+    def reload(self, sku, version=None) -> ModelEntry:
+        """최신(또는 지정 version) 번들을 로드해 캐시 엔트리를 원자적으로 교체"""
+        from app.ml.model_bundle import bundle_name, latest_bundle_path
+
+        if version is not None:
+            path = MODEL_DIR / bundle_name("lstm_a", sku, int(version))
+        else:
+            path = latest_bundle_path(MODEL_DIR, "lstm_a", sku)
+        if path is None or not path.exists():
+            raise FileNotFoundError(f"no LSTM-A bundle for {sku} (version={version})")
+
+        entry = load_lstm_a_entry(sku, bundle_path=path)
+        self.registry.put(entry)
+        print(f"[LSTM-A] hot-swapped {sku} -> v{entry.version}")
+        return entry
+
+    def check_for_updates(self):
+        """캐시에 올라온 SKU 중 디스크에 더 새 번들이 있는 것만 reload"""
+        from app.ml.model_bundle import list_versions
+
+        swapped = []
+        for entry in self.registry.entries():
+            versions = list_versions(MODEL_DIR, "lstm_a", entry.sku)
+            if versions and versions[-1][0] > (entry.version or 0):
+                try:
+                    self.reload(entry.sku)
+                    swapped.append(entry.sku)
+                except Exception as e:
+                    print(f"[LSTM-A] reload {entry.sku} failed:", repr(e))
+        return swapped
+
+    def start_watcher(self, interval_s):
+        """MODEL_DIR 를 주기적으로 확인해 새 번들 버전을 자동 반영하는 데몬 스레드"""
+        if interval_s <= 0 or getattr(self, "_watcher", None) is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval_s)
+                self.check_for_updates()
+
+        self._watcher = threading.Thread(target=loop, name="lstm-a-watcher", daemon=True)
+        self._watcher.start()
+        print(f"[LSTM-A] bundle watcher started (every {interval_s}s)")
+
+    def warmup(self):
+        """캐시에 올라온 모델마다 더미 입력으로 forward 1회 (첫 예측 지연 제거)"""
+        import numpy as np
+        from app.ml.numpy_lstm import forward_batch
+
+        warmed = []
+        for entry in self.registry.entries():
+            forward_batch(entry.model, np.zeros((1, entry.window_size, 3), dtype=np.float32))
+            warmed.append(entry.sku)
+        return warmed
 
     # ---------------------------------------------------
     # LSTM-A 기반 예측 핵심 함수
@@ -56,18 +193,27 @@ class LstmAController:
         if sku != "CIDER_500":
             return recipe.base_valve_ms
 
+        # ⭐ 모델 자동 로딩 (LRU 캐시)
+        entry = self.ensure_loaded(sku)
+        return self.predict_with_entry(entry, recipe, recent_cycles)
+
+    def predict_with_entry(self, entry, recipe, recent_cycles, use_batcher=True, verbose=True):
+        """로드된 entry 로 다음 valve_ms 계산 (백테스트는 use_batcher=False, verbose=False 로 직접 호출)"""
+        T = entry.window_size
+
         # ⭐ 최근 cycle이 부족하면 기본값 사용
-        if len(recent_cycles) < 5:
-            print("[LSTM-A] insufficient history, using base")
+        if len(recent_cycles) < T:
+            if verbose:
+                print("[LSTM-A] insufficient history, using base")
             return recipe.base_valve_ms
 
-        # ⭐ 모델 자동 로딩
-        self.ensure_loaded(sku)
+        import numpy as np
+        from app.ml.numpy_lstm import forward_batch
 
         # ---------------------------------------------------
-        # 입력 윈도우 생성 (최근 5개)
+        # 입력 윈도우 생성 (최근 window_size 개)
         # ---------------------------------------------------
-        window = recent_cycles[-5:]
+        window = recent_cycles[-T:]
         seq = []
 
         for c in window:
@@ -78,19 +224,31 @@ class LstmAController:
                 c.target_ml       # 목표 ml
             ])
 
-        x = np.array(seq, dtype=np.float32).reshape(1, 5, 3)
+        x = np.array(seq, dtype=np.float32).reshape(1, T, 3)
 
         # 스케일 변환
-        x_scaled = self.scaler.transform(
+        x_scaled = entry.scaler.transform(
             x.reshape(1, -1)
-        ).reshape(1, 5, 3)
-
-        x_tensor = torch.tensor(x_scaled, dtype=torch.float32)
+        ).reshape(1, T, 3)
 
         # ---------------------------------------------------
-        # LSTM 예측
+        # LSTM 예측 (micro-batch 큐 경유, deadline 초과 시 기본값)
         # ---------------------------------------------------
-        pred = self.model(x_tensor).item()
+        if use_batcher and self.batcher is not None:
+            try:
+                pred = self.batcher.predict(
+                    recipe.sku_id, entry.model, x_scaled[0],
+                    deadline_ms=settings.LSTM_A_BATCH_DEADLINE_MS,
+                )
+            except (TimeoutError, FutureTimeout) as e:
+                print(f"[LSTM-A] {e!r}, using base")
+                return recipe.base_valve_ms
+        else:
+            pred = float(forward_batch(entry.model, x_scaled.astype(np.float32))[0])
+
+        # 학습 시 y 도 스케일했으므로 원래 ms 단위로 복원
+        if entry.y_scaler is not None:
+            pred = float(entry.y_scaler.inverse_transform(np.array([[pred]], dtype=np.float32))[0, 0])
 
         # ---------------------------------------------------
         # 오차 기반 강화 보정 (너의 로직 유지)
@@ -101,7 +259,8 @@ class LstmAController:
         pred_adj = pred - err * 0.9  # 보정 적용
         pred_adj = max(80, min(pred_adj, 2000))  # 범위 제한
 
-        print(f"[LSTM-A] raw={pred:.1f}, adj={pred_adj:.1f}")
+        if verbose:
+            print(f"[LSTM-A] raw={pred:.1f}, adj={pred_adj:.1f}")
 
         return pred_adj
 
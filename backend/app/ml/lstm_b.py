@@ -4,14 +4,15 @@ from __future__ import annotations
 
 from typing import Dict, Any, Sequence, Optional
 
-import numpy as np
-
-from .ml_b_model import LSTMB
-from .ml_b_spc import compute_spc_cusum
+from app.core.config import settings
 
 
 # 글로벌 LSTM-B 모델 핸들 (옵션, 없으면 CUSUM-only 모드)
-LSTM_B_MODEL: Optional[LSTMB] = None
+# ML_BACKEND=torch 면 LSTMB, numpy 면 NumpyLSTM
+LSTM_B_MODEL: Optional[Any] = None
+
+# 학습 시 recipe_id → recipe_idx 매핑 등 (train_lstm_b 가 lstm_b_meta.json 으로 저장)
+LSTM_B_META: Dict[str, Any] = {}
 
 
 def load_lstm_b_model(model_path: str) -> None:
@@ -21,19 +22,37 @@ def load_lstm_b_model(model_path: str) -> None:
     model_path 가 비어 있거나 파일이 존재하지 않으면
     아무 것도 하지 않고 CUSUM-only 모드로 동작한다.
     """
+    import json
     import os
 
-    global LSTM_B_MODEL
+    global LSTM_B_MODEL, LSTM_B_META
 
     if not model_path:
         return
 
+    meta_path = os.path.join(os.path.dirname(model_path), "lstm_b_meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            LSTM_B_META = json.load(f)
+
+    if settings.ML_BACKEND == "numpy":
+        # export_numpy 로 변환한 .npz 번들 사용 (torch import 없음)
+        model_path = os.path.splitext(model_path)[0] + ".npz"
+        if not os.path.exists(model_path):
+            return
+        from .numpy_lstm import NumpyLSTM
+
+        LSTM_B_MODEL = NumpyLSTM.load(model_path)
+        print(f"[LSTM-B] 모델 로드 완료(numpy): {model_path}")
+        return
+
     if not os.path.exists(model_path):
         # 학습된 모델이 아직 없는 경우에는 그냥 None 유지
         return
 
     # torch는 여기서만 지연 임포트해서, 서버 기동 시 한 번만 불러오도록 한다.
     import torch
+    from .ml_b_model import LSTMB
 
     model = LSTMB()
     state = torch.load(model_path, map_location="cpu")
@@ -43,10 +62,12 @@ def load_lstm_b_model(model_path: str) -> None:
         state = state["state_dict"]
 
     model.load_state_dict(state)
-    model.eval()
 
-    LSTM_B_MODEL = model
-    print(f"[LSTM-B] 모델 로드 완료: {model_path}")
+    # ML_TORCH_MODE: float(eager) / int8(dynamic 양자화) / script(TorchScript freeze)
+    from .quantize import optimize_model
+
+    LSTM_B_MODEL = optimize_model(model)
+    print(f"[LSTM-B] 모델 로드 완료({settings.ML_TORCH_MODE}): {model_path}")
 
 
 def get_spc_state_from_errors(errors: Sequence[float]) -> Dict[str, Any]:
@@ -54,8 +75,11 @@ def get_spc_state_from_errors(errors: Sequence[float]) -> Dict[str, Any]:
 
     현재 구현은 error 전체를 표준화한 뒤 CUSUM 통계를 계산하고,
     결과를 기반으로 OK / WARN / ALARM 상태를 판정한다.
-    (LSTM-B는 현재 학습/분석용으로만 사용하고, 실시간 SPC 입력은 error 기반)
+    (LSTM-B 예측 기반 조기 경보는 get_predictive_spc_state / predictive_spc_service 참고)
     """
+    import numpy as np
+    from .ml_b_spc import compute_spc_cusum
+
     # numpy array 로 변환
     errors_arr = np.asarray(list(errors), dtype=float)
 
@@ -77,3 +101,66 @@ def get_spc_state_from_errors(errors: Sequence[float]) -> Dict[str, Any]:
     info["n_samples"] = int(errors_arr.size)
 
     return info
+
+
+def forecast_errors_batch(windows, horizon: int = 5):
+    """windows (S, seq_len, 3) [error, recipe_idx, line_idx] → (S, horizon) 다음 error 재귀 예측.
+
+    스텝마다 전체 SKU 를 한 번의 forward 로 처리하고, 예측값을 윈도우 끝에 붙여 다음 스텝 입력으로 쓴다.
+    """
+    import numpy as np
+    from .numpy_lstm import forward_batch
+
+    if LSTM_B_MODEL is None:
+        raise RuntimeError("LSTM-B 모델이 로드되지 않았습니다.")
+
+    x = np.array(windows, dtype=np.float32)
+    out = np.empty((x.shape[0], horizon), dtype=np.float32)
+    for k in range(horizon):
+        pred = forward_batch(LSTM_B_MODEL, x)
+        out[:, k] = pred
+        x = np.roll(x, -1, axis=1)  # recipe/line idx 는 윈도우 내에서 동일
+        x[:, -1, 0] = pred
+    return out
+
+
+def get_predictive_spc_state(errors: Sequence[float], forecast: Sequence[float]) -> Dict[str, Any]:
+    """현재 CUSUM 은 OK 인데, 예측 error 를 이어 붙이면 WARN/ALARM 이 되는 경우 PREDICTED_DRIFT.
+
+    예측 구간도 과거 구간의 mean/std 로 표준화해 평가한다.
+    """
+    import numpy as np
+    from .ml_b_spc import compute_spc_cusum
+
+    errors_arr = np.asarray(list(errors), dtype=float)
+    forecast_arr = np.asarray(list(forecast), dtype=float)
+
+    now = compute_spc_cusum(errors_arr)
+    ahead = compute_spc_cusum(
+        np.concatenate([errors_arr, forecast_arr]), mean=now["mean"], std=now["std"],
+    )
+
+    predicted = now["spc_state"] == "OK" and ahead["spc_state"] in ("WARN", "ALARM")
+    return {
+        "spc_state": "PREDICTED_DRIFT" if predicted else now["spc_state"],
+        "alarm_type": ahead["alarm_type"] if predicted else now["alarm_type"],
+        "predicted_level": ahead["spc_state"],
+        "forecast": [float(v) for v in forecast_arr],
+        "mean": now["mean"],
+        "std": now["std"],
+        "cusum_pos": ahead["cusum_pos"],
+        "cusum_neg": ahead["cusum_neg"],
+        "n_samples": int(errors_arr.size),
+    }
+
+
+def warmup_lstm_b_model(seq_len: int = 20) -> bool:
+    """LSTM-B 가 로드되어 있으면 더미 입력으로 forward 1회."""
+    if LSTM_B_MODEL is None:
+        return False
+
+    import numpy as np
+    from .numpy_lstm import forward_batch
+
+    forward_batch(LSTM_B_MODEL, np.zeros((1, seq_len, 3), dtype=np.float32))
+    return True
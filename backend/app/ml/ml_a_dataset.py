@@ -1,6 +1,42 @@
 # app/ml/ml_a_dataset.py
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import select
+
+from app.db.models.cycle import Cycle
+
+# DB 에서 한 번에 가져오는 행 수 (server-side cursor chunk)
+CHUNK_SIZE = 50_000
+
+
+def lstm_a_features(actual, valve, target, K=1.2):
+    """컬럼 배열 → feats (N, 3) [actual, valve, target], labels (N,) 오차 기반 next valve_ms"""
+    actual = np.asarray(actual, dtype=np.float32)
+    valve = np.asarray(valve, dtype=np.float32)
+    target = np.asarray(target, dtype=np.float32)
+
+    # actual 이 비어 있으면(NaN) target 으로 대체
+    actual = np.where(np.isnan(actual), target, actual)
+
+    # 오차 → next valve_ms (제어기 타깃)
+    error = actual - target
+    labels = np.clip(valve - K * error, 80, 2000).astype(np.float32)
+
+    feats = np.stack([actual, valve, target], axis=1)
+    return feats, labels
+
+
+def windows_from_features(feats, labels, window_size=5):
+    """feats (N, F) → X (N-window, window, F) 는 복사 없는 stride view, y (N-window,)"""
+    if len(feats) <= window_size:
+        raise ValueError("Not enough cycle data for LSTM-A dataset")
+
+    # sliding_window_view: (N-window+1, 1, window, F) → 마지막 창은 label 이 없으므로 제외
+    X = sliding_window_view(feats, (window_size, feats.shape[1]))[:-1, 0]
+    y = labels[window_size:]
+    return X, y
+
 
 def build_lstm_a_dataset(cycles, window_size=5, K=1.2):
     """
@@ -11,35 +47,61 @@ def build_lstm_a_dataset(cycles, window_size=5, K=1.2):
 
     # 정렬
     cycles = sorted(cycles, key=lambda x: x.seq)
+    n = len(cycles)
 
-    feats = []
-    labels = []
+    actual = np.fromiter((np.nan if c.actual_ml is None else c.actual_ml for c in cycles),
+                         dtype=np.float32, count=n)
+    valve = np.fromiter((c.valve_ms for c in cycles), dtype=np.float32, count=n)
+    target = np.fromiter((c.target_ml for c in cycles), dtype=np.float32, count=n)
 
-    for c in cycles:
-        actual = float(c.actual_ml if c.actual_ml is not None else c.target_ml)
-        valve  = float(c.valve_ms)
-        target = float(c.target_ml)
+    feats, labels = lstm_a_features(actual, valve, target, K=K)
+    return windows_from_features(feats, labels, window_size=window_size)
 
-        # 오차
-        error = actual - target
 
-        # next valve_ms (제어기 타깃)
-        valve_next = valve - K * error
-        valve_next = max(80, min(valve_next, 2000))
+# ---------------------------------------------------
+# DB 직접 로드 (ORM 객체 없이 chunk 단위 컬럼 배열)
+# ---------------------------------------------------
 
-        feats.append([actual, valve, target])
-        labels.append(valve_next)
+def load_cycle_columns(db, sku, limit=None, chunk_size=CHUNK_SIZE):
+    """sku 의 cycles 를 seq 순으로 server-side cursor 로 읽어 컬럼 배열 dict 로 반환.
 
-    feats = np.array(feats, dtype=np.float32)
-    labels = np.array(labels, dtype=np.float32)
+    limit 가 있으면 최근 limit 개만. 행을 ORM 객체로 만들지 않고 chunk 마다
+    float32 배열로 변환하므로 메모리는 최종 컬럼 크기(행당 16B) + chunk 1개 수준.
+    """
+    cols = (Cycle.id, Cycle.actual_ml, Cycle.valve_ms, Cycle.target_ml)
+    if limit is not None:
+        recent = (
+            select(Cycle.seq, *cols).where(Cycle.sku == sku)
+            .order_by(Cycle.seq.desc()).limit(limit).subquery()
+        )
+        stmt = select(recent.c.id, recent.c.actual_ml, recent.c.valve_ms, recent.c.target_ml).order_by(
+            recent.c.seq.asc()
+        )
+    else:
+        stmt = select(*cols).where(Cycle.sku == sku).order_by(Cycle.seq.asc())
 
-    if len(feats) <= window_size:
-        raise ValueError("Not enough cycle data for LSTM-A dataset")
+    ids, actual, valve, target = [], [], [], []
+    result = db.connection().execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    for chunk in result.partitions(chunk_size):
+        arr = np.array(chunk, dtype=np.float64).reshape(-1, 4)  # None → nan
+        ids.append(arr[:, 0].astype(np.int64))
+        actual.append(arr[:, 1].astype(np.float32))
+        valve.append(arr[:, 2].astype(np.float32))
+        target.append(arr[:, 3].astype(np.float32))
+
+    def cat(parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
 
-    X, y = [], []
+    return {
+        "id": cat(ids, np.int64),
+        "actual_ml": cat(actual, np.float32),
+        "valve_ms": cat(valve, np.float32),
+        "target_ml": cat(target, np.float32),
+    }
 
-    for i in range(window_size, len(feats)):
-        X.append(feats[i - window_size:i])
-        y.append(labels[i])
 
-    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
\ No newline at end of file
+def build_lstm_a_dataset_from_db(db, sku, window_size=5, K=1.2, limit=None, chunk_size=CHUNK_SIZE):
+    """build_lstm_a_dataset 과 같은 X, y 를 ORM 객체 없이 DB cursor 에서 바로 생성"""
+    cols = load_cycle_columns(db, sku, limit=limit, chunk_size=chunk_size)
+    feats, labels = lstm_a_features(cols["actual_ml"], cols["valve_ms"], cols["target_ml"], K=K)
+    return windows_from_features(feats, labels, window_size=window_size)
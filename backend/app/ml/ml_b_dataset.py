@@ -1,9 +1,90 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import select
+
+from app.db.models.cycle import Cycle
+from app.db.models.recipe import Recipe
 
 # LSTM-B 입력 시퀀스 길이 (최근 몇 개 샘플을 한 번에 볼지)
 SEQ_LEN = 20
 
+# server-side cursor 에서 한 번에 가져오는 행 수
+CHUNK_SIZE = 50_000
+
+# cycles 테이블에는 라인 컬럼이 없고 단일 라인(line_state 의 "line1")으로 운영 중
+DEFAULT_LINE_ID = "line1"
+
+
+# ---------------------------------------------------
+# cycles ⨝ recipes 컬럼 단위 chunk 로더
+# ---------------------------------------------------
+
+def iter_fill_chunks(db, start=None, end=None, line_id=None, chunk_size=CHUNK_SIZE):
+    """cycles ⨝ recipes 를 server-side cursor 로 읽어 chunk 마다 타입 지정된 NumPy 컬럼 dict 를 yield.
+
+    - start/end: created_at 범위 [start, end)
+    - line_id: 라인 필터. 현재 스키마는 전부 DEFAULT_LINE_ID 이므로 다른 값이면 빈 결과
+    한 번에 메모리에 올라가는 행은 chunk_size 개뿐 (행별 dict/ORM 객체 없음).
+    """
+    if line_id is not None and line_id != DEFAULT_LINE_ID:
+        return
+
+    stmt = (
+        select(Cycle.id, Cycle.created_at, Recipe.id, Cycle.target_ml, Cycle.actual_ml)
+        .join(Recipe, Recipe.sku_id == Cycle.sku)
+        .where(Cycle.actual_ml.is_not(None))
+        .order_by(Cycle.created_at.asc(), Cycle.id.asc())
+    )
+    if start is not None:
+        stmt = stmt.where(Cycle.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(Cycle.created_at < end)
+
+    result = db.connection().execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    for chunk in result.partitions(chunk_size):
+        ids, ts, recipe_id, target, actual = zip(*chunk)
+        n = len(chunk)
+        yield {
+            "id": np.fromiter(ids, dtype=np.int64, count=n),
+            "ts": pd.to_datetime(list(ts), utc=True).to_numpy(dtype="datetime64[ns]"),
+            "recipe_id": np.fromiter(recipe_id, dtype=np.int32, count=n),
+            "target_ml": np.fromiter(target, dtype=np.float32, count=n),
+            "actual_ml": np.fromiter(actual, dtype=np.float32, count=n),
+        }
+
+
+def load_fills_columns(db, start=None, end=None, line_id=None, chunk_size=CHUNK_SIZE):
+    """iter_fill_chunks 결과를 컬럼별로 이어 붙인 dict (행당 약 28B)"""
+    parts = list(iter_fill_chunks(db, start=start, end=end, line_id=line_id, chunk_size=chunk_size))
+    dtypes = {"id": np.int64, "ts": "datetime64[ns]", "recipe_id": np.int32,
+              "target_ml": np.float32, "actual_ml": np.float32}
+    return {
+        k: np.concatenate([p[k] for p in parts]) if parts else np.empty(0, dtype=dt)
+        for k, dt in dtypes.items()
+    }
+
+
+def load_fills_frame(db, start=None, end=None, line_id=None, chunk_size=CHUNK_SIZE) -> pd.DataFrame:
+    """load_fills_for_lstmB 가 기대하는 컬럼(ts, line_id, recipe_id, target_ml, actual_ml) DataFrame"""
+    cols = load_fills_columns(db, start=start, end=end, line_id=line_id, chunk_size=chunk_size)
+    df = pd.DataFrame(cols)
+    df["line_id"] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), [DEFAULT_LINE_ID])
+    return df
+
+
+def load_fills_arrow(db, start=None, end=None, line_id=None, chunk_size=CHUNK_SIZE):
+    """같은 데이터를 pyarrow.Table 로 (pyarrow 설치 시에만, chunk 가 그대로 record batch)"""
+    import pyarrow as pa
+
+    batches = [
+        pa.RecordBatch.from_pydict(chunk)
+        for chunk in iter_fill_chunks(db, start=start, end=end, line_id=line_id, chunk_size=chunk_size)
+    ]
+    if not batches:
+        return pa.table({"id": pa.array([], pa.int64())})
+    return pa.Table.from_batches(batches)
+
 
 def load_fills_for_lstmB(df: pd.DataFrame) -> pd.DataFrame:
     """DB에서 SELECT 해 온 fills DataFrame을 입력으로 받아
@@ -29,35 +110,32 @@ def load_fills_for_lstmB(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def make_sequences(df: pd.DataFrame, seq_len: int = SEQ_LEN):
+def make_sequences(df: pd.DataFrame, seq_len: int = SEQ_LEN,
+                   group_cols=("recipe_idx", "line_idx")):
     """LSTM-B 학습용 시퀀스 생성.
 
     feature: [error_ml, recipe_idx, line_idx]
     target : 다음 step의 error_ml
-    """
-
-    features = []
-    targets = []
 
-    arr_err = df["error_ml"].to_numpy()
-    arr_rec = df["recipe_idx"].to_numpy()
-    arr_line = df["line_idx"].to_numpy()
+    (recipe, line) 그룹별로 시간 순서를 유지한 채 윈도우를 만들고,
+    그룹 경계를 넘는 윈도우는 만들지 않는다.
+    """
 
-    for i in range(len(df) - seq_len):
-        x_err = arr_err[i:i + seq_len]
-        x_rec = arr_rec[i:i + seq_len]
-        x_line = arr_line[i:i + seq_len]
+    if len(df) <= seq_len:
+        return np.empty((0, seq_len, 3), dtype=np.float32), np.empty((0,), dtype=np.float32)
 
-        # (seq_len, 3) 형태
-        x = np.stack([x_err, x_rec, x_line], axis=-1)
-        y = arr_err[i + seq_len]
+    feats = df[["error_ml", "recipe_idx", "line_idx"]].to_numpy(dtype=np.float32)
 
-        features.append(x)
-        targets.append(y)
+    # 그룹 id (stable 정렬로 그룹 내 원래 순서 유지)
+    gid = df.groupby(list(group_cols), sort=False).ngroup().to_numpy()
+    order = np.argsort(gid, kind="stable")
+    feats = feats[order]
+    gid = gid[order]
 
-    if not features:
-        return np.empty((0, seq_len, 3)), np.empty((0,))
+    # 전체 배열 위 stride view → 시작/타깃 인덱스가 같은 그룹인 창만 선택
+    windows = sliding_window_view(feats, (seq_len, feats.shape[1]))[:-1, 0]  # (N-seq_len, seq_len, 3)
+    valid = gid[:-seq_len] == gid[seq_len:]
 
-    X = np.stack(features)
-    y = np.stack(targets)
+    X = windows[valid]
+    y = feats[seq_len:, 0][valid]
     return X, y
@@ -6,6 +6,8 @@ def compute_spc_cusum(
     k: float = 0.5,
     h_warn: float = 1.0,
     h_alarm: float = 2.0,
+    mean: float | None = None,
+    std: float | None = None,
 ):
     """SPC/CUSUM 기반 품질 상태 판단.
 
@@ -13,6 +15,7 @@ def compute_spc_cusum(
     k      : reference value (타깃 편차)
     h_warn : WARN 임계값
     h_alarm: ALARM 임계값
+    mean/std: 표준화 기준을 외부에서 고정할 때 (예: 과거 구간 통계로 예측 구간까지 평가)
 
     반환 값:
       {
@@ -37,8 +40,8 @@ def compute_spc_cusum(
         }
 
     # 기본 통계
-    mean = float(np.mean(errors))
-    std = float(np.std(errors) + 1e-6)  # 분산 0 방지용 epsilon
+    mean = float(np.mean(errors)) if mean is None else float(mean)
+    std = float(np.std(errors) + 1e-6) if std is None else float(std)  # 분산 0 방지용 epsilon
 
     # 표준화한 잔차 값
     z = (errors - mean) / std
@@ -70,3 +73,58 @@ def compute_spc_cusum(
         "cusum_pos": float(c_pos),
         "cusum_neg": float(c_neg),
     }
+
+
+SPC_LEVELS = ("OK", "WARN", "ALARM")
+
+
+def compute_spc_cusum_batch(
+    windows,
+    k: float = 0.5,
+    h_warn: float = 1.0,
+    h_alarm: float = 2.0,
+    mean=None,
+    std=None,
+    with_cusum: bool = False,
+):
+    """compute_spc_cusum 을 여러 윈도우에 한 번에 적용 (백테스트 등 오프라인 평가용).
+
+    windows : (M, W) 오차 윈도우
+    mean/std: (M,) 윈도우별 표준화 기준 (없으면 각 윈도우 자체 통계)
+    with_cusum: True 면 마지막(ALARM 이면 그 시점) cusum_pos / cusum_neg 도 반환
+
+    반환: (state, direction, mean, std) 또는 (state, direction, mean, std, cusum_pos, cusum_neg)
+      state     : (M,) int8, SPC_LEVELS 인덱스 (0=OK, 1=WARN, 2=ALARM)
+      direction : (M,) int8, +1 = POS_DRIFT, -1 = NEG_DRIFT, 0 = 없음
+    """
+    windows = np.asarray(windows, dtype=float)
+    M = windows.shape[0]
+
+    mean = windows.mean(axis=1) if mean is None else np.asarray(mean, dtype=float)
+    std = windows.std(axis=1) + 1e-6 if std is None else np.asarray(std, dtype=float)
+    z = (windows - mean[:, None]) / std[:, None]
+
+    c_pos = np.zeros(M)
+    c_neg = np.zeros(M)
+    state = np.zeros(M, dtype=np.int8)
+    direction = np.zeros(M, dtype=np.int8)
+    done = np.zeros(M, dtype=bool)  # ALARM 에서 break 한 윈도우
+
+    # 윈도우 길이만큼만 순회하고, 윈도우 축은 벡터 연산
+    for j in range(z.shape[1]):
+        live = ~done
+        c_pos = np.where(live, np.maximum(0.0, c_pos + z[:, j] - k), c_pos)
+        c_neg = np.where(live, np.minimum(0.0, c_neg + z[:, j] + k), c_neg)
+
+        alarm = live & ((c_pos > h_alarm) | (c_neg < -h_alarm))
+        state[alarm] = 2
+        direction[alarm] = np.where(c_pos[alarm] > h_alarm, 1, -1)
+        done |= alarm
+
+        warn = live & ~alarm & ((c_pos > h_warn) | (c_neg < -h_warn))
+        state[warn] = 1
+        direction[warn] = np.where(c_pos[warn] > h_warn, 1, -1)
+
+    if with_cusum:
+        return state, direction, mean, std, c_pos, c_neg
+    return state, direction, mean, std
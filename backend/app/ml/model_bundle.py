@@ -0,0 +1,215 @@
+# app/ml/model_bundle.py
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"SMCANMB1"
+ALIGN = 64
+BUNDLE_SUFFIX = ".bundle"
+
+# LSTM-A 입력 feature 순서 (ml_a_dataset / lstm_a.predict_next 와 동일)
+LSTM_A_FEATURES = ["actual_ml", "valve_ms", "target_ml"]
+
+
+class ArrayScaler:
+    """StandardScaler 의 mean_/scale_ 배열만 들고 있는 경량 스케일러 (sklearn 불필요)."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray) -> None:
+        self.mean_ = np.asarray(mean, dtype=np.float32)
+        self.scale_ = np.asarray(scale, dtype=np.float32)
+
+    @classmethod
+    def from_sklearn(cls, scaler: Any) -> "ArrayScaler":
+        return cls(scaler.mean_, scaler.scale_)
+
+    def transform(self, x: np.ndarray) -> np.ndarray:
+        return (np.asarray(x, dtype=np.float32) - self.mean_) / self.scale_
+
+    def inverse_transform(self, y: np.ndarray) -> np.ndarray:
+        return np.asarray(y, dtype=np.float32) * self.scale_ + self.mean_
+
+
+@dataclass
+class ModelBundle:
+    """한 파일 안에 weights + 스케일러 + 메타데이터를 담은 버전별 모델 아티팩트."""
+    path: Path
+    kind: str
+    sku: Optional[str]
+    version: int
+    window_size: int
+    feature_order: List[str]
+    metadata: Dict[str, Any]
+    tensors: Dict[str, np.ndarray] = field(repr=False)
+
+    def weights(self) -> Dict[str, np.ndarray]:
+        """x_scaler./y_scaler. 를 제외한 모델 state_dict 배열"""
+        return {k: v for k, v in self.tensors.items() if not k.startswith(("x_scaler.", "y_scaler."))}
+
+    def scaler(self, prefix: str) -> Optional[ArrayScaler]:
+        if f"{prefix}.mean" not in self.tensors:
+            return None
+        return ArrayScaler(self.tensors[f"{prefix}.mean"], self.tensors[f"{prefix}.scale"])
+
+
+# ---------------------------------------------------
+# 파일명 / 버전
+# ---------------------------------------------------
+
+def bundle_name(kind: str, sku: Optional[str], version: int) -> str:
+    stem = f"{kind}_{sku}" if sku else kind
+    return f"{stem}.v{version}{BUNDLE_SUFFIX}"
+
+
+def list_versions(model_dir: Path, kind: str, sku: Optional[str]) -> List[Tuple[int, Path]]:
+    stem = f"{kind}_{sku}" if sku else kind
+    pattern = re.compile(rf"^{re.escape(stem)}\.v(\d+){re.escape(BUNDLE_SUFFIX)}$")
+    found = []
+    if Path(model_dir).exists():
+        for p in Path(model_dir).iterdir():
+            m = pattern.match(p.name)
+            if m:
+                found.append((int(m.group(1)), p))
+    return sorted(found)
+
+
+def latest_bundle_path(model_dir: Path, kind: str, sku: Optional[str]) -> Optional[Path]:
+    versions = list_versions(model_dir, kind, sku)
+    return versions[-1][1] if versions else None
+
+
+def next_version(model_dir: Path, kind: str, sku: Optional[str]) -> int:
+    versions = list_versions(model_dir, kind, sku)
+    return versions[-1][0] + 1 if versions else 1
+
+
+# ---------------------------------------------------
+# 저장 / 로드
+# ---------------------------------------------------
+
+def save_bundle(
+    model_dir: Path,
+    kind: str,
+    sku: Optional[str],
+    weights: Dict[str, np.ndarray],
+    window_size: int,
+    feature_order: List[str],
+    x_scaler: Any = None,
+    y_scaler: Any = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    version: Optional[int] = None,
+) -> Path:
+    """번들을 tmp 파일에 쓴 뒤 os.replace 로 원자적으로 게시한다 (watcher 가 반쯤 쓴 파일을 읽지 않게)."""
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    version = version or next_version(model_dir, kind, sku)
+
+    tensors: Dict[str, np.ndarray] = {
+        k: np.ascontiguousarray(np.asarray(v, dtype=np.float32)) for k, v in weights.items()
+    }
+    for prefix, scaler in (("x_scaler", x_scaler), ("y_scaler", y_scaler)):
+        if scaler is not None:
+            tensors[f"{prefix}.mean"] = np.ascontiguousarray(np.asarray(scaler.mean_, dtype=np.float32))
+            tensors[f"{prefix}.scale"] = np.ascontiguousarray(np.asarray(scaler.scale_, dtype=np.float32))
+
+    # 데이터 영역 오프셋 계산 (64바이트 정렬)
+    table: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, arr in tensors.items():
+        offset = (offset + ALIGN - 1) // ALIGN * ALIGN
+        table[name] = {"dtype": "float32", "shape": list(arr.shape), "offset": offset, "nbytes": arr.nbytes}
+        offset += arr.nbytes
+
+    header = {
+        "format": 1,
+        "kind": kind,
+        "sku": sku,
+        "version": version,
+        "window_size": int(window_size),
+        "feature_order": list(feature_order),
+        "metadata": metadata or {},
+        "tensors": table,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix_len = len(MAGIC) + 8 + len(header_bytes)
+    header_bytes += b" " * ((-prefix_len) % ALIGN)
+
+    path = model_dir / bundle_name(kind, sku, version)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        data_start = f.tell()
+        for name, arr in tensors.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(arr.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    print(f"[BUNDLE] saved {path}")
+    return path
+
+
+def load_bundle(path: Path) -> ModelBundle:
+    """번들을 memory-map 으로 연다. tensors 는 파일을 직접 가리키는 read-only 배열."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"not a model bundle: {path}")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    data_start = len(MAGIC) + 8 + header_len
+
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    tensors = {}
+    for name, spec in header["tensors"].items():
+        start = data_start + spec["offset"]
+        raw = buf[start:start + spec["nbytes"]]
+        tensors[name] = raw.view(np.float32).reshape(spec["shape"])
+
+    return ModelBundle(
+        path=path,
+        kind=header["kind"],
+        sku=header.get("sku"),
+        version=int(header["version"]),
+        window_size=int(header["window_size"]),
+        feature_order=list(header["feature_order"]),
+        metadata=header.get("metadata", {}),
+        tensors=tensors,
+    )
+
+
+def build_serving_model(weights: Dict[str, np.ndarray], kind: str, backend: Optional[str] = None) -> Any:
+    """번들 weights → 서빙 모델 (ML_BACKEND=numpy 면 NumpyLSTM, 아니면 torch 모듈)"""
+    from app.core.config import settings
+
+    if (backend or settings.ML_BACKEND) == "numpy":
+        from app.ml.numpy_lstm import NumpyLSTM
+
+        return NumpyLSTM(weights)
+
+    import torch
+
+    if kind == "lstm_b":
+        from app.ml.ml_b_model import LSTMB as model_cls
+    else:
+        from app.ml.ml_a_model import LSTMA as model_cls
+
+    model = model_cls(
+        input_dim=weights["lstm.weight_ih_l0"].shape[1],
+        hidden_dim=weights["lstm.weight_hh_l0"].shape[1],
+        num_layers=sum(1 for k in weights if k.startswith("lstm.weight_ih_l")),
+    )
+    model.load_state_dict({k: torch.from_numpy(np.array(v)) for k, v in weights.items()})
+    model.eval()
+    return model
@@ -0,0 +1,165 @@
+# app/ml/model_registry.py
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+@dataclass
+class ModelEntry:
+    """SKU 하나에 대한 모델 + 스케일러 묶음."""
+    sku: str
+    model: Any
+    scaler: Any
+    y_scaler: Any = None
+    version: Optional[int] = None          # 번들 버전 (legacy .pt 로드는 None)
+    window_size: int = 5
+    feature_order: Optional[List[str]] = None
+    nbytes: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def estimate_nbytes(model: Any, scaler: Any = None) -> int:
+    """모델(torch 파라미터/버퍼 또는 NumPy 커널) + 스케일러 numpy 배열 크기 합(대략치)."""
+    import numpy as np
+
+    total = 0
+    if model is not None and hasattr(model, "nbytes"):
+        total += int(model.nbytes)
+    elif model is not None and hasattr(model, "parameters"):
+        for t in list(model.parameters()) + list(model.buffers()):
+            total += t.numel() * t.element_size()
+    if scaler is not None:
+        for v in vars(scaler).values():
+            if isinstance(v, np.ndarray):
+                total += v.nbytes
+    return total
+
+
+class ModelRegistry:
+    """SKU별 모델을 메모리 상한 안에서 LRU로 유지하는 thread-safe 레지스트리.
+
+    - get(sku): 캐시에 있으면 hit, 없으면 loader(sku)로 디스크에서 로드(miss)
+    - pin(sku): 활성 레시피 등은 eviction 대상에서 제외
+    - 같은 SKU를 여러 스레드가 동시에 요청해도 로드는 한 번만 수행
+    """
+
+    def __init__(self, loader: Callable[[str], ModelEntry], max_bytes: int) -> None:
+        self._loader = loader
+        self.max_bytes = int(max_bytes)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, ModelEntry]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._pinned: set[str] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ========== 조회 ==========
+
+    def get(self, sku: str) -> ModelEntry:
+        with self._lock:
+            entry = self._entries.get(sku)
+            if entry is not None:
+                self._entries.move_to_end(sku)
+                self.hits += 1
+                return entry
+            load_lock = self._loading.setdefault(sku, threading.Lock())
+
+        # 디스크 로드는 전역 락 밖에서 (SKU별 락으로 중복 로드만 방지)
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(sku)
+                if entry is not None:
+                    self._entries.move_to_end(sku)
+                    self.hits += 1
+                    return entry
+                self.misses += 1
+
+            entry = self._loader(sku)
+
+            with self._lock:
+                self._entries[sku] = entry
+                self._entries.move_to_end(sku)
+                self._loading.pop(sku, None)
+                self._evict_locked()
+            return entry
+
+    def peek(self, sku: str) -> Optional[ModelEntry]:
+        with self._lock:
+            return self._entries.get(sku)
+
+    def entries(self) -> List[ModelEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    # ========== pin / preload ==========
+
+    def pin(self, sku: str) -> None:
+        with self._lock:
+            self._pinned.add(sku)
+
+    def unpin(self, sku: str) -> None:
+        with self._lock:
+            self._pinned.discard(sku)
+            self._evict_locked()
+
+    def preload(self, skus: Iterable[str], pin: bool = False) -> Dict[str, str]:
+        """여러 SKU를 미리 로드. 실패(모델 파일 없음 등)는 건너뛰고 사유만 반환."""
+        failed: Dict[str, str] = {}
+        for sku in skus:
+            if pin:
+                self.pin(sku)
+            try:
+                self.get(sku)
+            except Exception as e:
+                failed[sku] = repr(e)
+                if pin:
+                    self.unpin(sku)
+        return failed
+
+    def put(self, entry: ModelEntry) -> None:
+        """외부에서 만든 엔트리를 교체(hot swap 등)."""
+        with self._lock:
+            self._entries[entry.sku] = entry
+            self._entries.move_to_end(entry.sku)
+            self._evict_locked()
+
+    def invalidate(self, sku: str) -> None:
+        with self._lock:
+            self._entries.pop(sku, None)
+
+    # ========== eviction ==========
+
+    def _evict_locked(self) -> None:
+        total = sum(e.nbytes for e in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for sku in list(self._entries.keys()):
+            if total <= self.max_bytes:
+                break
+            if sku in self._pinned:
+                continue
+            total -= self._entries.pop(sku).nbytes
+            self.evictions += 1
+            print(f"[MODEL] evicted {sku} (cache {total}/{self.max_bytes} bytes)")
+
+    # ========== 통계 ==========
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": list(self._entries.keys()),
+                "versions": {k: e.version for k, e in self._entries.items()},
+                "pinned": sorted(self._pinned),
+                "bytes": sum(e.nbytes for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,97 @@
+# app/ml/numpy_lstm.py
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+class NumpyLSTM:
+    """torch 없이 도는 LSTM(batch_first) + Linear(hidden→1) 추론 커널.
+
+    LSTMA / LSTMB 의 state_dict 를 그대로 받는다.
+      - lstm.weight_ih_l{k}: (4H, in), lstm.weight_hh_l{k}: (4H, H)
+      - lstm.bias_ih_l{k}, lstm.bias_hh_l{k}: (4H,)
+      - fc.weight: (1, H), fc.bias: (1,)
+    게이트 순서는 PyTorch 와 같은 i, f, g, o.
+    """
+
+    def __init__(self, weights: Dict[str, np.ndarray]) -> None:
+        self.layers = []
+        k = 0
+        while f"lstm.weight_ih_l{k}" in weights:
+            w_ih = np.asarray(weights[f"lstm.weight_ih_l{k}"], dtype=np.float32)
+            w_hh = np.asarray(weights[f"lstm.weight_hh_l{k}"], dtype=np.float32)
+            bias = (
+                np.asarray(weights[f"lstm.bias_ih_l{k}"], dtype=np.float32)
+                + np.asarray(weights[f"lstm.bias_hh_l{k}"], dtype=np.float32)
+            )
+            # matmul 시 전치 비용 없게 미리 (in, 4H) / (H, 4H) 로 보관
+            self.layers.append((np.ascontiguousarray(w_ih.T), np.ascontiguousarray(w_hh.T), bias))
+            k += 1
+
+        if not self.layers:
+            raise ValueError("LSTM weights not found in bundle")
+
+        self.fc_w = np.ascontiguousarray(np.asarray(weights["fc.weight"], dtype=np.float32).T)  # (H, 1)
+        self.fc_b = np.asarray(weights["fc.bias"], dtype=np.float32)
+
+        self.input_dim = self.layers[0][0].shape[0]
+        self.hidden_dim = self.layers[0][1].shape[0]
+        self.num_layers = len(self.layers)
+
+    @classmethod
+    def load(cls, path) -> "NumpyLSTM":
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls({k: data[k] for k in data.files})
+
+    @property
+    def nbytes(self) -> int:
+        total = self.fc_w.nbytes + self.fc_b.nbytes
+        for w_ih, w_hh, b in self.layers:
+            total += w_ih.nbytes + w_hh.nbytes + b.nbytes
+        return total
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """x: (B, T, input_dim) → (B,)"""
+        x = np.asarray(x, dtype=np.float32)
+        B, T, _ = x.shape
+        H = self.hidden_dim
+
+        seq = x
+        for w_ih, w_hh, b in self.layers:
+            # 입력 투영은 전 타임스텝을 한 번에 계산
+            xw = seq @ w_ih + b  # (B, T, 4H)
+            h = np.zeros((B, H), dtype=np.float32)
+            c = np.zeros((B, H), dtype=np.float32)
+            outs = np.empty((B, T, H), dtype=np.float32)
+            for t in range(T):
+                gates = xw[:, t, :] + h @ w_hh
+                i = _sigmoid(gates[:, 0:H])
+                f = _sigmoid(gates[:, H:2 * H])
+                g = np.tanh(gates[:, 2 * H:3 * H])
+                o = _sigmoid(gates[:, 3 * H:4 * H])
+                c = f * c + i * g
+                h = o * np.tanh(c)
+                outs[:, t, :] = h
+            seq = outs
+
+        return (seq[:, -1, :] @ self.fc_w + self.fc_b).reshape(-1)
+
+
+def forward_batch(model: Any, x: np.ndarray) -> np.ndarray:
+    """NumpyLSTM / torch 모듈 공통 배치 추론. x: (B, T, F) → (B,) numpy"""
+    if isinstance(model, NumpyLSTM):
+        return model(x)
+
+    import torch  # torch 백엔드일 때만
+
+    with torch.no_grad():
+        out = model(torch.from_numpy(np.ascontiguousarray(x, dtype=np.float32)))
+    return out.reshape(-1).numpy()
@@ -0,0 +1,279 @@
+# app/ml/online_tuner.py
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+MODEL_DIR = Path("models")
+
+# 학습 1회에 쓰는 최근 cycle 수 (새 데이터 + replay 로 과거 분포를 같이 학습)
+TUNE_WINDOW_CYCLES = 500
+VAL_RATIO = 0.15      # early stopping(best epoch 선택)용
+ACCEPT_RATIO = 0.15   # 교체 여부 판정용 (학습/선택에 쓰지 않은 마지막 구간)
+MIN_SPLIT_WINDOWS = 20
+
+
+def _split(n: int, gap: int):
+    """시간 순 train | gap | val | gap | accept 구간 (slice 3개, 안 되면 None)
+
+    window i 는 cycle i..i+T 를 쓰므로 구간 사이에 T 개를 비워야 같은 cycle 이 두 구간에 들어가지 않는다.
+    """
+    n_val = max(1, int(n * VAL_RATIO))
+    n_acc = max(1, int(n * ACCEPT_RATIO))
+    n_tr = n - n_val - n_acc - 2 * gap
+    if n_tr < MIN_SPLIT_WINDOWS:
+        return None
+    val_start = n_tr + gap
+    acc_start = val_start + n_val + gap
+    return slice(0, n_tr), slice(val_start, val_start + n_val), slice(acc_start, n)
+
+
+# ---------------------------------------------------
+# 자식 프로세스 (spawn) 에서 실행되는 부분
+# ---------------------------------------------------
+
+def _init_worker(nice: int, threads: int) -> None:
+    """학습 프로세스 우선순위를 낮추고 torch 스레드 수를 제한 (ingest/control CPU 보호)"""
+    if nice and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+    import torch
+
+    torch.set_num_threads(max(1, threads))
+
+
+def fine_tune_sku(sku: str, model_dir: str, min_new_cycles: int, max_seconds: float,
+                  min_improvement: float = 0.0, max_epochs: int = 30) -> Dict[str, Any]:
+    """현재 번들에서 이어서 학습하고, accept 구간 손실이 min_improvement(상대) 이상 좋아졌을 때만
+    새 버전 번들을 저장. best epoch 는 val 구간으로 고르고, accept 구간은 판정에만 쓴다.
+
+    반환: {"sku", "status": skipped|rejected|saved, "reason"/"version", 손실 값들}
+    """
+    import numpy as np
+    import torch
+    import torch.nn as nn
+
+    from app.db.session import SessionLocal
+    from app.ml.feature_store import FeatureStore
+    from app.ml.ml_a_dataset import load_cycle_columns, lstm_a_features, windows_from_features
+    from app.ml.model_bundle import build_serving_model, latest_bundle_path, load_bundle, save_bundle
+
+    path = latest_bundle_path(Path(model_dir), "lstm_a", sku)
+    if path is None:
+        return {"sku": sku, "status": "skipped", "reason": "no bundle"}
+    bundle = load_bundle(path)
+    last_cycle_id = int(bundle.metadata.get("last_cycle_id", 0))
+
+    db = SessionLocal()
+    try:
+        if settings.TRAIN_FROM_FEATURE_STORE:
+            store = FeatureStore()
+            store.sync(db)
+            cols = store.lstm_a_columns(sku, limit=TUNE_WINDOW_CYCLES)
+        else:
+            cols = load_cycle_columns(db, sku, limit=TUNE_WINDOW_CYCLES)
+    finally:
+        db.close()
+    done = ~np.isnan(cols["actual_ml"])  # 충전 결과가 들어온 cycle 만
+    cols = {k: v[done] for k, v in cols.items()}
+
+    n_new = int((cols["id"] > last_cycle_id).sum())
+    if n_new < min_new_cycles:
+        return {"sku": sku, "status": "skipped", "reason": f"{n_new} new cycles"}
+
+    T = bundle.window_size
+    feats, labels = lstm_a_features(cols["actual_ml"], cols["valve_ms"], cols["target_ml"], K=1.2)
+    X, y = windows_from_features(feats, labels, window_size=T)
+    N, _, F = X.shape
+
+    # 스케일러는 번들 것을 고정 사용 (서빙 입력 분포와 일치)
+    x_scaler = bundle.scaler("x_scaler")
+    y_scaler = bundle.scaler("y_scaler")
+    Xs = x_scaler.transform(X.reshape(N, -1)).reshape(N, T, F).astype(np.float32)
+    ys = y_scaler.transform(y.reshape(-1, 1)).reshape(-1).astype(np.float32)
+
+    # 시간 순 train | val | accept (구간 사이 T 개 window 간격)
+    split = _split(N, T)
+    if split is None:
+        return {"sku": sku, "status": "skipped", "reason": f"{N} windows too few for split"}
+    tr, va, ac = ((torch.from_numpy(Xs[s]), torch.from_numpy(ys[s])) for s in split)
+    x_tr, y_tr = tr
+
+    model = build_serving_model(bundle.weights(), "lstm_a", backend="torch")
+    loss_fn = nn.MSELoss()
+
+    def eval_loss(xy) -> float:
+        model.eval()
+        with torch.no_grad():
+            return float(loss_fn(model(xy[0]), xy[1]))
+
+    base_loss, accept_before = eval_loss(va), eval_loss(ac)
+    best_loss, best_state = base_loss, None
+
+    opt = torch.optim.Adam(model.parameters(), lr=1e-3)
+    t0 = time.monotonic()
+    epochs = 0
+    while epochs < max_epochs and time.monotonic() - t0 < max_seconds:
+        model.train()
+        perm = torch.randperm(len(x_tr))
+        for i in range(0, len(perm), 32):
+            idx = perm[i:i + 32]
+            opt.zero_grad()
+            loss = loss_fn(model(x_tr[idx]), y_tr[idx])
+            loss.backward()
+            opt.step()
+        epochs += 1
+
+        loss = eval_loss(va)
+        if loss < best_loss:
+            best_loss = loss
+            best_state = {k: v.detach().cpu().numpy().copy() for k, v in model.state_dict().items()}
+
+    result = {"sku": sku, "base_version": bundle.version, "n_new": n_new, "epochs": epochs,
+              "val_before": base_loss, "val_after": best_loss,
+              "accept_before": accept_before, "accept_after": accept_before,
+              "elapsed_s": time.monotonic() - t0}
+    if best_state is None:
+        result.update(status="rejected", reason="no val improvement")
+        return result
+
+    model.load_state_dict({k: torch.from_numpy(v) for k, v in best_state.items()})
+    accept_after = eval_loss(ac)
+    result["accept_after"] = accept_after
+    if accept_after > accept_before * (1.0 - min_improvement):
+        result.update(status="rejected", reason=f"accept loss improved < {min_improvement:.0%}")
+        return result
+
+    new_path = save_bundle(
+        Path(model_dir), "lstm_a", sku, best_state,
+        window_size=T,
+        feature_order=bundle.feature_order,
+        x_scaler=x_scaler,
+        y_scaler=y_scaler,
+        metadata={
+            **bundle.metadata,
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "parent_version": bundle.version,
+            "n_samples": int(N),
+            "holdout_loss": accept_after,
+            "last_cycle_id": int(cols["id"].max()),
+            "online": True,
+        },
+    )
+    result.update(status="saved", version=load_bundle(new_path).version)
+    return result
+
+
+# ---------------------------------------------------
+# 서버 프로세스 쪽 스케줄러
+# ---------------------------------------------------
+
+class OnlineTuner:
+    """주기적으로 활성 SKU 의 LSTM-A 를 별도 저우선순위 프로세스에서 fine-tune 하고,
+    개선된 번들이 나오면 LstmAController.reload 로 원자적으로 교체한다.
+
+    - 학습은 spawn 된 단일 워커 프로세스에서만 돈다 (GIL/CPU 를 ingest 경로와 나누지 않음)
+    - 워커는 nice + torch 스레드 제한, 1회 학습은 ONLINE_TUNE_MAX_SECONDS 안에서 끝낸다
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.swaps = 0
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+        self.last_error: Optional[str] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings.ONLINE_TUNE_NICE, settings.ONLINE_TUNE_THREADS),
+            )
+        return self._executor
+
+    def _active_skus(self) -> List[str]:
+        from app.db.session import SessionLocal
+        from app.services import recipes_service
+
+        db = SessionLocal()
+        try:
+            return [r.sku_id for r in recipes_service.list_recipes(db) if r.is_active]
+        finally:
+            db.close()
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        """활성 SKU 전부 한 번씩 fine-tune 시도 (호출 스레드는 결과만 기다림)"""
+        from app.ml.lstm_a import get_lstm_a_model
+
+        results = []
+        for sku in self._active_skus():
+            try:
+                res = self._get_executor().submit(
+                    fine_tune_sku, sku, str(MODEL_DIR.resolve()),
+                    settings.ONLINE_TUNE_MIN_NEW_CYCLES, settings.ONLINE_TUNE_MAX_SECONDS,
+                    settings.ONLINE_TUNE_MIN_IMPROVEMENT,
+                ).result()
+            except BrokenProcessPool as e:
+                # 워커가 죽으면 (OOM 등) 다음 호출에서 새 프로세스로 재생성
+                self._executor = None
+                res = {"sku": sku, "status": "error", "reason": repr(e)}
+            except Exception as e:
+                res = {"sku": sku, "status": "error", "reason": repr(e)}
+
+            if res.get("status") == "saved":
+                get_lstm_a_model().reload(sku, version=res["version"])
+                with self._lock:
+                    self.swaps += 1
+            print(f"[ONLINE] {res}")
+            results.append(res)
+
+        with self._lock:
+            self.runs += 1
+            self.last_results.update({r["sku"]: r for r in results})
+        return results
+
+    def start(self, interval_s: float) -> None:
+        if interval_s <= 0 or self._thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval_s)
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.last_error = repr(e)
+                    print("[ONLINE] run failed:", repr(e))
+
+        self._thread = threading.Thread(target=loop, name="lstm-a-online-tuner", daemon=True)
+        self._thread.start()
+        print(f"[ONLINE] fine-tuning every {interval_s}s")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self._thread is not None,
+                "runs": self.runs,
+                "swaps": self.swaps,
+                "last_error": self.last_error,
+                "last_results": dict(self.last_results),
+            }
+
+
+online_tuner = OnlineTuner()
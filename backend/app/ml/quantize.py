@@ -0,0 +1,211 @@
+"""
+app/ml/quantize.py
+
+torch 서빙 모델(LSTMA / LSTMB)의 CPU 추론 최적화와 float 대비 정확도/지연 리포트.
+
+- int8   : LSTM / Linear weight 를 dynamic int8 로 양자화 (activation 은 실행 시 양자화)
+- script : TorchScript 로 컴파일 후 freeze (파이썬 디스패치 오버헤드 제거, 수치는 float 와 동일)
+
+서빙 모드는 ML_TORCH_MODE 로 고른다 (lstm_a 번들/레거시 로드, lstm_b 로드 모두 적용).
+작은 모델은 배치 1 에서 int8 이 오히려 느릴 수 있으므로 엣지 박스에서 리포트로 확인 후 선택.
+
+사용법 (backend 폴더에서):
+
+    $ python -m app.ml.quantize lstm_a --sku CIDER_500
+    $ python -m app.ml.quantize lstm_b
+    $ ML_QUANT_ENGINE=qnnpack python -m app.ml.quantize lstm_a --sku CIDER_500 --threads 1
+
+리포트는 models/quant_report_<kind>_<ts>.json 으로 저장된다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.core.config import settings
+from app.ml.model_registry import estimate_nbytes
+from app.ml.numpy_lstm import forward_batch
+
+TORCH_MODES = ("float", "int8", "script")
+REPORT_DIR = Path("models")
+
+
+def optimize_model(model: nn.Module, mode: Optional[str] = None) -> nn.Module:
+    """float eager 모델 → ML_TORCH_MODE(또는 mode) 에 맞는 서빙 모듈 (eval 상태로 반환)"""
+    mode = mode or settings.ML_TORCH_MODE
+    if mode not in TORCH_MODES:
+        raise ValueError(f"unknown ML_TORCH_MODE: {mode!r} (expected one of {TORCH_MODES})")
+
+    model.eval()
+    if mode == "float":
+        return model
+
+    # 변환 후 모듈은 parameters() 가 비므로 레지스트리 메모리 계산용 크기를 따로 붙여 둔다
+    float_nbytes = estimate_nbytes(model)
+
+    with warnings.catch_warnings():
+        # torch.ao.quantization / torch.jit deprecation 경고는 서빙 로그에 남기지 않음
+        warnings.simplefilter("ignore")
+        if mode == "int8":
+            if settings.ML_QUANT_ENGINE:
+                torch.backends.quantized.engine = settings.ML_QUANT_ENGINE
+            out = torch.ao.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+            out.nbytes = float_nbytes // 4
+        else:
+            out = torch.jit.freeze(torch.jit.script(model))
+            out.nbytes = float_nbytes
+    return out
+
+
+# ---------------------------------------------------
+# 정확도 / 지연 리포트
+# ---------------------------------------------------
+
+def _latency_us(model: Any, x: np.ndarray, repeats: int) -> Dict[str, float]:
+    forward_batch(model, x)  # warmup (script 는 첫 호출에서 그래프 최적화)
+    times = np.empty(repeats)
+    for i in range(repeats):
+        t0 = time.perf_counter()
+        forward_batch(model, x)
+        times[i] = time.perf_counter() - t0
+    times *= 1e6
+    return {"p50_us": float(np.percentile(times, 50)), "p95_us": float(np.percentile(times, 95))}
+
+
+def compare_modes(model: nn.Module, X: np.ndarray, y: Optional[np.ndarray] = None,
+                  to_units=None, repeats: int = 200, batch: int = 64) -> Dict[str, Dict[str, Any]]:
+    """같은 입력 X (N, T, F) 로 모드별 출력 오차(float 대비 / 정답 대비)와 배치 1·N 지연을 잰다.
+
+    to_units: 모델 출력 → 실제 단위 변환 (LSTM-A 는 y_scaler.inverse_transform)
+    """
+    to_units = to_units or (lambda v: v)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    ref = to_units(forward_batch(model, X))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for mode in TORCH_MODES:
+        m = optimize_model(model, mode)
+        pred = to_units(forward_batch(m, X))
+        diff = pred - ref
+        r = {
+            "max_abs_diff": float(np.max(np.abs(diff))),
+            "rmse_vs_float": float(np.sqrt(np.mean(diff ** 2))),
+            "rmse_vs_label": float(np.sqrt(np.mean((pred - y) ** 2))) if y is not None else None,
+            "nbytes": int(estimate_nbytes(m)),
+            "batch1": _latency_us(m, X[:1], repeats),
+        }
+        xb = X[:batch]
+        lat = _latency_us(m, xb, max(10, repeats // 4))
+        r[f"batch{len(xb)}"] = {**lat, "per_sample_us": lat["p50_us"] / len(xb)}
+        results[mode] = r
+
+    base = results["float"]["batch1"]["p50_us"]
+    for r in results.values():
+        r["speedup_batch1"] = base / r["batch1"]["p50_us"]
+    return results
+
+
+def _lstm_a_inputs(sku: str, limit: int):
+    """최신 LSTM-A 번들 + 최근 cycles → (float 모델, 스케일된 X, y(valve_ms), 출력 단위 변환)"""
+    from app.db.session import SessionLocal
+    from app.ml.lstm_a import MODEL_DIR
+    from app.ml.ml_a_dataset import build_lstm_a_dataset_from_db
+    from app.ml.model_bundle import build_serving_model, latest_bundle_path, load_bundle
+
+    path = latest_bundle_path(MODEL_DIR, "lstm_a", sku)
+    if path is None:
+        raise FileNotFoundError(f"no LSTM-A bundle for {sku} in {MODEL_DIR}")
+    bundle = load_bundle(path)
+    model = build_serving_model(bundle.weights(), "lstm_a", backend="torch")
+
+    db = SessionLocal()
+    try:
+        X, y = build_lstm_a_dataset_from_db(db, sku, window_size=bundle.window_size, limit=limit)
+    finally:
+        db.close()
+
+    N, T, F = X.shape
+    x_scaler, y_scaler = bundle.scaler("x_scaler"), bundle.scaler("y_scaler")
+    X = x_scaler.transform(X.reshape(N, -1)).reshape(N, T, F)
+    to_units = (lambda v: y_scaler.inverse_transform(v.reshape(-1, 1)).reshape(-1)) if y_scaler else None
+    return model, X, y, to_units, {"sku": sku, "version": bundle.version, "path": str(path)}
+
+
+def _lstm_b_inputs(limit: int):
+    """lstm_b.pt + 최근 fill 시퀀스 → (float 모델, X, y(다음 error))"""
+    from app.db.session import SessionLocal
+    from app.ml.export_numpy import _build_model, load_state_dict
+    from app.ml.ml_b_dataset import SEQ_LEN, load_fills_for_lstmB, load_fills_frame, make_sequences
+    from app.ml.train_lstm_b import MODEL_PATH
+
+    model = _build_model("lstm_b", load_state_dict(MODEL_PATH))
+
+    db = SessionLocal()
+    try:
+        df = load_fills_frame(db)
+    finally:
+        db.close()
+
+    X, y = make_sequences(load_fills_for_lstmB(df), seq_len=SEQ_LEN) if not df.empty else (None, None)
+    if X is None or X.shape[0] == 0:
+        # 데이터가 없으면 지연만 비교 (랜덤 입력)
+        X = np.random.default_rng(0).standard_normal((limit, SEQ_LEN, model.lstm.input_size)).astype(np.float32)
+        y = None
+    return model, X[-limit:], None if y is None else y[-limit:], None, {"path": str(MODEL_PATH)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("kind", choices=["lstm_a", "lstm_b"])
+    parser.add_argument("--sku", default="CIDER_500")
+    parser.add_argument("--limit", type=int, default=2000, help="비교에 쓸 최근 샘플 수")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op 스레드 수 (엣지 박스 재현용)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    if args.kind == "lstm_a":
+        model, X, y, to_units, source = _lstm_a_inputs(args.sku, args.limit)
+    else:
+        model, X, y, to_units, source = _lstm_b_inputs(args.limit)
+
+    results = compare_modes(model, X, y, to_units=to_units, repeats=args.repeats)
+
+    started_at = datetime.now()
+    report = {
+        "kind": args.kind,
+        "created_at": started_at.isoformat(timespec="seconds"),
+        "source": source,
+        "n_samples": int(len(X)),
+        "torch_threads": torch.get_num_threads(),
+        "quant_engine": torch.backends.quantized.engine,
+        "modes": results,
+    }
+
+    print(f"[QUANT] {args.kind} {source} (N={len(X)}, threads={report['torch_threads']})")
+    for mode, r in results.items():
+        label = f"{r['rmse_vs_label']:.4f}" if r["rmse_vs_label"] is not None else "-"
+        print(f"  {mode:<6} max|diff|={r['max_abs_diff']:.4g} rmse(label)={label} "
+              f"b1 p50={r['batch1']['p50_us']:.0f}us ({r['speedup_batch1']:.2f}x) "
+              f"nbytes={r['nbytes']}")
+
+    REPORT_DIR.mkdir(exist_ok=True)
+    path = REPORT_DIR / f"quant_report_{args.kind}_{started_at:%Y%m%d_%H%M%S}.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[QUANT] report: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,66 @@
 # app/ml/train_lstm_a.py
 
+import time
+from datetime import datetime, timezone
+
 import torch
 import torch.nn as nn
 from torch.utils.data import TensorDataset, DataLoader
-import joblib
 
+from app.core.config import settings
 from app.db.session import SessionLocal
-from app.services.cycles_service import get_recent_cycles_for_sku
-from app.ml.ml_a_dataset import build_lstm_a_dataset
+from app.ml.feature_store import FeatureStore
+from app.ml.ml_a_dataset import load_cycle_columns, lstm_a_features, windows_from_features
 from app.ml.ml_a_model import LSTMA
+from app.ml.model_bundle import LSTM_A_FEATURES, save_bundle
 from pathlib import Path
 
 
-def train_lstm_a(sku="CIDER_500"):
-    db = SessionLocal()
-
-    print("[TRAIN] Loading cycles...")
-    cycles = get_recent_cycles_for_sku(db, sku, limit=300)
+def train_lstm_a(sku="CIDER_500", max_epochs=200, batch_size=32, lr=1e-2,
+                 val_ratio=0.2, patience=15, limit=300, verbose=True,
+                 use_store=None, sync_store=True):
+    """sku 하나의 LSTM-A 학습 → 번들 저장. 학습 요약 dict 반환.
 
-    if len(cycles) < 15:
-        raise RuntimeError(f"[TRAIN] Not enough cycles ({len(cycles)})")
+    - 시간 순 마지막 val_ratio 구간을 validation 으로 사용 (스케일러는 train 구간으로만 fit)
+    - val loss 가 patience epoch 동안 개선 없으면 조기 종료, best epoch weights 저장
+    - val loss 가 한 번도 유한값이 아니면(NaN/inf, 발산) 저장하지 않고 status="rejected" 반환
+    - use_store(기본 TRAIN_FROM_FEATURE_STORE)면 feature store 를 sync 후 거기서 읽음
+    """
+    t0 = time.monotonic()
+    db = SessionLocal()
 
-    print("[TRAIN] Building dataset...")
-    X, y = build_lstm_a_dataset(cycles, window_size=5, K=1.2)
+    print(f"[TRAIN] {sku} Loading cycles...")
+    if settings.TRAIN_FROM_FEATURE_STORE if use_store is None else use_store:
+        store = FeatureStore()
+        if sync_store:
+            store.sync(db)
+        cols = store.lstm_a_columns(sku, limit=limit)
+    else:
+        cols = load_cycle_columns(db, sku, limit=limit)
+    db.close()
+
+    if len(cols["id"]) < 15:
+        raise RuntimeError(f"[TRAIN] Not enough cycles ({len(cols['id'])})")
+
+    print(f"[TRAIN] {sku} Building dataset...")
+    window_size = 5
+    feats, labels = lstm_a_features(cols["actual_ml"], cols["valve_ms"], cols["target_ml"], K=1.2)
+    X, y = windows_from_features(feats, labels, window_size=window_size)
     N, T, F = X.shape
-    print(f"[TRAIN] Dataset X={X.shape}, y={y.shape}")
+    n_val = max(1, int(N * val_ratio))
+    n_train = N - n_val
+    print(f"[TRAIN] {sku} Dataset X={X.shape}, y={y.shape} (train={n_train}, val={n_val})")
 
     # -------------------------
-    # X scaling
+    # X / y scaling (train 구간으로만 fit)
     # -------------------------
     from sklearn.preprocessing import StandardScaler
-    x_scaler = StandardScaler()
-    X_scaled = x_scaler.fit_transform(X.reshape(N, -1)).reshape(N, T, F)
+    x_scaler = StandardScaler().fit(X[:n_train].reshape(n_train, -1))
+    X_scaled = x_scaler.transform(X.reshape(N, -1)).reshape(N, T, F)
 
-    # -------------------------
-    # y scaling
-    # -------------------------
     y = y.reshape(-1, 1)
-    y_scaler = StandardScaler()
-    y_scaled = y_scaler.fit_transform(y).reshape(-1)
+    y_scaler = StandardScaler().fit(y[:n_train])
+    y_scaled = y_scaler.transform(y).reshape(-1)
 
     # -------------------------
     # Tensor
@@ -46,18 +68,23 @@ def train_lstm_a(sku="CIDER_500"):
     X_tensor = torch.tensor(X_scaled, dtype=torch.float32)
     y_tensor = torch.tensor(y_scaled, dtype=torch.float32)
 
-    ds = TensorDataset(X_tensor, y_tensor)
-    dl = DataLoader(ds, batch_size=8, shuffle=True)
+    ds = TensorDataset(X_tensor[:n_train], y_tensor[:n_train])
+    dl = DataLoader(ds, batch_size=batch_size, shuffle=True)
+    x_val, y_val = X_tensor[n_train:], y_tensor[n_train:]
 
     device = torch.device("cpu")
     model = LSTMA(input_dim=F).to(device)
 
-    opt = torch.optim.Adam(model.parameters(), lr=1e-2)
+    opt = torch.optim.Adam(model.parameters(), lr=lr)
     loss_fn = nn.MSELoss()
 
-    print("[TRAIN] Training start...")
+    print(f"[TRAIN] {sku} Training start...")
 
-    for epoch in range(120):
+    best_val, best_epoch, best_state = float("inf"), 0, None
+    train_loss = float("nan")
+    epoch = 0
+    for epoch in range(1, max_epochs + 1):
+        model.train()
         total = 0
         loss_total = 0
         for xb, yb in dl:
@@ -70,17 +97,65 @@ def train_lstm_a(sku="CIDER_500"):
 
             loss_total += loss.item() * len(xb)
             total += len(xb)
-
-        print(f"[TRAIN] Epoch {epoch+1:03d} | loss={loss_total/total:.4f}")
+        train_loss = loss_total / total
+
+        model.eval()
+        with torch.no_grad():
+            val_loss = loss_fn(model(x_val), y_val).item()
+
+        if val_loss < best_val:
+            best_val, best_epoch = val_loss, epoch
+            best_state = {k: v.detach().cpu().numpy().copy() for k, v in model.state_dict().items()}
+
+        if verbose and (epoch % 10 == 0 or epoch == 1):
+            print(f"[TRAIN] {sku} Epoch {epoch:03d} | loss={train_loss:.4f} | val={val_loss:.4f}")
+
+        if epoch - best_epoch >= patience:
+            print(f"[TRAIN] {sku} early stop at epoch {epoch} (best {best_epoch}, val={best_val:.4f})")
+            break
+
+    if best_state is None:
+        # 모든 epoch 의 val loss 가 NaN/inf → 쓸 수 있는 weights 없음, 기존 번들 유지
+        print(f"[TRAIN] {sku} rejected: no finite val loss in {epoch} epochs (last train loss={train_loss})")
+        return {
+            "sku": sku,
+            "status": "rejected",
+            "error": "no finite validation loss",
+            "n_samples": int(N),
+            "epochs": epoch,
+            "train_loss": train_loss,
+            "wall_s": time.monotonic() - t0,
+        }
 
     # -------------------------
-    # Save model & scalers
+    # Save model & scalers (버전 번들 한 파일, 서버는 watcher/reload API 로 교체)
     # -------------------------
-    model_dir = Path("models")
-    model_dir.mkdir(exist_ok=True)
-
-    torch.save(model.state_dict(), model_dir / f"lstm_a_{sku}.pt")
-    joblib.dump(x_scaler, model_dir / f"lstm_a_{sku}_x_scaler.pkl")
-    joblib.dump(y_scaler, model_dir / f"lstm_a_{sku}_y_scaler.pkl")
-
-    print("[TRAIN] Saved model & scalers")
\ No newline at end of file
+    path = save_bundle(
+        Path("models"), "lstm_a", sku, best_state,
+        window_size=window_size,
+        feature_order=LSTM_A_FEATURES,
+        x_scaler=x_scaler,
+        y_scaler=y_scaler,
+        metadata={
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "n_samples": int(N),
+            "epochs": epoch,
+            "best_epoch": best_epoch,
+            "final_loss": train_loss,
+            "val_loss": best_val,
+            "last_cycle_id": int(cols["id"].max()),
+        },
+    )
+
+    print(f"[TRAIN] Saved model bundle {path}")
+    return {
+        "sku": sku,
+        "status": "ok",
+        "bundle": str(path),
+        "n_samples": int(N),
+        "epochs": epoch,
+        "best_epoch": best_epoch,
+        "train_loss": train_loss,
+        "val_loss": best_val,
+        "wall_s": time.monotonic() - t0,
+    }
@@ -8,8 +8,12 @@ LSTM-B 모델을 학습하고 app/ml/lstm_b.pt 로 저장하는 스크립트.
 
     $ source .venv/bin/activate
     $ python -m app.ml.train_lstm_b
+    $ python -m app.ml.train_lstm_b --since 2025-01-01 --until 2025-02-01
 """
 
+import argparse
+import json
+from datetime import datetime
 from pathlib import Path
 
 import numpy as np
@@ -18,60 +22,52 @@ import torch
 from torch.utils.data import TensorDataset, DataLoader
 import torch.nn as nn
 
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import SessionLocal
-from app.db.models.cycle import Cycle
-from app.db.models.recipe import Recipe
-from app.ml.ml_b_dataset import load_fills_for_lstmB, make_sequences, SEQ_LEN
+from app.ml.feature_store import FeatureStore, recipe_id_map
+from app.ml.ml_b_dataset import DEFAULT_LINE_ID, load_fills_for_lstmB, load_fills_frame, make_sequences, SEQ_LEN
 from app.ml.ml_b_model import LSTMB
 
 
 MODEL_PATH = Path(__file__).with_name("lstm_b.pt")
 
 
-def load_fills_df(db: Session) -> pd.DataFrame:
+def load_fills_df(db: Session, start=None, end=None, line_id=None) -> pd.DataFrame:
     """
     cycles + recipes 를 조인해서 LSTM-B 학습용 DataFrame 생성.
+    (server-side cursor chunk → NumPy 컬럼, 행별 dict 를 만들지 않음)
 
     컬럼:
       - ts        : timestamp
-      - line_id   : 라인 ID (여기선 'LINE1' 고정)
+      - line_id   : 라인 ID (현재 스키마는 단일 라인)
       - recipe_id : Recipe.id
       - target_ml : Cycle.target_ml
       - actual_ml : Cycle.actual_ml
     """
-    stmt = (
-        select(
-            Cycle.created_at.label("ts"),
-            Cycle.sku.label("sku"),
-            Recipe.id.label("recipe_id"),
-            Cycle.target_ml.label("target_ml"),
-            Cycle.actual_ml.label("actual_ml"),
-        )
-        .join(Recipe, Recipe.sku_id == Cycle.sku)
-        .where(Cycle.actual_ml.is_not(None))
-        .order_by(Cycle.created_at.asc())
-    )
-
-    rows = db.execute(stmt).all()
-    if not rows:
+    return load_fills_frame(db, start=start, end=end, line_id=line_id)
+
+
+def load_fills_from_store(db: Session, start=None, end=None, line_id=None) -> pd.DataFrame:
+    """feature store 를 sync 한 뒤 load_fills_df 와 같은 컬럼 DataFrame 을 스냅샷에서 생성"""
+    if line_id is not None and line_id != DEFAULT_LINE_ID:
         return pd.DataFrame()
 
-    data = []
-    for ts, sku, recipe_id, target_ml, actual_ml in rows:
-        data.append(
-            {
-                "ts": ts,
-                "line_id": "LINE1",  # 단일 라인 가정
-                "recipe_id": recipe_id,
-                "target_ml": float(target_ml),
-                "actual_ml": float(actual_ml),
-            }
-        )
+    store = FeatureStore()
+    store.sync(db)
+    df = store.fills_frame(recipe_id_map(db))
 
-    return pd.DataFrame(data)
+    # 스냅샷 ts 는 UTC(naive) 기준
+    def utc(dt):
+        t = pd.Timestamp(dt)
+        return t.tz_convert("UTC").tz_localize(None) if t.tzinfo else t
+
+    if start is not None:
+        df = df[df["ts"] >= utc(start)]
+    if end is not None:
+        df = df[df["ts"] < utc(end)]
+    return df.reset_index(drop=True)
 
 
 def train_lstm_b(model: LSTMB, loader: DataLoader, num_epochs: int = 20, lr: float = 1e-3):
@@ -103,17 +99,33 @@ def train_lstm_b(model: LSTMB, loader: DataLoader, num_epochs: int = 20, lr: flo
         print(f"[LSTM-B] epoch {epoch+1}/{num_epochs}, loss={epoch_loss / max(n, 1):.4f}")
 
 
-def save_lstm_b(model: LSTMB, path: Path = MODEL_PATH):
+def save_lstm_b(model: LSTMB, path: Path = MODEL_PATH, meta: dict | None = None):
     path.parent.mkdir(parents=True, exist_ok=True)
     torch.save(model.state_dict(), path)
     print(f"[LSTM-B] 모델 저장: {path}")
 
+    # 서빙(예측 SPC)에서 같은 recipe_idx 인코딩을 쓰도록 매핑 저장
+    if meta is not None:
+        meta_path = path.with_name("lstm_b_meta.json")
+        meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[LSTM-B] 메타 저장: {meta_path}")
+
 
 def main():
-    # 1) DB에서 데이터 적재
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="created_at 시작 (ISO)")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="created_at 끝 (ISO, 미포함)")
+    parser.add_argument("--line", default=None, help="라인 ID 필터")
+    parser.add_argument("--from-db", action="store_true", help="feature store 대신 DB 직접 조회")
+    args = parser.parse_args()
+
+    # 1) 데이터 적재 (기본: feature store incremental sync 후 스냅샷에서)
     db: Session = SessionLocal()
     try:
-        df = load_fills_df(db)
+        if settings.TRAIN_FROM_FEATURE_STORE and not args.from_db:
+            df = load_fills_from_store(db, start=args.since, end=args.until, line_id=args.line)
+        else:
+            df = load_fills_df(db, start=args.since, end=args.until, line_id=args.line)
     finally:
         db.close()
 
@@ -142,8 +154,11 @@ def main():
     model = LSTMB(input_dim=input_dim, hidden_dim=64, num_layers=2)
     train_lstm_b(model, loader, num_epochs=20, lr=1e-3)
 
-    # 4) 모델 저장
-    save_lstm_b(model, MODEL_PATH)
+    # 4) 모델 저장 (recipe_id → recipe_idx 는 category 코드 순서)
+    recipe_index = {
+        str(rid): code for code, rid in enumerate(df_feat["recipe_id"].astype("category").cat.categories)
+    }
+    save_lstm_b(model, MODEL_PATH, meta={"seq_len": SEQ_LEN, "recipe_index": recipe_index, "line_index": {DEFAULT_LINE_ID: 0}})
 
 
 if __name__ == "__main__":
@@ -1,8 +1,21 @@
 # app/ml/train_pipeline.py
 
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+from app.core.config import settings
 from app.ml.generate_initial_cycles import generate_initial_cycles
 from app.ml.train_lstm_a import train_lstm_a
 
+REPORT_DIR = Path("models")
+
+
 def run_pipeline(sku="CIDER_500"):
     print("========== LSTM-A TRAINING PIPELINE ==========\n")
 
@@ -17,5 +30,123 @@ def run_pipeline(sku="CIDER_500"):
     print("=======================================\n")
 
 
+# ---------------------------------------------------
+# 전체 활성 SKU 병렬 재학습
+# ---------------------------------------------------
+
+def _init_train_worker(threads):
+    """워커별 torch intra-op 스레드 제한 (프로세스 수 × 스레드 수 ≤ 코어 수로 oversubscription 방지)"""
+    import torch
+
+    torch.set_num_threads(max(1, threads))
+
+
+def _train_one(sku, train_kwargs):
+    try:
+        report = train_lstm_a(sku=sku, verbose=False, **train_kwargs)
+    except Exception as e:
+        report = {"sku": sku, "status": "error", "error": repr(e)}
+    return report
+
+
+def active_skus():
+    from app.db.session import SessionLocal
+    from app.services import recipes_service
+
+    db = SessionLocal()
+    try:
+        return [r.sku_id for r in recipes_service.list_recipes(db) if r.is_active]
+    finally:
+        db.close()
+
+
+def run_all(skus=None, workers=None, threads_per_worker=1, **train_kwargs):
+    """활성 레시피 SKU 전부를 process pool 에서 동시에 학습하고 SKU별 리포트를 저장.
+
+    반환: 리포트 dict (per-SKU wall time / epoch / loss)
+    """
+    skus = list(skus) if skus else active_skus()
+    if not skus:
+        print("[PIPELINE] 활성 레시피가 없습니다.")
+        return {"skus": [], "results": []}
+
+    cpu = os.cpu_count() or 1
+    workers = workers or max(1, min(len(skus), cpu // max(1, threads_per_worker)))
+    print(f"[PIPELINE] training {len(skus)} SKUs with {workers} workers x {threads_per_worker} threads")
+
+    # feature store 는 여기서 한 번만 sync, 워커는 읽기만
+    if settings.TRAIN_FROM_FEATURE_STORE:
+        from app.db.session import SessionLocal
+        from app.ml.feature_store import FeatureStore
+
+        db = SessionLocal()
+        try:
+            FeatureStore().sync(db)
+        finally:
+            db.close()
+        train_kwargs.setdefault("sync_store", False)
+
+    started_at = datetime.now()
+    t0 = time.monotonic()
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_train_worker,
+        initargs=(threads_per_worker,),
+    ) as pool:
+        futures = {pool.submit(_train_one, sku, train_kwargs): sku for sku in skus}
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            if r["status"] == "ok":
+                print(f"[PIPELINE] {r['sku']}: {r['wall_s']:.1f}s, epochs={r['epochs']} "
+                      f"(best {r['best_epoch']}), val_loss={r['val_loss']:.4f}")
+            elif r["status"] == "rejected":
+                print(f"[PIPELINE] {r['sku']}: REJECTED {r['error']} (epochs={r['epochs']}, not saved)")
+            else:
+                print(f"[PIPELINE] {r['sku']}: FAILED {r['error']}")
+
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "wall_s": time.monotonic() - t0,
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "train_kwargs": train_kwargs,
+        "results": sorted(results, key=lambda r: r["sku"]),
+    }
+
+    REPORT_DIR.mkdir(exist_ok=True)
+    path = REPORT_DIR / f"train_report_{started_at:%Y%m%d_%H%M%S}.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[PIPELINE] {len(results)} SKUs in {report['wall_s']:.1f}s, report: {path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true", help="활성 레시피 SKU 전부 병렬 학습")
+    parser.add_argument("--sku", action="append", help="학습할 SKU (여러 번 지정 가능)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=1, help="워커당 torch 스레드 수")
+    parser.add_argument("--max-epochs", type=int, default=200)
+    parser.add_argument("--patience", type=int, default=15)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if not args.all and not args.sku:
+        run_pipeline()
+        return
+
+    run_all(
+        skus=None if args.all else args.sku,
+        workers=args.workers,
+        threads_per_worker=args.threads,
+        max_epochs=args.max_epochs,
+        patience=args.patience,
+        batch_size=args.batch_size,
+    )
+
+
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    main()
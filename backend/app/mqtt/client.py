@@ -5,15 +5,13 @@ from __future__ import annotations
 import json
 import threading
 import time
-from typing import Any, Dict, Optional
-
-import paho.mqtt.client as mqtt
+from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
-from app.db.session import SessionLocal
-from app.ml.lstm_a import compute_next_valve_time
+from app.db.write_queue import write_queue
 from app.services import line_state_service
 from app.services.cycles_service import log_can_in_event, log_fill_result_event
+from app.services.valve_guard import valve_guard
 from app.ws.bus import ws_bus
 
 # 토픽 정의
@@ -54,13 +52,39 @@ def set_current_sku_safe(db, sku_id: str, line_id: str = "line1") -> None:
         print("[MQTT] set_current_sku failed:", repr(e))
 
 
+def _log_fill_result(db, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """writer 스레드: fill_result 적재 → WS 로 보낼 값 (세션 닫기 전에 꺼냄)"""
+    # (선택) fill_result로도 current_sku 갱신(안전망)
+    if payload["sku"] != "UNKNOWN":
+        set_current_sku_safe(db, sku_id=payload["sku"], line_id="line1")
+
+    cycle = log_fill_result_event(db, payload)
+    return {
+        "seq": cycle.seq,
+        "sku_id": cycle.sku,
+        "target_ml": float(cycle.target_ml or payload.get("target_ml") or 0.0),
+        "actual_ml": float(cycle.actual_ml or payload["actual_ml"]),
+        "valve_ms": float(cycle.valve_ms or payload["valve_ms"]),
+        "status": payload["status"],
+    }
+
+
 class SmartCanMqttClient:
     def __init__(self) -> None:
-        client_id = settings.MQTT_CLIENT_ID or "smartcan-backend"
-        self.client = mqtt.Client(client_id=client_id, clean_session=True)
+        # paho 클라이언트는 start()/publish 첫 호출 시 생성 (import 시 paho 로드 안 함)
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import paho.mqtt.client as mqtt
+
+            client_id = settings.MQTT_CLIENT_ID or "smartcan-backend"
+            self._client = mqtt.Client(client_id=client_id, clean_session=True)
 
-        self.client.on_connect = self._on_connect
-        self.client.on_message = self._on_message
+            self._client.on_connect = self._on_connect
+            self._client.on_message = self._on_message
+        return self._client
 
     # ========== 시작 ==========
 
@@ -94,15 +118,35 @@ class SmartCanMqttClient:
             print("[MQTT] payload decode error:", repr(e))
             return
 
+        # 밸브 계산 / publish 는 이 스레드에서, DB 쓰기만 write_queue 로
+        # (SQLite 면 단일 writer 스레드에서 도착 순서대로, 느린 계산이 다른 쓰기를 막지 않게)
         if msg.topic == TOPIC_CAN_IN:
             self._handle_can_in(data)
         elif msg.topic == TOPIC_FILL_RESULT:
             self._handle_fill_result(data)
 
+    @staticmethod
+    def _submit_write(fn, payload: Dict[str, Any], on_done=None) -> None:
+        """fn(db, payload) 를 writer 큐에 넣고 기다리지 않음 (결과는 on_done, 실패는 로그)"""
+        def done(fut) -> None:
+            try:
+                result = fut.result()
+            except Exception as e:
+                print(f"[MQTT] {fn.__name__} failed:", repr(e), "payload=", payload)
+                return
+            if on_done is not None:
+                on_done(result)
+
+        write_queue.submit_with_session(fn, payload).add_done_callback(done)
+
     # ========== CAN_IN 핸들러 ==========
 
     def _handle_can_in(self, data: Dict[str, Any]) -> None:
-        db = SessionLocal()
+        """can_in → (DB 없이) 밸브 계산 → fill 명령 publish → 그 다음 cycle 적재.
+
+        라인을 막는 구간은 valve_guard.compute (deadline_ms 이내) 하나뿐이고,
+        DB 가 느리거나 잠겨 있어도 fill 명령은 먼저 나간다.
+        """
         try:
             raw_sku = data.get("sku") or data.get("sku_id")
             raw_seq = data.get("seq") or data.get("cycle_no")
@@ -127,74 +171,52 @@ class SmartCanMqttClient:
             if target_amount <= 0.0:
                 target_amount = infer_target_ml_from_sku(sku_id)
 
-            # current_sku는 먼저 저장(실패해도 계속)
-            try:
-                line_state_service.set_current_sku(db, sku=sku_id, line_id="line1")
-                db.commit()
-            except Exception as e:
-                db.rollback()
-                print("[MQTT] set_current_sku failed:", repr(e))
-
             print(f"[MQTT] CAN_IN sku_id={sku_id} cycle_no={cycle_no} target={target_amount}")
 
-            # ✅ 1) cycles를 먼저 “무조건” 적재 (valve_ms는 0으로)
-            cycle = log_can_in_event(db, {
-                "seq": cycle_no,
-                "sku": sku_id,
-                "target_ml": target_amount,
-                "valve_ms": 0.0,
-            })
-
-            # ✅ 2) 그 다음 valve 계산 (실패해도 cycle은 이미 DB에 있음)
-            valve_time = 0.0
-            try:
-                valve_time = float(compute_next_valve_time(db, sku_id=sku_id, target_amount=float(cycle.target_ml or target_amount)))
-            except Exception as e:
-                print("[MQTT] compute_next_valve_time failed:", repr(e))
-
-            # ✅ 3) valve_ms 업데이트
-            try:
-                cycle.valve_ms = valve_time
-                db.add(cycle)
-                db.commit()
-                db.refresh(cycle)
-            except Exception as e:
-                db.rollback()
-                print("[MQTT] cycle valve_ms update failed:", repr(e))
+            # ✅ 1) valve 계산 (deadline 초과/실패 시 last-known-good → base_valve_ms fallback)
+            #    목표량을 모르면(SKU 이름에 용량 없음) 레시피 목표량으로 계산
+            valve_time, fallback_reason = valve_guard.compute(sku_id, target_amount or None)
 
-            # ✅ 4) fill 명령은 valve_time 유효할 때만
+            # ✅ 2) fill 명령은 valve_time 유효할 때만, DB 쓰기보다 먼저
             if valve_time > 0.0:
                 self.publish_fill_command({
-                    "sku": cycle.sku,
-                    "seq": cycle.seq,
-                    "target_ml": float(cycle.target_ml or 0.0),
+                    "sku": sku_id,
+                    "seq": cycle_no,
+                    "target_ml": float(target_amount),
                     "valve_ms": float(valve_time),
                     "mode": "SIM",
+                    "fallback": fallback_reason,
                 })
 
             ws_bus.emit({
                 "type": "can_in",
                 "ts": int(time.time()),
                 "data": {
-                    "seq": cycle.seq,
-                    "sku_id": cycle.sku,
-                    "target_ml": float(cycle.target_ml or 0.0),
+                    "seq": cycle_no,
+                    "sku_id": sku_id,
+                    "target_ml": float(target_amount),
                     "valve_ms": float(valve_time),
+                    "fallback": fallback_reason,
                 },
             })
 
+            # ✅ 3) cycle 적재는 writer 큐로 (valve_ms 포함 insert 1번, current_sku 는 log_can_in_event 가 갱신)
+            #    같은 캔의 fill_result 는 이 핸들러가 끝난 뒤에 처리되므로 큐에서 항상 이 insert 뒤에 선다
+            self._submit_write(log_can_in_event, {
+                "seq": cycle_no,
+                "sku": sku_id,
+                "target_ml": target_amount,
+                "valve_ms": valve_time,
+            })
+
         except Exception as e:
-            db.rollback()
             print("[MQTT] handle_can_in error:", repr(e), "data=", data)
-        finally:
-            db.close()
 
 
     # ========== FILL_RESULT 핸들러 ==========
 
     def _handle_fill_result(self, data: Dict[str, Any]) -> None:
-        """line1/event/fill_result"""
-        db = SessionLocal()
+        """line1/event/fill_result (파싱은 이 스레드, 적재는 writer 큐, WS push 는 적재 후)"""
         try:
             raw_seq = data.get("seq") if data.get("seq") is not None else data.get("cycle_no")
             raw_sku = data.get("sku") if data.get("sku") is not None else data.get("sku_id")
@@ -227,10 +249,6 @@ class SmartCanMqttClient:
 
             status = str(data.get("status", "DONE"))
 
-            # (선택) fill_result로도 current_sku 갱신(안전망)
-            if sku_id and sku_id != "UNKNOWN":
-                set_current_sku_safe(db, sku_id=sku_id, line_id="line1")
-
             payload = {
                 "seq": cycle_no,
                 "sku": sku_id,
@@ -241,28 +259,14 @@ class SmartCanMqttClient:
             if target_ml is not None:
                 payload["target_ml"] = target_ml
 
-            cycle = log_fill_result_event(db, payload)
-
             # Option C: WS push (fill_result)
-            ws_bus.emit({
+            self._submit_write(_log_fill_result, payload, lambda event: ws_bus.emit({
                 "type": "fill_result",
                 "ts": int(time.time()),
-                "data": {
-                    "seq": cycle.seq,
-                    "sku_id": cycle.sku,
-                    "target_ml": float(cycle.target_ml or target_ml or 0.0),
-                    "actual_ml": float(cycle.actual_ml or measured_value),
-                    "valve_ms": float(cycle.valve_ms or valve_time),
-                    "status": status,
-                },
-            })
-
-            db.commit()
+                "data": event,
+            }))
         except Exception as e:
-            db.rollback()
             print("[MQTT] handle_fill_result error:", repr(e), "data=", data)
-        finally:
-            db.close()
 
     # ========== publish 헬퍼 ==========
 
@@ -271,6 +275,11 @@ class SmartCanMqttClient:
         print(f"[MQTT] publish -> {TOPIC_CMD_FILL}: {data_str}")
         self.client.publish(TOPIC_CMD_FILL, data_str, qos=1, retain=False)
 
+    def publish_fill_commands(self, payloads: List[Dict[str, Any]]) -> None:
+        """여러 fill 명령을 연속 publish (paho 내부 큐로 한 번에 flush)."""
+        for payload in payloads:
+            self.publish_fill_command(payload)
+
     def publish_corr_command(self, payload: Dict[str, Any]) -> None:
         data_str = json.dumps(payload, ensure_ascii=False)
         print(f"[MQTT] publish -> {TOPIC_CMD_CORR}: {data_str}")
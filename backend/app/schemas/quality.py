@@ -1,7 +1,7 @@
 # app/schemas/quality.py
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -56,3 +56,29 @@ class AlarmOut(BaseModel):
     class Config:
         from_attributes = True
         orm_mode = True
+
+
+class QualityTrendBucket(BaseModel):
+    """
+    /quality/trend 의 bucket 1개 (cycle 이나 알람이 있는 bucket 만).
+    """
+    bucket_start: datetime = Field(..., description="bucket 시작 시각 (UTC)")
+    count: int = Field(..., description="cycle 수")
+    error_n: int = Field(..., description="error 가 있는 cycle 수")
+    error_mean: Optional[float] = Field(None, description="error 평균")
+    error_std: Optional[float] = Field(None, description="error 표본 표준편차 (error_n < 2 이면 None)")
+    actual_ml_min: Optional[float] = None
+    actual_ml_max: Optional[float] = None
+    alarm_count: int = Field(..., description="알람 수")
+    alarms_by_level: Dict[str, int] = Field(default_factory=dict, description="레벨별 알람 수 (WARN / ALARM)")
+
+
+class QualityTrendOut(BaseModel):
+    """
+    /quality/trend 응답: since <= created_at < until 구간을 bucket 단위로 집계.
+    """
+    sku: str
+    bucket: str
+    since: datetime
+    until: datetime
+    buckets: List[QualityTrendBucket]
@@ -0,0 +1,43 @@
+# app/services/control_service_async.py
+# control 엔드포인트(/current_sku, /fill)용 async DB 헬퍼
+
+from typing import Optional
+
+from sqlalchemy import select, desc, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.cycle import Cycle
+from app.db.models.recipe import Recipe
+from app.db import sku_latest
+from app.services import cycles_service_async, line_state_service
+from app.services.r2r import compute_next_valve_time as _r2r_compute
+
+
+async def get_current_sku(db: AsyncSession, line_id: str = "line1") -> Optional[str]:
+    # MQTT ingest 가 갱신하는 메모리 값 우선 (없을 때만 DB)
+    sku = line_state_service.cached_sku(line_id)
+    if sku is None:
+        sku = (await db.execute(
+            text("SELECT current_sku FROM line_state WHERE line_id = :line_id"),
+            {"line_id": line_id},
+        )).scalar_one_or_none()
+        line_state_service.remember(line_id, sku)
+
+    # (보험) line_state가 비어있으면 최근 cycle sku로 fallback (sku_latest → cycles)
+    if not sku:
+        sku = (await db.execute(sku_latest.latest_sku_stmt(line_id))).scalar_one_or_none()
+    if not sku:
+        sku = (await db.execute(
+            select(Cycle.sku).order_by(desc(Cycle.id)).limit(1)
+        )).scalar_one_or_none()
+    return sku
+
+
+async def compute_next_valve_time(db: AsyncSession, recipe: Recipe, target_amount: float) -> float:
+    """lstm_a.compute_next_valve_time 과 같은 R2R 계산 (DB 로드만 async)."""
+    recent = await cycles_service_async.get_recent_cycles_for_sku(db, sku=recipe.sku_id, limit=50)
+    return float(_r2r_compute(
+        recipe=recipe,
+        recent_cycles=recent,
+        predicted_next_amount=float(target_amount),
+    ))
@@ -1,11 +1,14 @@
 # app/services/cycles_service.py
 
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Sequence
 from app.services import quality_service
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func, insert, literal, union_all
 
+from app.db import sku_latest
+from app.db.archive import get_archived, merge_with_archive
 from app.db.models.cycle import Cycle
 from app.schemas.cycle import CycleCreate
 
@@ -28,18 +31,51 @@ def create_cycle(db: Session, data: CycleCreate) -> Cycle:
     return cycle
 
 
+def bulk_create_cycles(db: Session, rows: Sequence[CycleCreate]) -> int:
+    """여러 cycle을 한 번의 executemany INSERT 로 적재 (id 반환 없음)."""
+    if not rows:
+        return 0
+    db.execute(insert(Cycle), [r.model_dump() for r in rows])
+    sku_latest.refresh_cycles(db, [r.sku for r in rows])
+    db.commit()
+    return len(rows)
+
+
 def list_cycles(
     db: Session,
     sku: Optional[str] = None,
     limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
 ) -> List[Cycle]:
-    stmt = select(Cycle).order_by(desc(Cycle.created_at)).limit(limit)
+    # keyset 페이지 (id 내림차순): before_id → 더 오래된 페이지, after_id → 바로 다음(더 새) 페이지
+    # since <= created_at < until, 보존 기간이 지나 아카이브된 구간은 아카이브에서 채움
+    stmt = select(Cycle)
     if sku:
         stmt = stmt.where(Cycle.sku == sku)
-    stmt = stmt.order_by(desc(Cycle.id)).limit(limit)    
-    return list(db.scalars(stmt))
+    if since is not None:
+        stmt = stmt.where(Cycle.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Cycle.created_at < until)
+    if before_id is not None:
+        stmt = stmt.where(Cycle.id < before_id)
+    if after_id is not None:
+        stmt = stmt.where(Cycle.id > after_id).order_by(Cycle.id)
+    else:
+        stmt = stmt.order_by(desc(Cycle.id))
+    rows = list(db.scalars(stmt.limit(limit)))
+    if after_id is not None:
+        rows.reverse()
+    return merge_with_archive("cycles", rows, sku=sku, since=since, until=until, limit=limit,
+                              before_id=before_id, after_id=after_id)
 def _fallback_target_ml(db: Session, sku: str) -> float:
-    # 1) 같은 sku의 마지막 cycle target_ml 재사용 (없으면 0.0)
+    # 1) 같은 sku의 마지막 cycle target_ml 재사용 (없으면 0.0) - sku_latest PK 1건, 없을 때만 cycles 정렬 조회
+    latest = sku_latest.get_latest(db, sku)
+    if latest is not None and latest.target_ml is not None:
+        return float(latest.target_ml)
+
     stmt = (
         select(Cycle.target_ml)
         .where(Cycle.sku == sku, Cycle.target_ml.is_not(None))
@@ -50,7 +86,7 @@ def _fallback_target_ml(db: Session, sku: str) -> float:
     return float(last) if last is not None else 0.0
 
 def get_cycle_by_id(db: Session, cycle_id: int) -> Optional[Cycle]:
-    return db.get(Cycle, cycle_id)
+    return db.get(Cycle, cycle_id) or get_archived("cycles", cycle_id)
 
 
 def get_recent_cycles_for_sku(
@@ -80,6 +116,22 @@ def get_last_seq_for_sku(db: Session, sku: str) -> int:
     return last or 0
 
 
+def last_seqs_stmt(skus: Sequence[str]):
+    """SKU별 max(seq) 를 SKU마다 (sku, seq) 인덱스 끝 1건 조회로 (GROUP BY 는 SKU 전체 행을 훑음)"""
+    parts = [
+        select(literal(sku).label("sku"),
+               select(func.max(Cycle.seq)).where(Cycle.sku == sku).scalar_subquery().label("seq"))
+        for sku in skus
+    ]
+    return union_all(*parts) if len(parts) > 1 else parts[0]
+
+
+def get_last_seqs_for_skus(db: Session, skus: Sequence[str]) -> Dict[str, int]:
+    if not skus:
+        return {}
+    return {sku: int(seq or 0) for sku, seq in db.execute(last_seqs_stmt(skus)).all()}
+
+
 # MQTT 이벤트용 헬퍼들
 
 def _find_cycle_by_seq_and_sku(
@@ -0,0 +1,116 @@
+# app/services/cycles_service_async.py
+# cycles_service 의 async 버전 (ASYNC_DB=true 일 때 REST 엔드포인트에서 사용)
+
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select, desc, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import sku_latest
+from app.db.archive import get_archived, merge_with_archive, needs_archive
+from app.db.models.cycle import Cycle
+from app.schemas.cycle import CycleCreate
+
+
+async def create_cycle(db: AsyncSession, data: CycleCreate) -> Cycle:
+    cycle = Cycle(
+        seq=data.seq,
+        sku=data.sku,
+        target_ml=data.target_ml,
+        actual_ml=data.actual_ml,
+        valve_ms=data.valve_ms,
+        error=data.error,
+        next_valve_ms=data.next_valve_ms,
+        spc_state=data.spc_state,
+    )
+    db.add(cycle)
+    await db.commit()
+    await db.refresh(cycle)
+    return cycle
+
+
+async def bulk_create_cycles(db: AsyncSession, rows: Sequence[CycleCreate]) -> int:
+    if not rows:
+        return 0
+    await db.execute(insert(Cycle), [r.model_dump() for r in rows])
+    await db.run_sync(sku_latest.refresh_cycles, [r.sku for r in rows])
+    await db.commit()
+    return len(rows)
+
+
+async def list_cycles(
+    db: AsyncSession,
+    sku: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> List[Cycle]:
+    stmt = select(Cycle)
+    if sku:
+        stmt = stmt.where(Cycle.sku == sku)
+    if since is not None:
+        stmt = stmt.where(Cycle.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Cycle.created_at < until)
+    if before_id is not None:
+        stmt = stmt.where(Cycle.id < before_id)
+    if after_id is not None:
+        stmt = stmt.where(Cycle.id > after_id).order_by(Cycle.id)
+    else:
+        stmt = stmt.order_by(desc(Cycle.id))
+    rows = list(await db.scalars(stmt.limit(limit)))
+    if after_id is not None:
+        rows.reverse()
+    if needs_archive("cycles", rows, sku, since, until, limit, before_id, after_id):
+        # 아카이브 파일 읽기는 이벤트 루프 밖에서
+        rows = await asyncio.to_thread(
+            merge_with_archive, "cycles", rows, sku=sku, since=since, until=until, limit=limit,
+            before_id=before_id, after_id=after_id,
+        )
+    return rows
+
+
+async def get_cycle_by_id(db: AsyncSession, cycle_id: int) -> Optional[Cycle]:
+    cycle = await db.get(Cycle, cycle_id)
+    if cycle is None:
+        cycle = await asyncio.to_thread(get_archived, "cycles", cycle_id)
+    return cycle
+
+
+async def get_recent_cycles_for_sku(
+    db: AsyncSession,
+    sku: str,
+    limit: int = 50,
+) -> List[Cycle]:
+    stmt = (
+        select(Cycle)
+        .where(Cycle.sku == sku)
+        .order_by(desc(Cycle.created_at))
+        .limit(limit)
+    )
+    rows = list(await db.scalars(stmt))
+    rows.reverse()
+    return rows
+
+
+async def get_last_seq_for_sku(db: AsyncSession, sku: str) -> int:
+    stmt = (
+        select(Cycle.seq)
+        .where(Cycle.sku == sku)
+        .order_by(desc(Cycle.seq))
+        .limit(1)
+    )
+    last = (await db.execute(stmt)).scalar_one_or_none()
+    return last or 0
+
+
+async def get_last_seqs_for_skus(db: AsyncSession, skus: Sequence[str]) -> Dict[str, int]:
+    from app.services.cycles_service import last_seqs_stmt
+
+    if not skus:
+        return {}
+    return {sku: int(seq or 0) for sku, seq in (await db.execute(last_seqs_stmt(skus))).all()}
@@ -0,0 +1,102 @@
+# app/services/export_service.py
+"""
+cycles / alarms 전체 구간 스트리밍 export (NDJSON / CSV).
+
+- 요청 세션과 별개의 connection(replica 가 최신이면 replica)에서 server-side cursor(stream_results + yield_per)로 읽어
+  chunk 단위로 직렬화해 흘려보내므로 수백만 행도 메모리 사용이 일정하다.
+- 보존 기간이 지나 아카이브된 행(app.db.archive)과 DB 행을 id 오름차순으로 병합해 낸다
+  (두 스트림 모두 id 순이라 heapq.merge 로 한 행씩, 양쪽에 같이 남은 행은 한 번만).
+- after_id 로 이어받기 가능 (마지막으로 받은 id 를 넘기면 그 다음 행부터).
+"""
+
+from __future__ import annotations
+
+import csv
+import heapq
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from app.db.archive import ARCHIVE_MODELS, archive_store
+from app.db.replica import replica_router
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_TABLES = ("cycles", "alarms")
+CHUNK_SIZE = 5000
+
+
+def _json_default(v: Any) -> str:
+    if isinstance(v, datetime):
+        return v.isoformat()
+    raise TypeError(f"not JSON serializable: {type(v).__name__}")
+
+
+def _db_rows(table: str, sku: Optional[str], since: Optional[datetime], until: Optional[datetime],
+             after_id: Optional[int], chunk_size: int) -> Iterator[Dict[str, Any]]:
+    t = ARCHIVE_MODELS[table].__table__
+    stmt = select(t).order_by(t.c.id)
+    if sku:
+        stmt = stmt.where(t.c.sku == sku)
+    if since is not None:
+        stmt = stmt.where(t.c.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(t.c.created_at < until)
+    if after_id is not None:
+        stmt = stmt.where(t.c.id > after_id)
+
+    with replica_router.read_engine().connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        for part in result.mappings().partitions(chunk_size):
+            yield from (dict(r) for r in part)
+
+
+def _dedup_ids(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    # 삭제 직전에 중단돼 아카이브와 DB 에 같이 남은 행은 한 번만
+    last = None
+    for r in rows:
+        if r["id"] != last:
+            yield r
+        last = r["id"]
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for r in rows:
+        chunk.append(r)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _serialize(chunk: List[Dict[str, Any]], fmt: str, columns: List[str]) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(r, default=_json_default, ensure_ascii=False) + "\n" for r in chunk)
+    buf = io.StringIO()
+    csv.writer(buf).writerows(
+        [v.isoformat() if isinstance(v, datetime) else v for v in (r[c] for c in columns)] for r in chunk
+    )
+    return buf.getvalue()
+
+
+def iter_export(table: str, fmt: str = "ndjson", sku: Optional[str] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                after_id: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """chunk 단위 문자열 (NDJSON 줄 묶음 / CSV 헤더 + 행 묶음)"""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"unknown export table: {table!r}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format: {fmt!r} (expected one of {tuple(EXPORT_FORMATS)})")
+
+    columns = [c.name for c in ARCHIVE_MODELS[table].__table__.columns]
+    if fmt == "csv":
+        yield ",".join(columns) + "\r\n"
+
+    archived = archive_store.iter_rows(table, sku=sku, since=since, until=until, after_id=after_id)
+    live = _db_rows(table, sku, since, until, after_id, chunk_size)
+    for chunk in _chunks(_dedup_ids(heapq.merge(archived, live, key=lambda r: r["id"])), chunk_size):
+        yield _serialize(chunk, fmt, columns)
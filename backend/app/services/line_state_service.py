@@ -1,20 +1,97 @@
 # app/services/line_state_service.py
-from typing import Optional
+"""
+라인별 현재 SKU (line_state) — 메모리 registry + write-through.
+
+can_in 한 건에 set_current_sku 가 여러 번(_handle_can_in, log_can_in_event, fill_result 쪽) 불리는데
+대부분 같은 SKU 를 다시 쓰는 것이라, 메모리 값과 같으면 DB 를 건드리지 않는다.
+
+- SKU 가 바뀌었을 때만 upsert + commit
+- 같은 SKU 라도 마지막 기록 후 LINE_STATE_FLUSH_S 초가 지나면 한 번 다시 기록 (updated_at 갱신)
+- DB 기록이 실패하면 dirty 로 남겨 다음 호출에서 다시 기록
+- 조회(/control/current_sku)는 메모리 우선, 없으면 DB 에서 읽어 채움
+  (line_state 는 MQTT ingest 가 도는 백엔드 프로세스 하나가 쓴다는 가정)
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.models.line_state import LineState
+from app.db.upsert import upsert
+
+# line_id -> (sku, 마지막 DB 기록 시각(monotonic) / None 이면 아직 기록 안 됨)
+_registry: Dict[str, Tuple[Optional[str], Optional[float]]] = {}
+_lock = threading.Lock()
+_stats = {"writes": 0, "coalesced": 0, "db_reads": 0}
+
+
+def cached_sku(line_id: str = "line1") -> Optional[str]:
+    with _lock:
+        entry = _registry.get(line_id)
+    return entry[0] if entry else None
+
+
+def remember(line_id: str, sku: Optional[str]) -> None:
+    """DB 에서 읽은 값을 메모리에 반영 (이미 기록된 값이므로 dirty 아님)"""
+    if sku is None:
+        return
+    with _lock:
+        _stats["db_reads"] += 1
+        _registry.setdefault(line_id, (sku, time.monotonic()))
+
 
 def set_current_sku(db: Session, sku: str, line_id: str = "line1") -> None:
-    db.execute(text("""
-        INSERT INTO line_state(line_id, current_sku)
-        VALUES (:line_id, :sku)
-        ON CONFLICT (line_id)
-        DO UPDATE SET current_sku = EXCLUDED.current_sku, updated_at = now()
-    """), {"line_id": line_id, "sku": sku})
+    now = time.monotonic()
+    with _lock:
+        cur_sku, written_at = _registry.get(line_id, (None, None))
+        _registry[line_id] = (sku, written_at if cur_sku == sku else None)
+        if (
+            cur_sku == sku
+            and written_at is not None
+            and now - written_at < settings.LINE_STATE_FLUSH_S
+        ):
+            _stats["coalesced"] += 1
+            return
+
+    # PostgreSQL / SQLite 공통 upsert (INSERT ... ON CONFLICT (line_id) DO UPDATE)
+    upsert(
+        db,
+        LineState.__table__,
+        {"line_id": line_id, "current_sku": sku},
+        key=["line_id"],
+        extra_set={"updated_at": func.now()},
+    )
     db.commit()
 
+    with _lock:
+        # 기록하는 사이 다른 SKU 로 바뀌었으면 그쪽이 dirty 로 남아 있어야 함
+        if _registry.get(line_id, (None, None))[0] == sku:
+            _registry[line_id] = (sku, now)
+        _stats["writes"] += 1
+
+
 def get_current_sku(db: Session, line_id: str = "line1") -> Optional[str]:
+    sku = cached_sku(line_id)
+    if sku is not None:
+        return sku
     row = db.execute(
-        text("SELECT current_sku FROM line_state WHERE line_id = :line_id"),
-        {"line_id": line_id},
+        select(LineState.current_sku).where(LineState.line_id == line_id)
     ).scalar_one_or_none()
+    remember(line_id, row)
     return row
+
+
+def status() -> Dict[str, object]:
+    with _lock:
+        return {
+            **_stats,
+            "flush_s": settings.LINE_STATE_FLUSH_S,
+            "lines": {
+                line_id: {"sku": sku, "dirty": written_at is None}
+                for line_id, (sku, written_at) in _registry.items()
+            },
+        }
@@ -0,0 +1,180 @@
+# app/services/predictive_spc_service.py
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.cycle import Cycle
+from app.db.models.quality import Alarm
+from app.db.models.recipe import Recipe
+from app.db.session import SessionLocal
+from app.ml import lstm_b
+from app.services.quality_service import get_recent_errors_for_sku, publish_spc_alarm_mqtt
+
+PREDICTED_ALARM_TYPE = "PREDICTED_DRIFT"
+
+
+class PredictiveSpcMonitor:
+    """LSTM-B 로 활성 SKU 의 다음 k 개 error 를 주기적으로 예측해 조기 경보(PREDICTED_DRIFT)를 낸다.
+
+    - 이벤트(fill_result)마다가 아니라 PREDICTIVE_SPC_INTERVAL_S 주기로 한 번씩 실행
+    - 모든 활성 SKU 윈도우를 한 배치로 묶어 horizon 스텝만큼 forward (스텝당 1회)
+    - 알람은 (sku, 마지막 cycle) 당 1건만 생성 (compute_spc_for_sku 와 같은 중복 방지 규칙)
+    """
+
+    def __init__(self) -> None:
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.last_run_ms: Optional[float] = None
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+        self.last_error: Optional[str] = None
+
+    # ========== 입력 구성 ==========
+
+    @staticmethod
+    def _recipe_index(recipes: List[Recipe]) -> Dict[int, int]:
+        """recipe_id → 학습 때의 recipe_idx (메타 없으면 id 정렬 순서 = category 코드 순서)"""
+        saved = lstm_b.LSTM_B_META.get("recipe_index")
+        if saved:
+            return {int(k): int(v) for k, v in saved.items()}
+        return {rid: i for i, rid in enumerate(sorted(r.id for r in recipes))}
+
+    def run_once(self, db: Optional[Session] = None) -> Dict[str, Dict[str, Any]]:
+        if lstm_b.LSTM_B_MODEL is None:
+            return {}
+
+        import numpy as np
+
+        t0 = time.perf_counter()
+        seq_len = int(lstm_b.LSTM_B_META.get("seq_len", 20))
+        horizon = settings.PREDICTIVE_SPC_HORIZON
+
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            all_recipes = list(db.scalars(select(Recipe)))
+            recipe_idx = self._recipe_index(all_recipes)
+            active = [r for r in all_recipes if r.is_active and r.id in recipe_idx]
+
+            skus, histories, windows = [], [], []
+            for r in active:
+                errors = get_recent_errors_for_sku(db, sku=r.sku_id, limit=100)
+                if len(errors) < seq_len:
+                    continue
+                w = np.zeros((seq_len, 3), dtype=np.float32)
+                w[:, 0] = errors[-seq_len:]
+                w[:, 1] = recipe_idx[r.id]
+                skus.append(r.sku_id)
+                histories.append(errors)
+                windows.append(w)
+
+            if not windows:
+                return {}
+
+            forecast = lstm_b.forecast_errors_batch(np.stack(windows), horizon=horizon)
+
+            last_ids = dict(db.execute(
+                select(Cycle.sku, func.max(Cycle.id)).where(Cycle.sku.in_(skus)).group_by(Cycle.sku)
+            ).all())
+
+            results: Dict[str, Dict[str, Any]] = {}
+            new_alarms = []
+            for i, sku in enumerate(skus):
+                info = lstm_b.get_predictive_spc_state(histories[i], forecast[i])
+                info["horizon"] = horizon
+                results[sku] = info
+                if info["spc_state"] == PREDICTED_ALARM_TYPE and self._upsert_alarm(db, sku, info, last_ids.get(sku)):
+                    new_alarms.append((sku, info, last_ids.get(sku)))
+            db.commit()
+        finally:
+            if own_session:
+                db.close()
+
+        # commit 후 새 알람만 publish
+        for sku, info, cycle_id in new_alarms:
+            publish_spc_alarm_mqtt(sku=sku, level="WARN", alarm_type=PREDICTED_ALARM_TYPE, cycle_id=cycle_id)
+            self._emit_ws(sku, info, cycle_id)
+
+        with self._lock:
+            self.runs += 1
+            self.last_run_ms = (time.perf_counter() - t0) * 1000.0
+            self.last_results = results
+        return results
+
+    # ========== 알람 ==========
+
+    @staticmethod
+    def _upsert_alarm(db: Session, sku: str, info: Dict[str, Any], cycle_id: Optional[int]) -> bool:
+        """새 알람이면 True"""
+        existing = db.scalars(
+            select(Alarm)
+            .where(Alarm.sku == sku, Alarm.alarm_type == PREDICTED_ALARM_TYPE, Alarm.cycle_id == cycle_id)
+            .order_by(desc(Alarm.id))
+            .limit(1)
+        ).first()
+        direction = info.get("alarm_type") or "DRIFT"
+        message = (
+            f"Predicted {info.get('predicted_level')} ({direction}) within {info['horizon']} cycles for SKU {sku}"
+        )
+        if existing:
+            existing.message = message
+            return False
+
+        db.add(Alarm(sku=sku, level="WARN", alarm_type=PREDICTED_ALARM_TYPE, message=message, cycle_id=cycle_id))
+        return True
+
+    @staticmethod
+    def _emit_ws(sku: str, info: Dict[str, Any], cycle_id: Optional[int]) -> None:
+        from app.ws.bus import ws_bus
+
+        ws_bus.emit({
+            "type": "predicted_drift",
+            "ts": int(time.time()),
+            "data": {
+                "sku_id": sku,
+                "cycle_id": cycle_id,
+                "direction": info.get("alarm_type"),
+                "predicted_level": info.get("predicted_level"),
+                "forecast": info.get("forecast"),
+            },
+        })
+
+    # ========== 주기 실행 ==========
+
+    def start(self, interval_s: float) -> None:
+        if interval_s <= 0 or self._thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval_s)
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.last_error = repr(e)
+                    print("[SPC] predictive run failed:", repr(e))
+
+        self._thread = threading.Thread(target=loop, name="predictive-spc", daemon=True)
+        self._thread.start()
+        print(f"[SPC] predictive drift monitor every {interval_s}s (horizon={settings.PREDICTIVE_SPC_HORIZON})")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self._thread is not None,
+                "model_loaded": lstm_b.LSTM_B_MODEL is not None,
+                "runs": self.runs,
+                "last_run_ms": self.last_run_ms,
+                "last_error": self.last_error,
+                "results": dict(self.last_results),
+            }
+
+
+predictive_spc = PredictiveSpcMonitor()
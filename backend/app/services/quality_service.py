@@ -1,15 +1,17 @@
 # app/services/quality_service.py
 
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 import json
-import paho.mqtt.publish as mqtt_publish
 
 from sqlalchemy.orm import Session
 from sqlalchemy import select, desc
 
 from app.core.config import settings
+from app.db.archive import get_archived, merge_with_archive
 from app.db.models.cycle import Cycle
 from app.db.models.quality import SpcState, Alarm
+from app.db import sku_latest
 from app.ml import lstm_b
 
 
@@ -35,6 +37,8 @@ def publish_spc_alarm_mqtt(
 ) -> None:
     payload = {"sku": sku, "level": level, "alarm_type": alarm_type, "cycle_id": cycle_id}
     try:
+        import paho.mqtt.publish as mqtt_publish
+
         mqtt_publish.single(
             MQTT_ALARM_TOPIC,
             json.dumps(payload, ensure_ascii=False),
@@ -57,14 +61,18 @@ def compute_spc_for_sku(db: Session, sku: str) -> Dict[str, Any]:
     errors = get_recent_errors_for_sku(db, sku=sku, limit=100)
     info = lstm_b.get_spc_state_from_errors(errors)
 
-    # 가장 최근 Cycle 찾기
-    last_cycle_stmt = (
-        select(Cycle)
-        .where(Cycle.sku == sku)
-        .order_by(desc(Cycle.id))
-        .limit(1)
-    )
-    last_cycle = db.scalars(last_cycle_stmt).first()
+    # 가장 최근 Cycle 찾기 (sku_latest PK 조회 → cycles PK 조회, read model 이 없을 때만 정렬 조회)
+    latest = sku_latest.get_latest(db, sku)
+    if latest is not None and latest.last_cycle_id is not None:
+        last_cycle = db.get(Cycle, latest.last_cycle_id)
+    else:
+        last_cycle_stmt = (
+            select(Cycle)
+            .where(Cycle.sku == sku)
+            .order_by(desc(Cycle.id))
+            .limit(1)
+        )
+        last_cycle = db.scalars(last_cycle_stmt).first()
 
     # 사이클이 아예 없으면 계산 결과만 리턴(쓰기 없음)
     if not last_cycle:
@@ -161,39 +169,64 @@ def compute_spc_for_sku(db: Session, sku: str) -> Dict[str, Any]:
     return info
 
 
-def list_spc_states(db: Session, sku: str, limit: int = 50) -> List[SpcState]:
+def list_spc_states(
+    db: Session,
+    sku: str,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[SpcState]:
     stmt = (
         select(SpcState)
         .where(SpcState.sku == sku)
         .order_by(desc(SpcState.id))
         .limit(limit)
     )
-    return db.scalars(stmt).all()
-
-
-def list_alarms(db: Session, sku: Optional[str] = None, limit: int = 50) -> List[Alarm]:
+    if since is not None:
+        stmt = stmt.where(SpcState.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(SpcState.created_at < until)
+    rows = db.scalars(stmt).all()
+    return merge_with_archive("spc_states", list(rows), sku=sku, since=since, until=until, limit=limit)
+
+
+def list_alarms(
+    db: Session,
+    sku: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> List[Alarm]:
+    # keyset 페이지 (id 내림차순): before_id → 더 오래된 페이지, after_id → 바로 다음(더 새) 페이지
     stmt = select(Alarm)
     if sku:
         stmt = stmt.where(Alarm.sku == sku)
-    stmt = stmt.order_by(desc(Alarm.id)).limit(limit)
-    return db.scalars(stmt).all()
+    if since is not None:
+        stmt = stmt.where(Alarm.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Alarm.created_at < until)
+    if before_id is not None:
+        stmt = stmt.where(Alarm.id < before_id)
+    if after_id is not None:
+        stmt = stmt.where(Alarm.id > after_id).order_by(Alarm.id)
+    else:
+        stmt = stmt.order_by(desc(Alarm.id))
+    rows = list(db.scalars(stmt.limit(limit)))
+    if after_id is not None:
+        rows.reverse()
+    return merge_with_archive("alarms", rows, sku=sku, since=since, until=until, limit=limit,
+                              before_id=before_id, after_id=after_id)
 
 
 def get_alarm_by_id(db: Session, alarm_id: int) -> Optional[Alarm]:
     stmt = select(Alarm).where(Alarm.id == alarm_id).limit(1)
-    return db.scalars(stmt).first()
+    return db.scalars(stmt).first() or get_archived("alarms", alarm_id)
 
 
-def read_current_spc_state(db: Session, sku: str) -> dict:
-    # (읽기 전용) 최신 spc_states 1건만 반환
-    stmt = (
-        select(SpcState)
-        .where(SpcState.sku == sku)
-        .order_by(desc(SpcState.id))
-        .limit(1)
-    )
-    row = db.scalars(stmt).first()
-
+def spc_state_dict(row: Optional[Any]) -> dict:
+    """SpcState 행 → 응답 dict (row 가 없으면 UNKNOWN)"""
     if not row:
         return dict(
             spc_state="UNKNOWN",
@@ -214,3 +247,31 @@ def read_current_spc_state(db: Session, sku: str) -> dict:
         cusum_neg=row.cusum_neg,
         n_samples=row.n_samples,
     )
+
+
+def latest_spc_dict(latest: Any) -> dict:
+    """sku_latest 행의 SPC 묶음 → read_current_spc_state 응답"""
+    return dict(
+        spc_state=latest.spc_state,
+        alarm_type=latest.spc_alarm_type,
+        mean=latest.spc_mean,
+        std=latest.spc_std,
+        cusum_pos=latest.cusum_pos,
+        cusum_neg=latest.cusum_neg,
+        n_samples=latest.n_samples,
+    )
+
+
+def read_current_spc_state(db: Session, sku: str) -> dict:
+    # (읽기 전용) 최신 SPC 상태: sku_latest PK 1건 (read model 에 없으면 spc_states 최신 1건)
+    latest = sku_latest.get_latest(db, sku)
+    if latest is not None and latest.spc_state_id is not None:
+        return latest_spc_dict(latest)
+
+    stmt = (
+        select(SpcState)
+        .where(SpcState.sku == sku)
+        .order_by(desc(SpcState.id))
+        .limit(1)
+    )
+    return spc_state_dict(db.scalars(stmt).first())
@@ -0,0 +1,96 @@
+# app/services/quality_service_async.py
+# quality_service 의 읽기 전용 async 버전 (REST 조회용)
+
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.archive import get_archived, merge_with_archive, needs_archive
+from app.db.models.quality import SpcState, Alarm
+from app.db import sku_latest
+from app.services.quality_service import latest_spc_dict, spc_state_dict
+
+
+async def list_spc_states(
+    db: AsyncSession,
+    sku: str,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[SpcState]:
+    stmt = (
+        select(SpcState)
+        .where(SpcState.sku == sku)
+        .order_by(desc(SpcState.id))
+        .limit(limit)
+    )
+    if since is not None:
+        stmt = stmt.where(SpcState.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(SpcState.created_at < until)
+    rows = list(await db.scalars(stmt))
+    if needs_archive("spc_states", rows, sku, since, until, limit):
+        rows = await asyncio.to_thread(
+            merge_with_archive, "spc_states", rows, sku=sku, since=since, until=until, limit=limit
+        )
+    return rows
+
+
+async def list_alarms(
+    db: AsyncSession,
+    sku: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> List[Alarm]:
+    stmt = select(Alarm)
+    if sku:
+        stmt = stmt.where(Alarm.sku == sku)
+    if since is not None:
+        stmt = stmt.where(Alarm.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Alarm.created_at < until)
+    if before_id is not None:
+        stmt = stmt.where(Alarm.id < before_id)
+    if after_id is not None:
+        stmt = stmt.where(Alarm.id > after_id).order_by(Alarm.id)
+    else:
+        stmt = stmt.order_by(desc(Alarm.id))
+    rows = list(await db.scalars(stmt.limit(limit)))
+    if after_id is not None:
+        rows.reverse()
+    if needs_archive("alarms", rows, sku, since, until, limit, before_id, after_id):
+        rows = await asyncio.to_thread(
+            merge_with_archive, "alarms", rows, sku=sku, since=since, until=until, limit=limit,
+            before_id=before_id, after_id=after_id,
+        )
+    return rows
+
+
+async def get_alarm_by_id(db: AsyncSession, alarm_id: int) -> Optional[Alarm]:
+    stmt = select(Alarm).where(Alarm.id == alarm_id).limit(1)
+    alarm = (await db.scalars(stmt)).first()
+    if alarm is None:
+        alarm = await asyncio.to_thread(get_archived, "alarms", alarm_id)
+    return alarm
+
+
+async def read_current_spc_state(db: AsyncSession, sku: str) -> dict:
+    # (읽기 전용) 최신 SPC 상태: sku_latest PK 1건 (read model 에 없으면 spc_states 최신 1건)
+    # 응답 dict 변환은 sync 버전과 같은 헬퍼 (두 라우터 응답이 어긋나지 않게)
+    latest = await sku_latest.get_latest_async(db, sku)
+    if latest is not None and latest.spc_state_id is not None:
+        return latest_spc_dict(latest)
+
+    stmt = (
+        select(SpcState)
+        .where(SpcState.sku == sku)
+        .order_by(desc(SpcState.id))
+        .limit(1)
+    )
+    return spc_state_dict((await db.scalars(stmt)).first())
@@ -0,0 +1,208 @@
+# app/services/quality_trend_service.py
+"""
+/quality/trend: SKU 품질 추이를 기간 bucket(분/시/일/주/월) 단위로 DB 에서 집계.
+
+앱이 /cycles, /quality/spc_states 에서 limit 만큼 원본 행을 받아 기기에서 집계하던 것을 대신한다.
+
+- cycles : bucket 별 cycle 수, error 평균/표준편차, actual_ml 최소/최대 (GROUP BY 1번)
+- alarms : bucket × level 별 알람 수 (GROUP BY 1번)
+- bucket 은 PostgreSQL date_trunc(UTC 기준), SQLite 는 같은 경계의 문자열 prefix / date(..., 'weekday 1')
+  (SQLite 는 시각을 'YYYY-MM-DD HH:MM:SS...' 문자열로 저장 → substr 이 strftime 보다 행당 비용이 작다)
+- 표준편차는 count / sum / sum(x²) 로 계산 (SQLite 에 stddev 가 없어 두 dialect 공통)
+- (sku, created_at, ...) covering 인덱스만 읽는다 (ix_cycles_sku_created_at, ix_alarms_sku_created_at)
+- 같은 조회(sku, from, to, bucket)는 TREND_CACHE_TTL_S 동안 결과 캐시 (to 생략 = "지금까지" 도 같은 키)
+- 보존 기간이 지나 아카이브된 구간은 집계하지 않는다 (DB 에 남은 행만)
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.cycle import Cycle
+from app.db.models.quality import Alarm
+
+# bucket 단위 → 대략적인 길이(초, 최대 bucket 수 제한용)
+BUCKETS = {"minute": 60, "hour": 3600, "day": 86_400, "week": 7 * 86_400, "month": 31 * 86_400}
+DEFAULT_SPAN = {"minute": timedelta(hours=1), "hour": timedelta(days=1), "day": timedelta(days=30),
+                "week": timedelta(days=7 * 26), "month": timedelta(days=365)}
+
+# SQLite: 저장 문자열에서 bucket 까지의 prefix 길이 (나머지는 _bucket_start 가 채움)
+_SQLITE_PREFIX = {"minute": 16, "hour": 13, "day": 10, "month": 7}
+_TS_TEMPLATE = "0000-01-01 00:00:00"
+
+CacheKey = Tuple[str, Optional[datetime], Optional[datetime], str]
+
+
+class TrendCache:
+    """조회 파라미터 → 집계 결과, TTL + 최대 항목 수 (오래된 것부터 제거)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] > time.monotonic():
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        if settings.TREND_CACHE_TTL_S <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + settings.TREND_CACHE_TTL_S, value)
+            self._items.move_to_end(key)
+            while len(self._items) > settings.TREND_CACHE_MAX:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses,
+                    "ttl_s": settings.TREND_CACHE_TTL_S}
+
+
+trend_cache = TrendCache()
+
+
+def _utc(v: datetime) -> datetime:
+    # naive 는 UTC 로 간주 (DB 저장 기준), aware 는 UTC 로 변환 (SQLite 는 문자열 비교라 필수)
+    return v.replace(tzinfo=timezone.utc) if v.tzinfo is None else v.astimezone(timezone.utc)
+
+
+def resolve_range(bucket: str, since: Optional[datetime], until: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """기본 구간 채우기 + 검증 (잘못되면 ValueError)"""
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {list(BUCKETS)}")
+    until = _utc(until) if until is not None else datetime.now(timezone.utc)
+    since = _utc(since) if since is not None else until - DEFAULT_SPAN[bucket]
+    if since >= until:
+        raise ValueError("from must be earlier than to")
+    n = (until - since).total_seconds() / BUCKETS[bucket]
+    if n > settings.TREND_MAX_BUCKETS:
+        raise ValueError(f"too many buckets ({n:.0f} > {settings.TREND_MAX_BUCKETS}), use a larger bucket")
+    return since, until
+
+
+def _bucket_expr(dialect: str, bucket: str, col):
+    # 단위/포맷은 화이트리스트 상수 → literal 로 (bind 파라미터면 PG 가 SELECT 와 GROUP BY 식을 다르게 봄)
+    if dialect == "sqlite":
+        if bucket == "week":
+            # ISO 주(월요일 시작) = date_trunc('week')
+            return func.date(col, literal_column("'-6 days'"), literal_column("'weekday 1'"))
+        return func.substr(col, literal_column("1"), literal_column(str(_SQLITE_PREFIX[bucket])))
+    return func.date_trunc(literal_column(f"'{bucket}'"), func.timezone(literal_column("'UTC'"), col))
+
+
+def trend_stmts(dialect: str, sku: str, since: datetime, until: datetime, bucket: str):
+    cb = _bucket_expr(dialect, bucket, Cycle.created_at).label("bucket")
+    cycles = (
+        select(
+            cb,
+            func.count(),
+            func.count(Cycle.error),
+            func.sum(Cycle.error),
+            func.sum(Cycle.error * Cycle.error),
+            func.min(Cycle.actual_ml),
+            func.max(Cycle.actual_ml),
+        )
+        .where(Cycle.sku == sku, Cycle.created_at >= since, Cycle.created_at < until)
+        .group_by(cb)
+    )
+    ab = _bucket_expr(dialect, bucket, Alarm.created_at).label("bucket")
+    alarms = (
+        select(ab, Alarm.level, func.count())
+        .where(Alarm.sku == sku, Alarm.created_at >= since, Alarm.created_at < until)
+        .group_by(ab, Alarm.level)
+    )
+    return cycles, alarms
+
+
+def _bucket_start(v: Any) -> datetime:
+    if isinstance(v, str):  # SQLite: '2025-01' / '2025-01-01 13' 등 prefix
+        v = datetime.fromisoformat(v + _TS_TEMPLATE[len(v):])
+    return v if v.tzinfo else v.replace(tzinfo=timezone.utc)
+
+
+def _empty(start: datetime) -> Dict[str, Any]:
+    return dict(bucket_start=start, count=0, error_n=0, error_mean=None, error_std=None,
+                actual_ml_min=None, actual_ml_max=None, alarm_count=0, alarms_by_level={})
+
+
+def build_trend(cycle_rows, alarm_rows) -> List[Dict[str, Any]]:
+    out: Dict[datetime, Dict[str, Any]] = {}
+    for b, n, n_err, s, ss, amin, amax in cycle_rows:
+        row = out.setdefault(_bucket_start(b), _empty(_bucket_start(b)))
+        row.update(count=int(n), error_n=int(n_err), actual_ml_min=amin, actual_ml_max=amax)
+        if n_err:
+            mean = float(s) / n_err
+            row["error_mean"] = mean
+            if n_err > 1:
+                var = (float(ss) - float(s) * mean) / (n_err - 1)
+                row["error_std"] = math.sqrt(max(var, 0.0))
+    for b, level, n in alarm_rows:
+        row = out.setdefault(_bucket_start(b), _empty(_bucket_start(b)))
+        row["alarm_count"] += int(n)
+        row["alarms_by_level"][level] = int(n)
+    return [out[k] for k in sorted(out)]
+
+
+def get_trend(
+    db: Session,
+    sku: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: str = "hour",
+) -> Dict[str, Any]:
+    key = (sku, since, until, bucket)
+    cached = trend_cache.get(key)
+    if cached is not None:
+        return cached
+
+    since, until = resolve_range(bucket, since, until)
+    cycles, alarms = trend_stmts(db.get_bind().dialect.name, sku, since, until, bucket)
+    result = dict(sku=sku, bucket=bucket, since=since, until=until,
+                  buckets=build_trend(db.execute(cycles).all(), db.execute(alarms).all()))
+    trend_cache.put(key, result)
+    return result
+
+
+async def get_trend_async(
+    db: AsyncSession,
+    sku: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: str = "hour",
+) -> Dict[str, Any]:
+    key = (sku, since, until, bucket)
+    cached = trend_cache.get(key)
+    if cached is not None:
+        return cached
+
+    since, until = resolve_range(bucket, since, until)
+    cycles, alarms = trend_stmts(db.get_bind().dialect.name, sku, since, until, bucket)
+    cycle_rows = (await db.execute(cycles)).all()
+    alarm_rows = (await db.execute(alarms)).all()
+    result = dict(sku=sku, bucket=bucket, since=since, until=until, buckets=build_trend(cycle_rows, alarm_rows))
+    trend_cache.put(key, result)
+    return result
@@ -1,6 +1,6 @@
 # app/services/recipes_service.py
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
 from sqlalchemy.orm import Session
 from sqlalchemy import select
@@ -33,6 +33,11 @@ def get_recipe_by_sku_id(db: Session, sku_id: str) -> Optional[Recipe]:
     return db.scalars(stmt).first()
 
 
+def get_recipes_by_sku_ids(db: Session, sku_ids: Sequence[str]) -> Dict[str, Recipe]:
+    stmt = select(Recipe).where(Recipe.sku_id.in_(list(sku_ids)))
+    return {r.sku_id: r for r in db.scalars(stmt)}
+
+
 def list_recipes(db: Session) -> List[Recipe]:
     stmt = select(Recipe).order_by(Recipe.id)
     return list(db.scalars(stmt))
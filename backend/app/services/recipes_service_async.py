@@ -0,0 +1,58 @@
+# app/services/recipes_service_async.py
+# recipes_service 의 async 버전
+
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.recipe import Recipe
+from app.schemas.recipe import RecipeCreate, RecipeUpdate
+
+
+async def create_recipe(db: AsyncSession, data: RecipeCreate) -> Recipe:
+    recipe = Recipe(
+        sku_id=data.sku_id,
+        name=data.name,
+        target_amount=data.target_amount,
+        base_valve_ms=data.base_valve_ms,
+        description=data.description,
+        is_active=data.is_active,
+    )
+    db.add(recipe)
+    await db.commit()
+    await db.refresh(recipe)
+    return recipe
+
+
+async def get_recipe_by_id(db: AsyncSession, recipe_id: int) -> Optional[Recipe]:
+    return await db.get(Recipe, recipe_id)
+
+
+async def get_recipe_by_sku_id(db: AsyncSession, sku_id: str) -> Optional[Recipe]:
+    stmt = select(Recipe).where(Recipe.sku_id == sku_id).limit(1)
+    return (await db.scalars(stmt)).first()
+
+
+async def get_recipes_by_sku_ids(db: AsyncSession, sku_ids: Sequence[str]) -> Dict[str, Recipe]:
+    stmt = select(Recipe).where(Recipe.sku_id.in_(list(sku_ids)))
+    return {r.sku_id: r for r in (await db.scalars(stmt))}
+
+
+async def list_recipes(db: AsyncSession) -> List[Recipe]:
+    stmt = select(Recipe).order_by(Recipe.id)
+    return list(await db.scalars(stmt))
+
+
+async def update_recipe(db: AsyncSession, recipe: Recipe, data: RecipeUpdate) -> Recipe:
+    for field, value in data.dict(exclude_unset=True).items():
+        setattr(recipe, field, value)
+    db.add(recipe)
+    await db.commit()
+    await db.refresh(recipe)
+    return recipe
+
+
+async def delete_recipe(db: AsyncSession, recipe: Recipe) -> None:
+    await db.delete(recipe)
+    await db.commit()
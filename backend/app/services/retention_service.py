@@ -0,0 +1,186 @@
+# app/services/retention_service.py
+"""
+보존 기간이 지난 cycles / spc_states / alarms 를 압축 아카이브(app.db.archive)로 옮긴다.
+
+- 테이블별 보존 일수: RETENTION_CYCLES_DAYS / RETENTION_SPC_STATES_DAYS / RETENTION_ALARMS_DAYS (0=영구 보관)
+- 배치마다 (짧은 읽기 트랜잭션) → 아카이브 파일 쓰기 → (짧은 DELETE 트랜잭션) → PAUSE_S 휴식
+  파일을 먼저 쓰고 지우므로 중간에 죽어도 행이 사라지지 않는다 (중복은 조회 시 id 로 제거).
+- cycles 는 feature store 가 있으면 sync watermark(last_id) 이후 행은 옮기지 않고,
+  SKU별로 옮긴 max id 를 feature store 에 기록한다 (store 는 아카이브된 이력을 학습용으로 계속 보관).
+- cycles 가 월 파티션 테이블(PostgreSQL)이면 비워진 오래된 파티션은 DROP.
+
+사용법 (backend 폴더에서):
+
+    $ python -m app.services.retention_service run
+    $ python -m app.services.retention_service run --table alarms --days 180
+    $ python -m app.services.retention_service stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.db.archive import ARCHIVE_MODELS, ArchiveStore, archive_store
+from app.db.session import SessionLocal, engine
+
+
+class RetentionService:
+    def __init__(self, store: Optional[ArchiveStore] = None) -> None:
+        self.store = store or archive_store
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self.runs = 0
+        self.last_run_ms: Optional[float] = None
+        self.last_result: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    def policies() -> Dict[str, int]:
+        """테이블 → 보존 일수 (0=영구 보관)"""
+        return {
+            "cycles": settings.RETENTION_CYCLES_DAYS,
+            "spc_states": settings.RETENTION_SPC_STATES_DAYS,
+            "alarms": settings.RETENTION_ALARMS_DAYS,
+        }
+
+    @staticmethod
+    def _cycles_upper_id() -> Optional[int]:
+        """feature store 에 아직 sync 안 된 cycle 은 아카이브하지 않음"""
+        from app.ml.feature_store import FeatureStore
+
+        store = FeatureStore()
+        return store.last_id() if store.root.exists() else None
+
+    def archive_table(self, table: str, days: int, batch_size: Optional[int] = None,
+                      pause_s: Optional[float] = None, max_batches: Optional[int] = None) -> int:
+        """created_at 이 days 일 이전인 행을 id 순서로 배치 이동. 반환: 옮긴 행 수"""
+        model = ARCHIVE_MODELS[table]
+        t = model.__table__
+        batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        pause_s = settings.RETENTION_PAUSE_S if pause_s is None else pause_s
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+        stmt = select(t).where(t.c.created_at < cutoff).order_by(t.c.id).limit(batch_size)
+        if table == "cycles":
+            upper = self._cycles_upper_id()
+            if upper is not None:
+                stmt = stmt.where(t.c.id <= upper)
+
+        moved, batches = 0, 0
+        moved_upto: Dict[str, int] = {}
+        while max_batches is None or batches < max_batches:
+            db = SessionLocal()
+            try:
+                rows = [dict(r) for r in db.execute(stmt).mappings()]
+                db.rollback()  # 읽기 트랜잭션은 파일 쓰는 동안 잡고 있지 않음
+                if not rows:
+                    break
+                self.store.write_batch(table, rows)
+                db.execute(delete(t).where(t.c.id.in_([r["id"] for r in rows])))
+                db.commit()
+            finally:
+                db.close()
+
+            moved += len(rows)
+            if table == "cycles":
+                for r in rows:
+                    moved_upto[r["sku"]] = max(moved_upto.get(r["sku"], 0), int(r["id"]))
+            batches += 1
+            if len(rows) < batch_size:
+                break
+            time.sleep(pause_s)
+
+        if moved_upto:
+            from app.ml.feature_store import FeatureStore
+
+            FeatureStore().mark_archived(moved_upto)
+
+        if table == "cycles" and engine.dialect.name == "postgresql":
+            from app.db.migrate_cycles import drop_cycle_partitions_before
+
+            drop_cycle_partitions_before(engine, cutoff.date())
+
+        if moved:
+            print(f"[RETENTION] archived {moved} {table} rows older than {days}d ({batches} batches)")
+        return moved
+
+    def run_once(self, policies: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """보존 일수 > 0 인 테이블만 처리. 반환: 테이블별 옮긴 행 수"""
+        t0 = time.perf_counter()
+        result = {}
+        with self._run_lock:
+            for table, days in (policies or self.policies()).items():
+                if days > 0:
+                    result[table] = self.archive_table(table, days)
+
+        with self._lock:
+            self.runs += 1
+            self.last_run_ms = (time.perf_counter() - t0) * 1000.0
+            self.last_result = result
+        return result
+
+    # ========== 주기 실행 ==========
+
+    def start(self, interval_s: float) -> None:
+        if interval_s <= 0 or self._thread is not None:
+            return
+        if not any(days > 0 for days in self.policies().values()):
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.last_error = repr(e)
+                    print("[RETENTION] run failed:", repr(e))
+                time.sleep(interval_s)
+
+        self._thread = threading.Thread(target=loop, name="retention", daemon=True)
+        self._thread.start()
+        print(f"[RETENTION] archiving every {interval_s}s (policies={self.policies()})")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self._thread is not None,
+                "policies": self.policies(),
+                "runs": self.runs,
+                "last_run_ms": self.last_run_ms,
+                "last_error": self.last_error,
+                "last_result": dict(self.last_result),
+                "archive": self.store.stats(),
+            }
+
+
+retention = RetentionService()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cmd", choices=["run", "stats"])
+    parser.add_argument("--table", choices=list(ARCHIVE_MODELS), default=None, help="이 테이블만 처리")
+    parser.add_argument("--days", type=int, default=None, help="설정 대신 이 보존 일수 사용")
+    args = parser.parse_args()
+
+    if args.cmd == "run":
+        policies = retention.policies()
+        if args.table:
+            policies = {args.table: policies[args.table]}
+        if args.days is not None:
+            policies = {table: args.days for table in policies}
+        print(json.dumps(retention.run_once(policies), ensure_ascii=False))
+    print(json.dumps(retention.store.stats(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
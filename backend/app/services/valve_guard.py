@@ -0,0 +1,184 @@
+# app/services/valve_guard.py
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.ml.lstm_a import compute_next_valve_time
+from app.services import recipes_service
+
+
+class ValveDeadlineGuard:
+    """밸브 시간 계산을 deadline 안에서만 기다리는 가드.
+
+    - 계산(DB 조회 + LSTM-A/R2R)은 별도 워커 스레드에서 자체 세션으로 실행한다.
+    - deadline 초과/예외/워커 포화 시 SKU별 last-known-good valve_ms
+      (없으면 Recipe.base_valve_ms)로 즉시 fallback 한다.
+    - base_valve_ms 는 warmup 에서 레시피 전체를 미리 읽어 두고(preload), 없는 SKU 는 fallback 에서
+      전용 스레드로 레시피 1건을 원래 deadline 까지 남은 시간 안에서만 조회한다 (호출 전체가 deadline 을 넘지 않게).
+      그것도 안 되면 ALERT 로그 + unavailable 집계.
+    - 늦게 끝난 계산 결과도 캐시에 반영되어 다음 캔부터 사용된다.
+    """
+
+    def __init__(self, deadline_ms: float, max_workers: int = 2) -> None:
+        self.deadline_ms = float(deadline_ms)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="valve-guard")
+        # 워커가 전부 막혀 있으면 큐에 쌓지 않고 바로 fallback
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+
+        self._last_good: Dict[str, float] = {}   # sku -> 마지막 정상 계산 valve_ms
+        self._base_valve: Dict[str, float] = {}  # sku -> Recipe.base_valve_ms
+
+        # fallback 용 레시피 조회는 계산 워커와 분리 (워커 포화/DB 지연 중에도 1건만 시도)
+        self._recipe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="valve-recipe")
+        self._recipe_slot = threading.BoundedSemaphore(1)
+        self._unavailable = 0
+
+        self._calls = 0
+        self._fallbacks: Dict[str, int] = {}     # reason -> count
+        self._last_fallback: Optional[Dict[str, Any]] = None
+
+    # ========== 워커 ==========
+
+    def _compute(self, sku_id: str, target_amount: Optional[float]) -> float:
+        db = SessionLocal()
+        try:
+            recipe = recipes_service.get_recipe_by_sku_id(db, sku_id)
+            if recipe is not None:
+                with self._lock:
+                    self._base_valve[sku_id] = float(recipe.base_valve_ms)
+
+            valve_ms = float(compute_next_valve_time(db, sku_id=sku_id, target_amount=target_amount))
+            if valve_ms > 0.0:
+                with self._lock:
+                    self._last_good[sku_id] = valve_ms
+            return valve_ms
+        finally:
+            db.close()
+            self._slots.release()
+
+    # ========== base_valve_ms ==========
+
+    def preload(self, recipes: Iterable[Any]) -> int:
+        """레시피들의 base_valve_ms 를 미리 적재 (warmup). 반환: 적재한 SKU 수"""
+        loaded = {r.sku_id: float(r.base_valve_ms) for r in recipes if r.base_valve_ms}
+        with self._lock:
+            self._base_valve.update(loaded)
+        return len(loaded)
+
+    def _load_base_valve(self, sku_id: str) -> Optional[float]:
+        db = SessionLocal()
+        try:
+            recipe = recipes_service.get_recipe_by_sku_id(db, sku_id)
+        finally:
+            db.close()
+            self._recipe_slot.release()
+        if recipe is None or not recipe.base_valve_ms:
+            return None
+        with self._lock:
+            self._base_valve[sku_id] = float(recipe.base_valve_ms)
+        return float(recipe.base_valve_ms)
+
+    def _base_valve_bounded(self, sku_id: str, deadline: float) -> Optional[float]:
+        """캐시에 없는 SKU 의 base_valve_ms 를 deadline(monotonic)까지만 조회 (이미 조회 중이면 바로 None).
+
+        시간이 남지 않았어도 조회는 걸어 둔다 → 끝나면 캐시에 들어가 다음 캔부터 사용.
+        """
+        if not self._recipe_slot.acquire(blocking=False):
+            return None
+        try:
+            future = self._recipe_executor.submit(self._load_base_valve, sku_id)
+        except Exception:
+            self._recipe_slot.release()
+            return None
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception:
+            return None
+
+    # ========== fallback ==========
+
+    def _fallback(self, sku_id: str, reason: str, deadline: float, detail: str = "") -> float:
+        with self._lock:
+            valve_ms = self._last_good.get(sku_id)
+            base = self._base_valve.get(sku_id)
+        source = "last_known_good"
+        if valve_ms is None:
+            source = "base_valve_ms"
+            valve_ms = base if base is not None else self._base_valve_bounded(sku_id, deadline)
+        if valve_ms is None:
+            source = "none"
+            valve_ms = 0.0
+
+        with self._lock:
+            if source == "none":
+                self._unavailable += 1
+            self._fallbacks[reason] = self._fallbacks.get(reason, 0) + 1
+            self._last_fallback = {
+                "sku_id": sku_id,
+                "reason": reason,
+                "detail": detail,
+                "source": source,
+                "valve_ms": valve_ms,
+                "ts": int(time.time()),
+            }
+
+        if source == "none":
+            # fill 명령을 보낼 수 없음 (라인 정지) → 운영자가 봐야 함
+            print(f"[VALVE] ALERT no valve_ms for sku={sku_id} (no last-known-good, recipe unavailable) "
+                  f"reason={reason} {detail}")
+        else:
+            print(f"[VALVE] fallback sku={sku_id} reason={reason} source={source} valve_ms={valve_ms} {detail}")
+        return float(valve_ms)
+
+    # ========== 진입점 ==========
+
+    def compute(self, sku_id: str, target_amount: Optional[float]) -> Tuple[float, Optional[str]]:
+        """(valve_ms, fallback_reason) 반환. 정상 계산이면 reason은 None.
+
+        target_amount 가 None 이면 레시피 목표량으로 계산. fallback 포함 전체가 deadline_ms 안에 끝난다.
+        """
+        deadline = time.monotonic() + self.deadline_ms / 1000.0
+        with self._lock:
+            self._calls += 1
+
+        if not self._slots.acquire(blocking=False):
+            return self._fallback(sku_id, "busy", deadline), "busy"
+
+        try:
+            future = self._executor.submit(self._compute, sku_id, target_amount)
+        except Exception as e:
+            self._slots.release()
+            return self._fallback(sku_id, "error", deadline, repr(e)), "error"
+
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic())), None
+        except FutureTimeout:
+            return self._fallback(sku_id, "timeout", deadline, f"deadline={self.deadline_ms:.0f}ms"), "timeout"
+        except Exception as e:
+            return self._fallback(sku_id, "error", deadline, repr(e)), "error"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "deadline_ms": self.deadline_ms,
+                "calls": self._calls,
+                "fallbacks": dict(self._fallbacks),
+                "fallback_total": sum(self._fallbacks.values()),
+                "unavailable": self._unavailable,
+                "base_valve_skus": len(self._base_valve),
+                "last_fallback": dict(self._last_fallback) if self._last_fallback else None,
+                "last_known_good": dict(self._last_good),
+            }
+
+
+valve_guard = ValveDeadlineGuard(
+    deadline_ms=settings.VALVE_DEADLINE_MS,
+    max_workers=settings.VALVE_GUARD_WORKERS,
+)
@@ -0,0 +1,143 @@
+# app/services/warmup_service.py
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.session import Base, SessionLocal, engine
+from app.services import recipes_service
+
+LSTM_B_MODEL_PATH = Path(__file__).resolve().parent.parent / "ml" / "lstm_b.pt"
+
+
+class WarmupState:
+    """기동 warmup(테이블 생성, 모델 로드, 더미 forward) 진행 상태.
+
+    - FAST_START=true 면 백그라운드 스레드에서 돌고, /ready 가 이 상태를 보고한다.
+    - 프로세스(앱 import) 시작 → 첫 /health 응답까지 시간도 여기서 기록한다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.process_t0 = time.perf_counter()
+        self.ready = False
+        self.error: Optional[str] = None
+        self.started_s: Optional[float] = None
+        self.finished_s: Optional[float] = None
+        self.first_health_s: Optional[float] = None
+        self.lstm_a_warmed: List[str] = []
+        self.lstm_b_loaded = False
+        self.mqtt_started: Optional[bool] = None
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.process_t0
+
+    def mark_health(self) -> None:
+        if self.first_health_s is not None:
+            return
+        with self._lock:
+            if self.first_health_s is None:
+                self.first_health_s = self._elapsed()
+                print(f"[STARTUP] first /health after {self.first_health_s * 1000:.0f} ms")
+
+    def run(self, create_tables: bool = False, start_mqtt: Optional[Callable[[], None]] = None) -> None:
+        """(MQTT 접속 → DB 테이블 생성) → 활성 레시피 LSTM-A 로드/pin → LSTM-B 로드 → 더미 forward."""
+        # ML 모듈은 여기서 처음 import
+        from app.ml.lstm_a import get_lstm_a_model
+        from app.ml.lstm_b import load_lstm_b_model, warmup_lstm_b_model
+
+        self.started_s = self._elapsed()
+        if start_mqtt is not None:
+            # 브로커 접속 실패가 모델 warmup 을 막지 않게 분리
+            try:
+                start_mqtt()
+                self.mqtt_started = True
+            except Exception as e:
+                self.mqtt_started = False
+                print("[STARTUP] mqtt start failed:", repr(e))
+
+        try:
+            # SQLite/PG 등 DB 테이블 생성
+            if create_tables:
+                Base.metadata.create_all(bind=engine)
+
+            # cycles 가 월 파티션 테이블(PostgreSQL)이면 앞으로 N개월 파티션 확보
+            if settings.CYCLES_PARTITION_MONTHS_AHEAD > 0:
+                from app.db.migrate_cycles import ensure_cycle_partitions
+
+                ensure_cycle_partitions(engine, settings.CYCLES_PARTITION_MONTHS_AHEAD)
+
+            # 기존 DB 면 sku_latest read model 을 한 번 채움 (이후는 ingest 트랜잭션에서 유지)
+            from app.db.sku_latest import rebuild_if_empty
+
+            db = SessionLocal()
+            try:
+                rebuild_if_empty(db)
+            finally:
+                db.close()
+
+            # 보존 기간 지난 행 → 압축 아카이브 (주기 실행)
+            if settings.RETENTION_INTERVAL_S > 0:
+                from app.services.retention_service import retention
+
+                retention.start(settings.RETENTION_INTERVAL_S)
+
+            # 활성 레시피 모델은 미리 로드 + pin
+            lstm_a = get_lstm_a_model()
+            db = SessionLocal()
+            try:
+                recipes = recipes_service.list_recipes(db)
+            finally:
+                db.close()
+            active = [r.sku_id for r in recipes if r.is_active]
+
+            # can_in fallback 용 base_valve_ms (계산이 한 번도 안 된 SKU 도 fill 명령을 보낼 수 있게)
+            from app.services.valve_guard import valve_guard
+
+            valve_guard.preload(recipes)
+            lstm_a.preload_active(active)
+            self.lstm_a_warmed = lstm_a.warmup()
+            lstm_a.start_watcher(settings.MODEL_WATCH_INTERVAL_S)
+
+            if settings.ONLINE_TUNE_INTERVAL_S > 0:
+                from app.ml.online_tuner import online_tuner
+
+                online_tuner.start(settings.ONLINE_TUNE_INTERVAL_S)
+
+            load_lstm_b_model(str(LSTM_B_MODEL_PATH))
+            self.lstm_b_loaded = warmup_lstm_b_model()
+
+            if self.lstm_b_loaded and settings.PREDICTIVE_SPC_INTERVAL_S > 0:
+                from app.services.predictive_spc_service import predictive_spc
+
+                predictive_spc.start(settings.PREDICTIVE_SPC_INTERVAL_S)
+
+            self.ready = True
+        except Exception as e:
+            self.error = repr(e)
+            print("[STARTUP] warmup failed:", repr(e))
+        finally:
+            self.finished_s = self._elapsed()
+            print(f"[STARTUP] warmup done ready={self.ready} in {(self.finished_s - self.started_s) * 1000:.0f} ms")
+
+    def status(self) -> Dict[str, Any]:
+        def ms(v: Optional[float]) -> Optional[float]:
+            return round(v * 1000.0, 1) if v is not None else None
+
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "lstm_a_warmed": list(self.lstm_a_warmed),
+            "lstm_b_loaded": self.lstm_b_loaded,
+            "mqtt_started": self.mqtt_started,
+            "warmup_started_ms": ms(self.started_s),
+            "warmup_finished_ms": ms(self.finished_s),
+            "first_health_ms": ms(self.first_health_s),
+        }
+
+
+warmup_state = WarmupState()
@@ -0,0 +1,109 @@
+"""
+bench/startup_time.py
+
+uvicorn 프로세스 기동 → 첫 200 /health, → /ready(warmup 완료) 까지 걸린 시간과
+RSS 를 FAST_START=false / true 각각에 대해 측정한다.
+
+사용법 (backend 폴더에서, MQTT 브로커가 떠 있어야 함: infra/docker-compose):
+
+    $ python -m bench.startup_time
+    $ python -m bench.startup_time --runs 5 --env ML_BACKEND=numpy
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=1.0) as r:
+            return r.status, json.loads(r.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except Exception:
+        return None, None
+
+
+def _rss_mb(pid: int) -> float | None:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+def measure_once(fast_start: bool, port: int, extra_env: dict, timeout_s: float = 120.0) -> dict:
+    env = dict(os.environ, FAST_START="true" if fast_start else "false", **extra_env)
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    health_s = ready_s = None
+    try:
+        while time.perf_counter() - t0 < timeout_s:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+            if health_s is None:
+                code, _ = _get(base + "/health")
+                if code == 200:
+                    health_s = time.perf_counter() - t0
+            if health_s is not None:
+                code, body = _get(base + "/ready")
+                if code == 200:
+                    ready_s = time.perf_counter() - t0
+                    break
+            time.sleep(0.005)
+
+        _, ready_body = _get(base + "/ready")
+        return {
+            "fast_start": fast_start,
+            "health_ms": round(health_s * 1000, 1) if health_s else None,
+            "ready_ms": round(ready_s * 1000, 1) if ready_s else None,
+            "rss_mb": _rss_mb(proc.pid),
+            "server_first_health_ms": (ready_body or {}).get("first_health_ms"),
+        }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--env", action="append", default=[], help="추가 환경변수 KEY=VALUE")
+    args = parser.parse_args()
+
+    extra_env = dict(kv.split("=", 1) for kv in args.env)
+
+    for fast in (False, True):
+        runs = [measure_once(fast, args.port, extra_env) for _ in range(args.runs)]
+        for r in runs:
+            print(f"[BENCH] {r}")
+        health = [r["health_ms"] for r in runs if r["health_ms"]]
+        ready = [r["ready_ms"] for r in runs if r["ready_ms"]]
+        print(
+            f"[BENCH] FAST_START={str(fast).lower():5s} "
+            f"health p50={round(statistics.median(health), 1) if health else None} ms, "
+            f"ready p50={round(statistics.median(ready), 1) if ready else None} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()